@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Memory and CPU of the scheduler daemon with a growing number of sessions.
+
+For each client count, starts one `eyesight-reminder daemon` and that many
+`eyesight-reminder --connect` clients on the offscreen platform, waits
+until all of them have subscribed, and then measures over a window of
+compressed break cycles:
+
+- proportional set size (PSS) of the daemon and of all clients together;
+  PSS splits shared pages (Qt, Python) between the processes sharing them,
+  so the sum is what the sessions really cost the machine
+- CPU time of the daemon and of all clients together
+
+With --compare, the same number of full instances (one BreakReminderApp per
+session, as without the daemon) is measured the same way. Every process
+gets its own XDG_RUNTIME_DIR, XDG_STATE_HOME and XDG_CONFIG_HOME, so a
+reminder that is already running is not disturbed.
+
+    python benchmarks/bench_daemon.py --clients 1,4,16 --compare --json
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from eyesight_reminder.ctl import ControlError, send_command  # noqa: E402
+from eyesight_reminder.paths import APP_DIR_NAME  # noqa: E402
+
+COMMAND = [sys.executable, "-m", "eyesight_reminder"]
+READY_TIMEOUT = 60.0
+SETTLE_TIME = 1.0
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def environment(directory):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    for name in ("XDG_RUNTIME_DIR", "XDG_STATE_HOME", "XDG_CONFIG_HOME"):
+        env[name] = directory
+    return env
+
+
+def session_dir(base, index):
+    path = os.path.join(base, f"session-{index}")
+    os.makedirs(path, mode=0o700)
+    return path
+
+
+def pss_kb(pid):
+    """Proportional set size of `pid`, or its RSS where smaps_rollup is missing"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime, fields 14 and 15 of stat(5)
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def wait_until(condition, processes):
+    start = time.perf_counter()
+    while time.perf_counter() - start < READY_TIMEOUT:
+        if condition():
+            return
+        if any(process.poll() is not None for process in processes):
+            raise RuntimeError("a process exited early")
+        time.sleep(0.05)
+    raise RuntimeError("timed out waiting for the processes to start")
+
+
+def answers(path, **expected):
+    try:
+        reply = send_command("status", path=path, timeout=1.0)
+    except ControlError:
+        return False
+    status = reply.get("status") or {}
+    return reply.get("ok") and all(status.get(key) == value for key, value in expected.items())
+
+
+def stop(processes):
+    for process in processes:
+        process.send_signal(signal.SIGTERM)
+    for process in processes:
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def measure(groups, seconds):
+    """PSS and CPU of each group of processes over `seconds`"""
+    time.sleep(SETTLE_TIME)
+    before = {name: sum(cpu_seconds(p.pid) for p in group) for name, group in groups.items()}
+    time.sleep(seconds)
+    result = {}
+    for name, group in groups.items():
+        result[f"{name}_pss_kb"] = sum(pss_kb(p.pid) for p in group)
+        result[f"{name}_cpu_seconds"] = round(
+            sum(cpu_seconds(p.pid) for p in group) - before[name], 3
+        )
+    return result
+
+
+def run_daemon(count, args):
+    with tempfile.TemporaryDirectory(prefix="eyesight-bench-") as base:
+        os.chmod(base, 0o700)
+        socket_path = os.path.join(base, "scheduler.sock")
+        daemon = subprocess.Popen(
+            COMMAND + ["daemon", "--socket", socket_path], env=environment(base),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        clients = []
+        try:
+            for index in range(count):
+                clients.append(subprocess.Popen(
+                    COMMAND + ["--connect", socket_path, "--interval", str(args.interval),
+                               "--duration", str(args.duration)],
+                    env=environment(session_dir(base, index)),
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                ))
+            wait_until(lambda: answers(socket_path, sessions=count), [daemon] + clients)
+            return measure({"daemon": [daemon], "clients": clients}, args.seconds)
+        finally:
+            stop(clients + [daemon])
+
+
+def run_full(count, args):
+    with tempfile.TemporaryDirectory(prefix="eyesight-bench-") as base:
+        os.chmod(base, 0o700)
+        instances = []
+        sockets = []
+        try:
+            for index in range(count):
+                directory = session_dir(base, index)
+                sockets.append(os.path.join(directory, APP_DIR_NAME, "control.sock"))
+                instances.append(subprocess.Popen(
+                    COMMAND + ["--interval", str(args.interval), "--duration", str(args.duration),
+                               "--idle-backend", "none"],
+                    env=environment(directory),
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                ))
+            wait_until(lambda: all(answers(path) for path in sockets), instances)
+            return measure({"full": instances}, args.seconds)
+        finally:
+            stop(instances)
+
+
+def client_counts(text):
+    return [int(part) for part in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler daemon scaling benchmark.")
+    parser.add_argument("--clients", type=client_counts, default=[1, 2, 4, 8],
+                        help="Client counts to measure, comma separated (default: 1,2,4,8).")
+    parser.add_argument("--seconds", type=float, default=10.0,
+                        help="Length of the measurement window (default: 10).")
+    parser.add_argument("--interval", type=int, default=4, help="Break interval (default: 4).")
+    parser.add_argument("--duration", type=int, default=1, help="Break duration (default: 1).")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also measure as many full instances without the daemon.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.clients:
+        result = {"clients": count}
+        result.update(run_daemon(count, args))
+        result["total_pss_kb"] = result["daemon_pss_kb"] + result["clients_pss_kb"]
+        if args.compare:
+            result.update(run_full(count, args))
+        results.append(result)
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "seconds": args.seconds,
+                          "results": results}, indent=2))
+        return 0
+    columns = ["clients", "daemon_pss_kb", "clients_pss_kb", "total_pss_kb",
+               "daemon_cpu_seconds", "clients_cpu_seconds"]
+    if args.compare:
+        columns += ["full_pss_kb", "full_cpu_seconds"]
+    print("  ".join(f"{column:>19}" for column in columns))
+    for result in results:
+        print("  ".join(f"{result[column]:>19}" for column in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
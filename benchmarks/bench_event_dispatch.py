@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the cost of delivering Qt events to the application object.
+
+Compares the old BreakReminderApp.event() override, which ran Python code
+(signal.getsignal() and a handler comparison) for every event, with an
+application class that leaves event dispatch to Qt, as BreakReminderApp
+does now that signals arrive through signal.set_wakeup_fd().
+
+Each variant runs in its own process since there can only be one
+QApplication per process. Run with:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_event_dispatch.py
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+EVENTS = 200000
+ROUNDS = 5
+
+
+def legacy_signal_handler(sig, frame):
+    pass
+
+
+def make_app(variant):
+    from PyQt5.QtWidgets import QApplication
+
+    if variant == "legacy":
+        class LegacyApp(QApplication):
+            # Copy of the per-event hook BreakReminderApp used to have
+            def event(self, event):
+                return_value = super().event(event)
+                if hasattr(signal, 'SIGINT'):
+                    try:
+                        if signal.getsignal(signal.SIGINT) == signal.default_int_handler:
+                            signal.signal(signal.SIGINT, legacy_signal_handler)
+                    except KeyboardInterrupt:
+                        return True
+                return return_value
+
+        return LegacyApp(sys.argv[:1])
+
+    class CurrentApp(QApplication):
+        pass
+
+    return CurrentApp(sys.argv[:1])
+
+
+def run_variant(variant, events, rounds):
+    from PyQt5.QtCore import QEvent
+
+    app = make_app(variant)
+    event = QEvent(QEvent.User)
+    send_event = app.sendEvent
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(events):
+            send_event(app, event)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "variant": variant,
+        "events": events,
+        "best_seconds": best,
+        "ns_per_event": best / events * 1e9,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--variant", choices=["legacy", "current"])
+    parser.add_argument("--events", type=int, default=EVENTS)
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.events, args.rounds)))
+        return 0
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    results = {}
+    for variant in ("legacy", "current"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--variant", variant,
+             "--events", str(args.events), "--rounds", str(args.rounds)],
+            env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True,
+        ).stdout
+        results[variant] = json.loads(output.strip().splitlines()[-1])
+
+    if args.json:
+        print(json.dumps(results))
+        return 0
+    for variant, result in results.items():
+        print(f"{variant:>8}: {result['ns_per_event']:8.0f} ns per event")
+    speedup = results["legacy"]["ns_per_event"] / results["current"]["ns_per_event"]
+    print(f"Event dispatch without the Python hook is {speedup:.1f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
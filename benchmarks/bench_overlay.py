@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Cost of one countdown tick on the break overlays.
+
+Shows the overlay pool on simulated 4K screens under QT_QPA_PLATFORM=offscreen
+and measures the CPU time of changing the countdown text and letting Qt
+repaint, i.e. what every second of a break costs.
+
+    python benchmarks/bench_overlay.py --screens 3 --ticks 300
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication, QObject, QRect, pyqtSignal  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from eyesight_reminder.display import format_time_remaining  # noqa: E402
+from eyesight_reminder.overlay import OverlayPool  # noqa: E402
+
+
+class FakeScreen(QObject):
+    geometryChanged = pyqtSignal(QRect)
+
+    def __init__(self, index, parent):
+        super().__init__(parent)
+        self.index = index
+
+    def geometry(self):
+        return QRect(self.index * 3840, 0, 3840, 2160)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay countdown tick benchmark.")
+    parser.add_argument("--screens", type=int, default=3, help="Number of simulated 4K screens (default: 3).")
+    parser.add_argument("--ticks", type=int, default=300, help="Countdown ticks to measure (default: 300).")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    app = QApplication([sys.argv[0]])
+    screens = [FakeScreen(i, app) for i in range(args.screens)]
+    app.screens = lambda: screens
+    pool = OverlayPool(app)
+    pool.set_text("Take a short pause!\nTime left: 00:00:20")
+    pool.show()
+    # The offscreen platform sizes full-screen windows to its own 800x600
+    # screen; give them back the size of the simulated screens
+    for screen, overlay in pool.overlays.items():
+        overlay.showNormal()
+        overlay.setGeometry(screen.geometry())
+    for _ in range(5):
+        app.processEvents()
+
+    start_cpu = time.process_time()
+    start_wall = time.perf_counter()
+    for tick in range(args.ticks):
+        pool.set_text(f"Take a short pause!\nTime left: {format_time_remaining(args.ticks - tick)}")
+        # Lay out and paint as the event loop would before the next tick
+        QCoreApplication.sendPostedEvents()
+        app.processEvents()
+    cpu = time.process_time() - start_cpu
+    wall = time.perf_counter() - start_wall
+    pool.clear()
+
+    results = {
+        "screens": args.screens,
+        "ticks": args.ticks,
+        "cpu_ms_per_tick": cpu * 1000 / args.ticks,
+        "wall_ms_per_tick": wall * 1000 / args.ticks,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            if isinstance(value, float):
+                value = f"{value:.3f}"
+            print(f"{key:<20} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
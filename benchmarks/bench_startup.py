@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the `eyesight-reminder` entry point.
+
+Measures the wall time, from process spawn to exit, of:
+
+- `eyesight-reminder --help`
+- `eyesight-reminder ctl status` while no instance is running
+- a second launch that finds an instance already running
+- a first launch until its control socket answers (the event loop is running)
+
+Every run uses a private XDG_RUNTIME_DIR, XDG_STATE_HOME and XDG_CONFIG_HOME,
+so a reminder that is already running is not disturbed. The GUI runs on the offscreen platform unless
+QT_QPA_PLATFORM is set.
+
+    python benchmarks/bench_startup.py --runs 10 --json
+"""
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from eyesight_reminder.ctl import ControlError, send_command  # noqa: E402
+from eyesight_reminder.paths import APP_DIR_NAME  # noqa: E402
+
+COMMAND = [sys.executable, "-m", "eyesight_reminder"]
+READY_TIMEOUT = 30.0
+
+
+def environment(runtime_dir):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    env["XDG_RUNTIME_DIR"] = runtime_dir
+    env["XDG_STATE_HOME"] = runtime_dir
+    env["XDG_CONFIG_HOME"] = runtime_dir
+    return env
+
+
+def time_command(arguments, env):
+    start = time.perf_counter()
+    subprocess.run(
+        COMMAND + arguments, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+
+def start_instance(env):
+    """Launch the reminder and return it with the time until it answered"""
+    socket_path = os.path.join(env["XDG_RUNTIME_DIR"], APP_DIR_NAME, "control.sock")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        COMMAND + ["--status-export", "none"], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    while time.perf_counter() - start < READY_TIMEOUT:
+        try:
+            send_command("status", path=socket_path, timeout=1.0)
+            return process, time.perf_counter() - start
+        except ControlError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.005)
+    process.kill()
+    process.wait()
+    raise RuntimeError("the reminder did not start")
+
+
+def stop_instance(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def run_once():
+    with tempfile.TemporaryDirectory(prefix="eyesight-bench-") as runtime_dir:
+        os.chmod(runtime_dir, 0o700)
+        env = environment(runtime_dir)
+        result = {
+            "help": time_command(["--help"], env),
+            "ctl_status_not_running": time_command(["ctl", "status"], env),
+        }
+        process, result["first_instance_ready"] = start_instance(env)
+        try:
+            result["second_instance_exit"] = time_command([], env)
+        finally:
+            stop_instance(process)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs to take the median of (default: 5).")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    results = {"python": sys.version.split()[0], "runs": args.runs}
+    for key in runs[0]:
+        results[key + "_seconds"] = statistics.median(run[key] for run in runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for key, value in results.items():
+        if isinstance(value, float):
+            value = f"{value:.3f}"
+        print(f"{key:<32} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Offscreen benchmark and soak test for the eyesight reminder GUI process.
+
+Runs BreakReminderApp under QT_QPA_PLATFORM=offscreen and reports:
+
+- cold startup time (process spawn to the event loop running and exiting)
+- break start latency (break deadline to every overlay shown)
+- CPU time per break cycle with compressed intervals
+- wakeups per hour while idle with the default schedule
+- RSS, QObject and widget growth over thousands of break cycles
+
+The offscreen platform only has a single screen, so additional screens are
+simulated by handing the application fake screen objects. Every phase runs
+in its own process with a private XDG_RUNTIME_DIR, XDG_STATE_HOME and
+XDG_CONFIG_HOME, so a reminder that is already running, its break history
+and its config file neither disturb nor are disturbed by the benchmark.
+
+    python benchmarks/soak.py --cycles 2000 --screens 3 --json > soak.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def voluntary_context_switches():
+    """Times the main thread went to sleep and was woken up again"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("voluntary_ctxt_switches:"):
+                return int(line.split()[1])
+    return 0
+
+
+def install_fake_screens(app, count):
+    """Make the app see `count` side-by-side 4K screens"""
+    from PyQt5.QtCore import QObject, QRect, pyqtSignal
+
+    class FakeScreen(QObject):
+        geometryChanged = pyqtSignal(QRect)
+
+        def __init__(self, index):
+            super().__init__(app)
+            self.index = index
+
+        def geometry(self):
+            return QRect(self.index * 3840, 0, 3840, 2160)
+
+    screens = [FakeScreen(i) for i in range(count)]
+    app.screens = lambda: screens
+
+
+def object_counts(app):
+    from PyQt5.QtCore import QObject
+    from PyQt5.QtWidgets import QApplication
+
+    return {
+        "qobjects": len(app.findChildren(QObject)),
+        "widgets": len(QApplication.allWidgets()),
+    }
+
+
+def make_app(interval, duration, status_export, metrics=None):
+    from eyesight_reminder.app import BreakReminderApp
+
+    return BreakReminderApp(
+        interval, duration, [sys.argv[0]], status_export=status_export, metrics=metrics
+    )
+
+
+def phase_startup(args):
+    from PyQt5.QtCore import QTimer
+
+    app = make_app(1200, 20, args.status_export)
+    QTimer.singleShot(0, app.quit)
+    app.exec_()
+    return {}
+
+
+def phase_idle(args):
+    from PyQt5.QtCore import QTimer
+
+    app = make_app(1200, 20, args.status_export)
+    result = {}
+
+    def start():
+        result["switches"] = voluntary_context_switches()
+        result["started"] = time.monotonic()
+        QTimer.singleShot(int(args.idle_seconds * 1000), stop)
+
+    def stop():
+        elapsed = time.monotonic() - result.pop("started")
+        switches = voluntary_context_switches() - result.pop("switches")
+        result["idle_seconds"] = elapsed
+        result["idle_wakeups_per_hour"] = switches * 3600 / elapsed
+        app.quit()
+
+    # Let startup work (overlay prewarm and the like) settle first
+    QTimer.singleShot(1000, start)
+    app.exec_()
+    return result
+
+
+def phase_soak(args):
+    from eyesight_reminder.metrics import Metrics
+
+    metrics = Metrics()
+    app = make_app(args.interval, args.duration, args.status_export, metrics)
+    install_fake_screens(app, args.screens)
+    result = {"cycles": args.cycles, "screens": args.screens}
+    state = {"cycles": 0}
+
+    def cycle_done():
+        state["cycles"] += 1
+        if state["cycles"] == args.warmup:
+            # Measure from here, once pools and caches are populated
+            state["cpu"] = time.process_time()
+            state["wall"] = time.monotonic()
+            state["rss"] = rss_kb()
+            state["objects"] = object_counts(app)
+        elif state["cycles"] == args.warmup + args.cycles:
+            cpu = time.process_time() - state["cpu"]
+            wall = time.monotonic() - state["wall"]
+            objects = object_counts(app)
+            result.update({
+                "cpu_ms_per_cycle": cpu * 1000 / args.cycles,
+                "wall_seconds": wall,
+                "rss_kb_start": state["rss"],
+                "rss_kb_end": rss_kb(),
+                "rss_growth_kb": rss_kb() - state["rss"],
+                "qobjects_start": state["objects"]["qobjects"],
+                "qobjects_end": objects["qobjects"],
+                "widgets_start": state["objects"]["widgets"],
+                "widgets_end": objects["widgets"],
+            })
+            summary = metrics.summary()["histograms"]
+            for name in ("break_start_latency", "timer_lateness.break"):
+                if name in summary:
+                    result[name + "_ms"] = summary[name]
+            app.quit()
+
+    app.scheduler.break_ended.connect(cycle_done)
+    app.exec_()
+    return result
+
+
+PHASES = {"startup": phase_startup, "idle": phase_idle, "soak": phase_soak}
+
+
+def run_phase(phase, args):
+    """Run one phase in a fresh process and return its result and wall time"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    with tempfile.TemporaryDirectory(prefix="eyesight-bench-") as runtime_dir:
+        os.chmod(runtime_dir, 0o700)
+        env["XDG_RUNTIME_DIR"] = runtime_dir
+        # Keep the simulated breaks out of the real break history, and the
+        # user's config file out of the benchmark
+        env["XDG_STATE_HOME"] = runtime_dir
+        env["XDG_CONFIG_HOME"] = runtime_dir
+        command = [
+            sys.executable, os.path.abspath(__file__), "--phase", phase,
+            "--cycles", str(args.cycles), "--warmup", str(args.warmup),
+            "--screens", str(args.screens), "--interval", str(args.interval),
+            "--duration", str(args.duration), "--idle-seconds", str(args.idle_seconds),
+            "--status-export", args.status_export,
+        ]
+        start = time.perf_counter()
+        output = subprocess.run(
+            command, env=env, check=True, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, universal_newlines=True,
+        ).stdout
+        elapsed = time.perf_counter() - start
+    return json.loads(output.strip().splitlines()[-1]), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offscreen benchmark and soak test.")
+    parser.add_argument("--phase", choices=sorted(PHASES), help=argparse.SUPPRESS)
+    parser.add_argument("--cycles", type=int, default=2000, help="Break cycles to measure (default: 2000).")
+    parser.add_argument("--warmup", type=int, default=20, help="Break cycles before measuring (default: 20).")
+    parser.add_argument("--screens", type=int, default=3, help="Number of simulated screens (default: 3).")
+    parser.add_argument("--interval", type=float, default=0.01, help="Compressed break interval in seconds.")
+    parser.add_argument("--duration", type=float, default=0.005, help="Compressed break duration in seconds.")
+    parser.add_argument("--idle-seconds", type=float, default=10.0, help="Length of the idle wakeup measurement.")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Cold starts to take the median of.")
+    parser.add_argument("--status-export", choices=["file", "mmap", "none"], default="mmap")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    if args.phase:
+        print(json.dumps(PHASES[args.phase](args)))
+        return 0
+
+    startup_times = [run_phase("startup", args)[1] for _ in range(args.startup_runs)]
+    results = {
+        "python": sys.version.split()[0],
+        "status_export": args.status_export,
+        "startup_seconds": statistics.median(startup_times),
+    }
+    results.update(run_phase("idle", args)[0])
+    results.update(run_phase("soak", args)[0])
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for key, value in results.items():
+        if isinstance(value, dict):
+            value = ", ".join(f"{k}={v:.2f}" for k, v in value.items() if k != "count")
+        elif isinstance(value, float):
+            value = f"{value:.3f}"
+        print(f"{key:<28} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Shared fixtures. Qt allows a single application object per process, so all
+tests that need an event loop share one offscreen BreakReminderApp.
+"""
+
+import os
+import time
+
+import pytest
+
+
+def wait_for(app, condition, timeout=5.0):
+    """Run the event loop until `condition()` holds or `timeout` passes; returns it"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    pytest.importorskip("PyQt5")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    runtime_dir = tmp_path_factory.mktemp("runtime")
+    os.chmod(runtime_dir, 0o700)
+    os.environ["XDG_RUNTIME_DIR"] = str(runtime_dir)
+    os.environ["XDG_STATE_HOME"] = str(tmp_path_factory.mktemp("state"))
+    os.environ["XDG_CONFIG_HOME"] = str(tmp_path_factory.mktemp("config"))
+
+    from eyesight_reminder.app import BreakReminderApp
+
+    app = BreakReminderApp(1200, 20, ["test"], status_export="mmap", idle_backend="none")
+    app.overlay_pool.prewarm()
+    yield app
+    app.quit()
@@ -0,0 +1,780 @@
+import contextlib
+import math
+import os
+import pathlib
+import signal
+import socket
+import sys
+import tempfile
+import time
+from PyQt5.QtWidgets import (
+    QAction,
+    QApplication,
+    QMenu,
+    QMessageBox,
+    QSystemTrayIcon,
+)
+from PyQt5.QtCore import Qt, QTimer, QSocketNotifier
+from PyQt5.QtGui import QIcon
+from PyQt5 import sip
+
+from .config import (
+    DEFAULT_DEFER_GRACE,
+    DEFAULT_HOOK_CONCURRENCY,
+    ConfigError,
+    load_config,
+    save_config,
+)
+from .config_watch import ConfigWatcher
+from .display import format_time_remaining, next_display_change
+from .engine import DEFERRED, PAUSED, BreakEngine, Tier
+from .history import Entry, History, format_stats
+from .hooks import HookRunner
+from .idle import IdleMonitor, create_backend as create_idle_backend
+from .ipc import ControlServer, ScrapeServer, StatusServer
+from .metrics import Metrics, format_summary
+from .overlay import OverlayPool
+from .openmetrics import CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE, OpenMetricsRenderer
+from .paths import config_path, control_socket_path, status_socket_path
+from .processes import ProcessWatcher
+from .scheduler import BreakScheduler
+from .status import StatusSegment, engine_state, engine_status
+from .tray_icon import PROGRESS_STEPS, CountdownIcons, next_step_change, progress_step
+
+SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+HANDLED_SIGNALS = SHUTDOWN_SIGNALS + (signal.SIGHUP, signal.SIGUSR1)
+
+
+def wakeup_signal_handler(sig, frame):
+    # Nothing to do here: the wakeup fd already told the Qt app about the
+    # signal, this handler only replaces the default action
+    pass
+
+
+class BreakReminderApp(QApplication):
+    def __init__(self, break_interval, break_duration, *args, status_export="file", metrics=None,
+                 idle_backend="auto", tiers=(), openmetrics=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if openmetrics is not None and metrics is None:
+            metrics = Metrics()
+        self.metrics = metrics  # Optional Metrics collecting latency histograms and counters
+        self.overlay_text = None  # Last text set on the overlays
+        self.tray_text = None  # Last text set on the tray menu and tooltip
+        self.tray_step = None  # Progress step of the ring on the tray icon
+        self.status_file_path = None  # Set below with --status-export file
+        self.status_file_text = None  # What the status file holds
+        self.settings_window = None  # Will hold reference to settings window when open
+
+        # The break logic lives in the Qt-independent engine; the scheduler
+        # drives it with a single timer armed for its next deadline
+        self.engine = BreakEngine(break_interval, break_duration, tiers=tiers)
+        self.scheduler = BreakScheduler(self.engine, self, metrics=metrics)
+        self.scheduler.break_started.connect(self.on_break_started)
+        self.scheduler.break_ended.connect(self.on_break_ended)
+        self.scheduler.changed.connect(self.on_state_changed)
+        self.scheduler.clock_jumped.connect(self.on_clock_jumped)
+        self.scheduler.break_recorded.connect(self.record_break)
+        # Resumes are also noticed on the next wakeup; logind just tells us sooner
+        self.sleep_watcher = None
+        try:
+            from .logind import LogindSleepWatcher
+
+            self.sleep_watcher = LogindSleepWatcher(self)
+            self.sleep_watcher.resumed.connect(self.scheduler.check_clocks)
+        except (ImportError, OSError):
+            pass
+
+        # Time away from the keyboard counts as a break
+        self.idle_monitor = None
+        backend = create_idle_backend(idle_backend, self)
+        if backend is not None:
+            self.idle_monitor = IdleMonitor(backend, self, threshold=self.shortest_break())
+            self.idle_monitor.returned.connect(self.user_returned)
+            self.engine.idle_time = self.idle_monitor.idle_time
+
+        # What became of every break goes to the history under $XDG_STATE_HOME
+        self.history = None
+        try:
+            self.history = History()
+        except OSError as e:
+            print(f"Break history disabled: {e}")
+        self.stats_box = None  # Will hold reference to the stats window when open
+
+        # Settings saved in the settings window go to the config file, and
+        # edits of the file by anything else are applied as they happen
+        self.config_path = config_path()
+        try:
+            file_settings = load_config(self.config_path)
+        except ConfigError as e:
+            print(f"Ignoring the config file: {e}")
+            file_settings = {}
+        self.config_watcher = ConfigWatcher(self.config_path, file_settings, self)
+        self.config_watcher.changed.connect(self.config_changed)
+
+        # User commands run on break start and end, pause and resume
+        self.hook_runner = HookRunner(
+            file_settings.get("hooks", {}), self,
+            concurrency=file_settings.get("hook_concurrency", DEFAULT_HOOK_CONCURRENCY),
+            metrics=self.metrics,
+        )
+        self.last_record = None  # What became of the last break
+
+        # Breaks are put off while the programs listed in [defer] run
+        self.defer_grace = file_settings.get("defer_grace", DEFAULT_DEFER_GRACE)
+        self.process_watcher = ProcessWatcher(file_settings.get("defer_processes", ()), self)
+        self.engine.defer = self.break_deferral
+
+        self.setup_tray_icon()
+
+        # Overlays are built once per screen and reused for every break; warm
+        # the pool up as soon as the event loop runs so the first break is quick
+        self.overlay_pool = OverlayPool(self, on_shown=self.overlay_shown)
+        self.break_due_at = None  # When the running break was due
+        self.break_screens = 0  # Screens covered by the running break
+        self.overlays_pending = 0  # Overlays not yet shown for the running break
+        QTimer.singleShot(0, self.overlay_pool.prewarm)
+        # Likewise every frame of the tray icon's progress ring
+        QTimer.singleShot(0, self.countdown_icons.prewarm)
+        self.screenAdded.connect(self.tray_screens_changed)
+        # Fold the records of the last run into the rollups while nothing happens
+        QTimer.singleShot(0, self.compact_history)
+
+        # Refresh the displayed countdown only when its text is about to change;
+        # timing does not depend on this timer
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setTimerType(Qt.PreciseTimer)
+        self.refresh_timer.timeout.connect(self.refresh_timer_fired)
+        self.refresh_due = None
+        self.refresh_display()
+
+        # Export the status for status bars and scripts
+        self.status_export = status_export
+        self.status_segment = None
+        if status_export == "mmap":
+            # Written in place on state changes only; readers compute the countdown
+            self.status_segment = StatusSegment()
+        elif status_export == "file":
+            temp_file = tempfile.NamedTemporaryFile(prefix="eyesight_status_", delete=False)
+            self.status_file_path = temp_file.name
+            temp_file.close()
+            # Rewritten on state changes and whenever the countdown on display changes
+            self.write_time_to_file()
+        # Status bars subscribe here and are pushed every state change
+        self.status_server = StatusServer(status_socket_path(), self)
+        self.publish_status()
+
+        # Commands from `eyesight-reminder ctl`
+        self.control_server = ControlServer(control_socket_path(), self.handle_command, self)
+
+        # Scrapers get the metrics as OpenMetrics text, on a Unix socket or a port
+        self.openmetrics_server = None
+        if openmetrics is not None:
+            self.openmetrics_renderer = OpenMetricsRenderer(self.metrics)
+            self.openmetrics_server = ScrapeServer(
+                openmetrics, self.render_openmetrics, OPENMETRICS_CONTENT_TYPE, self
+            )
+        
+        # Signals are delivered through this socket pair: signal.set_wakeup_fd()
+        # has the interpreter write each signal number to signal_emitter, and
+        # the notifier reads them from signal_receiver
+        self.signal_receiver, self.signal_emitter = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.signal_receiver.setblocking(False)
+        self.signal_emitter.setblocking(False)  # Required by set_wakeup_fd
+        self.signal_notifier = QSocketNotifier(self.signal_receiver.fileno(), QSocketNotifier.Read, self)
+        self.signal_notifier.activated.connect(self.handle_signal)
+        
+        # Process events frequently to ensure signals are processed
+        self.processEvents()
+
+    @property
+    def time_left(self):
+        """Whole seconds until the next break, or until the running break ends"""
+        return int(math.ceil(self.engine.remaining()))
+
+    @property
+    def paused(self):
+        return self.engine.paused
+
+    @property
+    def break_interval(self):
+        return self.engine.break_interval
+
+    @property
+    def break_duration(self):
+        return self.engine.break_duration
+
+    @property
+    def tiers(self):
+        """The break tiers after the first, as (interval, duration) pairs"""
+        return [tuple(tier) for tier in self.engine.tiers[1:]]
+
+    def shortest_break(self):
+        return min(tier.duration for tier in self.engine.tiers)
+    
+    def install_signal_handlers(self):
+        """Route SIGINT, SIGTERM, SIGHUP and SIGUSR1 to handle_signal()"""
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, wakeup_signal_handler)
+        signal.set_wakeup_fd(self.signal_emitter.fileno())
+
+    def handle_signal(self):
+        """Act on the signals the wakeup fd reported"""
+        self.count("wakeups.signal")
+        signals = []
+        while True:
+            try:
+                data = self.signal_receiver.recv(1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            signals.extend(data)
+
+        if any(sig in SHUTDOWN_SIGNALS for sig in signals):
+            print("Shutdown signal received, exiting...")  # Add this to confirm signal receipt
+            self.quit()
+            return
+        for sig in signals:
+            if sig == signal.SIGUSR1:
+                self.toggle_pause()
+            elif sig == signal.SIGHUP:
+                self.config_watcher.reload()
+                self.resync()
+
+    def resync(self):
+        """Re-arm the timers from the deadlines and re-export the state"""
+        self.scheduler.check_clocks()
+        self.scheduler.resync()
+        self.refresh_display()
+        self.publish_status()
+
+    def count(self, name, amount=1):
+        """Add to a counter in the metrics, if they are enabled"""
+        if self.metrics:
+            self.metrics.count(name, amount)
+
+    def timed(self, name):
+        """Context manager timing a block into the metrics, if they are enabled"""
+        if self.metrics:
+            return self.metrics.timed(name)
+        return contextlib.nullcontext()
+
+    def start_break(self):
+        """Start a break now"""
+        self.engine.start_break()
+
+    def end_break(self):
+        self.engine.end_break()
+
+    def on_break_started(self, due):
+        self.count("breaks_started")
+        self.break_due_at = due
+        self.break_screens = len(self.screens())
+        self.overlays_pending = self.break_screens
+        self.overlay_text = None
+        self.update_overlays()
+        self.overlay_pool.show()
+        tier = self.engine.break_tier
+        self.hook_runner.fire(
+            "break-start", tier=tier, duration=self.engine.tiers[tier].duration,
+            screens=self.break_screens,
+        )
+
+    def on_break_ended(self):
+        self.overlay_pool.hide()
+        record = self.last_record
+        self.hook_runner.fire(
+            "break-end", tier=record.tier, duration=record.planned,
+            actual=int(record.actual), outcome=record.outcome,
+        )
+
+    def on_state_changed(self):
+        self.refresh_display()
+        self.publish_status()
+
+    def on_clock_jumped(self, slept, step):
+        if slept:
+            print(f"Resumed after {int(slept)}s of suspend")
+        if step:
+            print(f"Wall clock stepped by {step:+.0f}s")
+        # Exported deadlines are Unix times
+        self.publish_status()
+
+    def break_deferral(self):
+        """Seconds to put off a due break by, while a listed program runs"""
+        return self.defer_grace if self.process_watcher.active() else 0
+
+    def record_break(self, record):
+        """Count what became of a break and append it to the history"""
+        self.last_record = record
+        if record.outcome == DEFERRED:
+            print(f"Putting the break off for {self.defer_grace}s: "
+                  f"{', '.join(self.process_watcher.running_names())} running")
+        if record.outcome == PAUSED:
+            self.count("paused_seconds", record.actual)
+        else:
+            self.count(f"breaks.{record.outcome}")
+        if not self.history:
+            return
+        # The engine's deadlines are monotonic; the history keeps Unix times
+        start = time.time() - (self.engine.clock() - record.start)
+        # Records of a running break come before it ends
+        screens = self.break_screens if self.engine.in_break() else 0
+        try:
+            self.history.append(Entry(
+                start, record.planned, record.actual, record.outcome, record.tier, screens,
+            ))
+        except OSError as e:
+            print(f"Error writing the break history: {e}")
+
+    def compact_history(self):
+        if not self.history:
+            return
+        try:
+            self.history.compact()
+        except OSError as e:
+            print(f"Error compacting the break history: {e}")
+
+    def show_stats(self):
+        """Show today's, this week's and all-time break statistics"""
+        if self.history:
+            text = format_stats(self.history.stats())
+        else:
+            text = "The break history is not available."
+        if self.stats_box is None or sip.isdeleted(self.stats_box):
+            self.stats_box = QMessageBox(QMessageBox.Information, "Break statistics", text)
+            self.stats_box.setAttribute(Qt.WA_DeleteOnClose)
+            self.stats_box.setWindowModality(Qt.NonModal)
+        else:
+            self.stats_box.setText(text)
+        self.stats_box.show()
+        self.stats_box.raise_()
+
+    def overlay_shown(self, overlay):
+        """Measure how late the overlays appear relative to the break deadline"""
+        if not self.metrics or self.overlays_pending <= 0:
+            return
+        self.metrics.record_lateness("overlay_shown", self.break_due_at)
+        self.overlays_pending -= 1
+        if self.overlays_pending == 0:
+            # Every screen is covered now
+            self.metrics.record_lateness("break_start_latency", self.break_due_at)
+
+    def refresh_timer_fired(self):
+        if self.metrics and self.refresh_due is not None:
+            self.metrics.record_lateness("timer_lateness.refresh", self.refresh_due)
+        self.count("wakeups.refresh")
+        self.scheduler.check_clocks()
+        self.refresh_display()
+
+    def refresh_display(self):
+        """Update the visible countdown and plan the next refresh"""
+        self.refresh_due = None
+        if self.engine.in_break():
+            self.update_overlays()
+        else:
+            self.update_tray_icon()
+        self.update_tray_progress()
+        self.write_time_to_file()
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        """Wake up exactly when the displayed countdown text or progress ring changes next"""
+        self.refresh_timer.stop()
+        # A paused countdown (and a paused break's overlay text) stays frozen
+        if self.paused:
+            return
+        remaining = self.engine.remaining()
+        delay = next_display_change(remaining)
+        if not self.engine.in_break():
+            step_delay = next_step_change(remaining, self.countdown_length())
+            if step_delay is not None and (delay is None or step_delay < delay):
+                delay = step_delay
+        if delay is not None:
+            self.refresh_due = time.monotonic() + delay
+            self.refresh_timer.start(int(math.ceil(delay * 1000)))
+
+    def update_overlays(self):
+        # Pausing during a break freezes the displayed countdown
+        if not self.paused:
+            time_text = self.format_time_remaining(self.time_left)
+            headline = "Take a short pause!" if self.engine.break_tier == 0 else "Take a break!"
+            text = f"{headline}\nTime left: {time_text}"
+            if text == self.overlay_text:
+                return
+            self.overlay_text = text
+            self.overlay_pool.set_text(text)
+
+    def open_settings(self):
+        """Open the settings window if it's not already open"""
+        with self.timed("open_settings"):
+            self._open_settings()
+
+    def _open_settings(self):
+        try:
+            # If the window already exists and is visible, just bring it to front
+            if self.settings_window and self.settings_window.isVisible():
+                self.settings_window.activateWindow()
+                self.settings_window.raise_()
+                return
+                
+            # Otherwise create a new settings window; the module is only
+            # loaded the first time the settings are opened
+            from .settings import SettingsWindow
+
+            self.settings_window = SettingsWindow(
+                app=self,
+                break_interval=self.break_interval,
+                break_duration=self.break_duration,
+                tiers=self.tiers,
+            )
+            self.settings_window.destroyed.connect(self.settings_window_destroyed)
+            
+            # Show the window and position it
+            self.settings_window.show()
+            
+            # Position the window after it's shown to get correct size
+            screen = self.primaryScreen()
+            if screen:
+                screen_geometry = screen.geometry()
+                window_width = self.settings_window.frameGeometry().width()
+                window_height = self.settings_window.frameGeometry().height()
+                self.settings_window.move(
+                    screen_geometry.width() - window_width - 50,
+                    screen_geometry.height() - window_height - 50
+                )
+            
+        except Exception as e:
+            # Print any errors for debugging
+            print(f"Error opening settings window: {e}")
+            
+    def settings_window_destroyed(self):
+        # A window closed earlier may only be deleted after a new one was opened
+        if self.settings_window is not None and sip.isdeleted(self.settings_window):
+            self.settings_window = None
+
+    def handle_command(self, request):
+        """Run a command received on the control socket and return the reply"""
+        self.count("wakeups.control")
+        command = request.get("command")
+        if command == "status":
+            pass
+        elif command == "metrics":
+            if not self.metrics:
+                return {"ok": False, "error": "metrics are not enabled (start with --metrics)"}
+            return {"ok": True, "metrics": self.metrics.summary()}
+        elif command == "pause":
+            if not self.paused:
+                self.toggle_pause()
+        elif command == "resume":
+            if self.paused:
+                self.toggle_pause()
+        elif command == "skip":
+            self.skip_break()
+        elif command == "postpone":
+            self.postpone_break(int(request["seconds"]))
+        elif command == "break":
+            self.start_break()
+        elif command == "set":
+            new_settings = {
+                'break_interval': int(request.get("interval", self.break_interval)),
+                'break_duration': int(request.get("duration", self.break_duration)),
+            }
+            if min(new_settings.values()) <= 0:
+                raise ValueError("interval and duration must be positive")
+            if "tiers" in request:
+                new_settings['tiers'] = [
+                    Tier(int(interval), int(duration)) for interval, duration in request["tiers"]
+                ]
+                if any(min(tier) <= 0 for tier in new_settings['tiers']):
+                    raise ValueError("interval and duration must be positive")
+            self.update_settings(new_settings)
+        else:
+            return {"ok": False, "error": f"unknown command: {command}"}
+        return {"ok": True, "status": self.status_snapshot()}
+
+    def user_returned(self, away):
+        """The user is back after `away` seconds without any input"""
+        if self.engine.credit_idle(away):
+            print(f"Away for {int(away)}s, counting it as a break")
+
+    def skip_break(self):
+        """End the running break, or skip the upcoming one"""
+        self.engine.skip()
+
+    def postpone_break(self, seconds):
+        """Push the next break back by `seconds`; a running break is cut short"""
+        self.engine.postpone(seconds)
+
+    def save_settings(self, new_settings):
+        """Apply settings from the settings window and keep them in the config file"""
+        self.update_settings(new_settings)
+        try:
+            save_config(new_settings, self.config_path)
+        except (OSError, ConfigError) as e:
+            print(f"Error saving settings: {e}")
+            return
+        self.config_watcher.saved(new_settings)
+
+    def config_changed(self, changed):
+        """Apply the settings that changed in the config file"""
+        print(f"Config file changed: {', '.join(sorted(changed))}")
+        if 'hooks' in changed or 'hook_concurrency' in changed:
+            self.hook_runner.configure(
+                changed.get('hooks', self.hook_runner.hooks),
+                changed.get('hook_concurrency', self.hook_runner.concurrency),
+            )
+        if 'defer_grace' in changed:
+            self.defer_grace = changed['defer_grace']
+        if 'defer_processes' in changed:
+            self.process_watcher.configure(changed['defer_processes'])
+        if not {'break_interval', 'break_duration', 'tiers'} & set(changed):
+            return
+        new_settings = {
+            'break_interval': changed.get('break_interval', self.break_interval),
+            'break_duration': changed.get('break_duration', self.break_duration),
+        }
+        if 'tiers' in changed:
+            new_settings['tiers'] = changed['tiers']
+        self.update_settings(new_settings)
+
+    def update_settings(self, new_settings):
+        """Update app settings based on values from the settings window"""
+        with self.timed("update_settings"):
+            self._update_settings(new_settings)
+
+    def _update_settings(self, new_settings):
+        try:
+            # The engine restarts the countdown, or shortens a running break
+            self.engine.update_settings(
+                new_settings['break_interval'], new_settings['break_duration'],
+                tiers=new_settings.get('tiers'),
+            )
+            print(f"Settings updated: interval={self.break_interval}s, duration={self.break_duration}s")
+            for interval, duration in self.tiers:
+                print(f"  and {duration}s every {interval}s")
+            if self.idle_monitor:
+                self.idle_monitor.threshold = self.shortest_break()
+                
+        except Exception as e:
+            # Print any errors for debugging
+            print(f"Error updating settings: {e}")
+    
+    def setup_tray_icon(self):
+        # Get the directory where the script is located
+        script_dir = pathlib.Path(__file__).parent.absolute()
+        icon_path = script_dir / "resources" / "icon.png"
+
+        # Fallback paths for different deployment scenarios
+        fallback_paths = [
+            # Current directory
+            pathlib.Path.cwd() / "resources" / "icon.png",
+            # AppImage or other bundled deployment
+            pathlib.Path(sys.executable).parent / "resources" / "icon.png",
+        ]
+
+        # Try the primary path first
+        if os.path.exists(icon_path):
+            icon_file = str(icon_path)
+        else:
+            # Try fallback paths
+            for path in fallback_paths:
+                if os.path.exists(path):
+                    icon_file = str(path)
+                    break
+            else:
+                # If no paths work, use a warning message and continue
+                print(f"Warning: Icon file not found at {icon_path} or fallbacks")
+                icon_file = str(icon_path)  # Use the original path anyway
+        
+        # The icon carries a ring filling up toward the next break; its
+        # frames are drawn ahead of time and only swapped in here
+        self.countdown_icons = CountdownIcons(QIcon(icon_file), self)
+        self.tray_step = self.tray_progress()
+        self.tray_icon = QSystemTrayIcon(
+            self.countdown_icons.icon(self.tray_step), self
+        )
+        self.tray_menu = QMenu()
+
+        time_text = self.format_time_remaining(self.time_left)
+        self.show_remaining_action = QAction(
+            f"Time until next break: {time_text}", self
+        )
+        self.tray_menu.addAction(self.show_remaining_action)
+
+        pause_action = QAction("Pause", self)
+        pause_action.triggered.connect(self.toggle_pause)
+        self.tray_menu.addAction(pause_action)
+        
+        settings_action = QAction("Settings", self)
+        settings_action.triggered.connect(self.open_settings)
+        self.tray_menu.addAction(settings_action)
+
+        stats_action = QAction("Stats", self)
+        stats_action.triggered.connect(self.show_stats)
+        self.tray_menu.addAction(stats_action)
+
+        exit_action = QAction("Exit", self)
+        exit_action.triggered.connect(self.quit)
+        self.tray_menu.addAction(exit_action)
+
+        self.tray_icon.setContextMenu(self.tray_menu)
+        self.tray_icon.show()
+        self.update_tray_icon()
+
+    def format_time_remaining(self, seconds):
+        """Format seconds into a human-readable string (minutes or seconds)"""
+        return format_time_remaining(seconds)
+            
+    def update_tray_icon(self):
+        if self.paused:
+            text = "Paused"
+        else:
+            time_text = self.format_time_remaining(self.time_left)
+            text = f"Time until next break: {time_text}"
+        # Skip the Qt calls when nothing visible changes
+        if text == self.tray_text:
+            return
+        self.tray_text = text
+        self.show_remaining_action.setText(text)
+        self.tray_icon.setToolTip(text)
+
+    def countdown_length(self):
+        """Seconds the countdown to the next break started from"""
+        tier = self.engine.next_tier()
+        return self.engine.tiers[tier].interval if tier is not None else 0
+
+    def tray_progress(self):
+        """Step of the ring on the tray icon, None while paused"""
+        if self.paused:
+            return None
+        if self.engine.in_break():
+            return PROGRESS_STEPS
+        return progress_step(self.engine.remaining(), self.countdown_length())
+
+    def update_tray_progress(self):
+        step = self.tray_progress()
+        if step == self.tray_step:
+            return
+        self.tray_step = step
+        self.tray_icon.setIcon(self.countdown_icons.icon(step))
+
+    def tray_screens_changed(self, screen):
+        # A screen with a new pixel ratio needs sharper frames
+        if self.countdown_icons.prewarm():
+            self.tray_icon.setIcon(self.countdown_icons.icon(self.tray_step))
+
+    def toggle_pause(self):
+        self.engine.toggle_pause()
+        self.hook_runner.fire("pause" if self.paused else "resume")
+        if self.engine.in_break():
+            # The frozen overlay text stays, but the tray shows the pause state
+            self.update_tray_icon()
+
+    def status_state(self):
+        return engine_state(self.engine)
+
+    def status_snapshot(self):
+        """The current state as a JSON-serialisable dict with Unix timestamps"""
+        return engine_status(self.engine)
+
+    def publish_status(self):
+        """Export the current state; called on every state change"""
+        self.status_server.publish(self.status_snapshot())
+        if self.status_segment:
+            engine = self.engine
+            self.status_segment.update(
+                self.status_state(),
+                self.break_interval,
+                self.break_duration,
+                next_break=engine.next_break_at or 0.0,
+                break_end=engine.break_end_at or 0.0,
+                remaining=engine.remaining(),
+            )
+        elif self.status_export == "file":
+            self.write_time_to_file()
+
+    def close_status(self):
+        self.control_server.close()
+        self.status_server.close()
+        if self.openmetrics_server:
+            self.openmetrics_server.close()
+        if self.status_segment:
+            self.status_segment.close()
+            self.status_segment = None
+
+    def render_openmetrics(self):
+        """The metrics for a scrape; only the gauges below are computed per scrape"""
+        engine = self.engine
+        paused_seconds = self.metrics.counters.get("paused_seconds", 0.0)
+        if engine.paused:
+            paused_seconds += engine.clock() - engine.paused_at
+        return self.openmetrics_renderer.render([
+            ("eyesight_paused_seconds", "counter", "Time the countdown was paused.", "seconds",
+             round(paused_seconds, 3)),
+            ("eyesight_paused", "gauge", "Whether the countdown is paused.", None, int(engine.paused)),
+            ("eyesight_in_break", "gauge", "Whether a break is shown.", None, int(engine.in_break())),
+        ])
+
+    def dump_metrics(self):
+        if self.metrics:
+            print(format_summary(self.metrics.summary()))
+
+    def write_time_to_file(self):
+        if not self.status_file_path:
+            return
+        text = "-1" if self.paused else f"{self.time_left}"
+        if text == self.status_file_text:
+            return
+        self.status_file_text = text
+        with open(self.status_file_path, "w") as f:
+            f.write(text)
+
+    def remove_status_file(self):
+        if self.status_file_path:
+            try:
+                os.remove(self.status_file_path)
+            except OSError:
+                pass
+            self.status_file_path = None
+
+    def quit(self):
+        """Properly clean up and quit the application"""
+        # Close settings window if open
+        if self.settings_window and self.settings_window.isVisible():
+            self.settings_window.close()
+            self.settings_window = None
+        if self.stats_box is not None and not sip.isdeleted(self.stats_box):
+            self.stats_box.close()
+        self.stats_box = None
+
+        # A break cut short by quitting is recorded as interrupted
+        self.engine.shutdown()
+        # Hooks still waiting (like the end of an interrupted break) run detached
+        self.hook_runner.close()
+        if self.history:
+            try:
+                self.history.close()
+            except OSError as e:
+                print(f"Error compacting the break history: {e}")
+            self.history = None
+
+        # Close and delete the overlays
+        self.overlay_pool.clear()
+        
+        # Stop all timers
+        self.refresh_timer.stop()
+        self.scheduler.stop()
+        if self.idle_monitor:
+            self.idle_monitor.close()
+        self.config_watcher.close()
+        self.process_watcher.close()
+        self.close_status()
+        self.dump_metrics()
+        
+        # Remove the status file
+        self.remove_status_file()
+        
+        # Finally, quit the application
+        super().quit()
@@ -0,0 +1,139 @@
+"""Command line entry point.
+
+Kept free of PyQt5 imports so that `eyesight-reminder ctl` starts quickly;
+Qt is only loaded once we know the reminder itself is going to run.
+"""
+
+import argparse
+import sys
+
+from .config import ConfigError, load_config
+from .ctl import tier_argument
+from .openmetrics import parse_address
+from .paths import daemon_socket_path
+
+DEFAULT_INTERVAL = 1200
+DEFAULT_DURATION = 20
+
+
+def openmetrics_address(text):
+    try:
+        return parse_address(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="eyesight-reminder",
+        description="Display a full-screen pause reminder on all monitors.",
+        epilog="Run 'eyesight-reminder ctl --help' to control a running instance, "
+               "'eyesight-reminder simulate --help' to compare break policies on recorded "
+               "activity, and 'eyesight-reminder daemon --help' to keep the schedules of all "
+               "sessions of a terminal server in one process.",
+    )
+    parser.add_argument(
+        "--interval", "-i", type=int,
+        help="Time between breaks in seconds (default: from the config file, or 1200, "
+             "20 minutes as per 20-20-20 rule)."
+    )
+    parser.add_argument(
+        "--duration", "-d", type=int,
+        help="Duration of the break in seconds (default: from the config file, or 20, "
+             "as per 20-20-20 rule)."
+    )
+    parser.add_argument(
+        "--tier", "-t", type=tier_argument, action="append", metavar="INTERVAL:DURATION",
+        help="Add a break tier, e.g. '-t 3600:300 -t 7200:900' for 5 minutes every hour and "
+             "15 minutes every 2 hours on top of --interval/--duration. A longer break due "
+             "around the same time as a shorter one takes its place."
+    )
+    parser.add_argument(
+        "--status-export", choices=["file", "mmap", "none"], default="file",
+        help="How to export the countdown for status bars: a temp file rewritten whenever the "
+             "countdown on display changes (default), or a memory-mapped status segment updated "
+             "only on state changes."
+    )
+    parser.add_argument(
+        "--idle-backend", choices=["auto", "dbus", "evdev", "socket", "none"], default="auto",
+        help="How to notice that you are away from the keyboard, which counts as a break: "
+             "GNOME's idle monitor over D-Bus, input devices under /dev/input, datagrams sent to "
+             "$XDG_RUNTIME_DIR/eyesight-reminder/activity.sock, or not at all. "
+             "'auto' (default) uses the first of dbus and evdev that works."
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="Record timer lateness, break start latency and settings timings; "
+             "query them with 'eyesight-reminder ctl metrics', they are printed at exit."
+    )
+    parser.add_argument(
+        "--openmetrics", type=openmetrics_address, metavar="ADDRESS",
+        help="Serve break counters, timer lateness, memory use and wakeup counts in the "
+             "OpenMetrics text format over HTTP for scrapers. ADDRESS is 'unix' for "
+             "$XDG_RUNTIME_DIR/eyesight-reminder/metrics.sock, another socket path, or "
+             "[HOST:]PORT (HOST defaults to 127.0.0.1)."
+    )
+    parser.add_argument(
+        "--connect", nargs="?", const=daemon_socket_path(), metavar="SOCKET",
+        help="Only show the tray icon and the breaks, and leave the schedule to the scheduler "
+             "daemon ('eyesight-reminder daemon') listening on SOCKET (default: "
+             f"{daemon_socket_path()}). For terminal servers with many sessions."
+    )
+    return parser
+
+
+def parse_args(argv):
+    """Parse the options; `settings` holds just the ones given explicitly.
+
+    Settings not given on the command line come from the config file, if
+    it has them.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        config = load_config()
+    except ConfigError as e:
+        print(f"Ignoring the config file: {e}", file=sys.stderr)
+        config = {}
+    args.settings = {}
+    if args.interval is not None:
+        args.settings["interval"] = args.interval
+    else:
+        args.interval = config.get("break_interval", DEFAULT_INTERVAL)
+    if args.duration is not None:
+        args.settings["duration"] = args.duration
+    else:
+        args.duration = config.get("break_duration", DEFAULT_DURATION)
+    if args.tier is not None:
+        args.settings["tiers"] = [list(tier) for tier in args.tier]
+    else:
+        args.tier = config.get("tiers")
+    return args
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] == "ctl":
+        from .ctl import main as ctl_main
+        return ctl_main(argv[1:])
+
+    if argv and argv[0] == "daemon":
+        from .daemon import main as daemon_main
+        return daemon_main(argv[1:])
+
+    if argv and argv[0] == "simulate":
+        from .simulate import main as simulate_main
+        return simulate_main(argv[1:])
+
+    args = parse_args(argv)
+    from .main import main as run_app
+    return run_app(
+        args.interval, args.duration, args.status_export, args.metrics,
+        idle_backend=args.idle_backend, tiers=args.tier or (), forward=args.settings,
+        openmetrics=args.openmetrics, connect=args.connect,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""A session's tray icon and overlays, with the schedule kept by the daemon.
+
+`eyesight-reminder --connect` runs this instead of BreakReminderApp: no
+engine, history, hooks, status exports or settings window, just the tray
+icon and the break overlays of one session, driven by the status lines
+the scheduler daemon (daemon.py) sends. Breaks start and end when the
+daemon says so; the only timer here redraws the countdown when its text
+changes. If the daemon goes away the client keeps trying to reconnect,
+and subscribes again with its settings once it is back.
+"""
+
+import json
+import math
+import pathlib
+import signal
+import socket
+import sys
+import time
+
+from PyQt5.QtCore import QObject, QSocketNotifier, Qt, QTimer
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QAction, QApplication, QMenu, QSystemTrayIcon
+
+from .display import format_time_remaining, next_display_change
+from .overlay import OverlayPool
+from .tray_icon import PROGRESS_STEPS, CountdownIcons, next_step_change, progress_step
+
+RECONNECT_INTERVAL = 5.0
+ICON_PATH = pathlib.Path(__file__).parent / "resources" / "icon.png"
+
+
+class BreakClient(QObject):
+    """Shows the breaks the scheduler daemon at `path` announces.
+
+    `settings` (interval, duration, tiers) start the user's schedule if
+    no other session of the user has yet.
+    """
+
+    def __init__(self, app, path, settings, parent=None):
+        super().__init__(parent or app)
+        self.app = app
+        self.path = path
+        self.settings = settings
+        self.sock = None
+        self.notifier = None
+        self.reachable = True  # Whether the last attempt to connect worked
+        self.inbox = b""
+        self.status = None  # The last status line from the daemon
+        self.deadline = None  # time.monotonic() when the shown countdown runs out
+        self.tray_text = None
+        self.tray_step = None
+        self.overlay_text = None
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setTimerType(Qt.PreciseTimer)
+        self.refresh_timer.timeout.connect(self.refresh_display)
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.setInterval(int(RECONNECT_INTERVAL * 1000))
+        self.reconnect_timer.timeout.connect(self.connect_daemon)
+
+        self.overlay_pool = OverlayPool(app)
+        QTimer.singleShot(0, self.overlay_pool.prewarm)
+        self.setup_tray_icon()
+        self.connect_daemon()
+
+    @property
+    def state(self):
+        return self.status["state"] if self.status else None
+
+    def setup_tray_icon(self):
+        self.countdown_icons = CountdownIcons(QIcon(str(ICON_PATH)), self.app, parent=self)
+        QTimer.singleShot(0, self.countdown_icons.prewarm)
+        self.tray_icon = QSystemTrayIcon(self.countdown_icons.icon(None), self)
+        self.tray_menu = QMenu()
+        self.show_remaining_action = QAction("", self)
+        self.tray_menu.addAction(self.show_remaining_action)
+        pause_action = QAction("Pause", self)
+        pause_action.triggered.connect(self.toggle_pause)
+        self.tray_menu.addAction(pause_action)
+        skip_action = QAction("Skip break", self)
+        skip_action.triggered.connect(lambda: self.send_command("skip"))
+        self.tray_menu.addAction(skip_action)
+        exit_action = QAction("Exit", self)
+        exit_action.triggered.connect(self.app.quit)
+        self.tray_menu.addAction(exit_action)
+        self.tray_icon.setContextMenu(self.tray_menu)
+        self.tray_icon.show()
+        self.refresh_display()
+
+    # The connection to the daemon
+
+    def connect_daemon(self):
+        self.reconnect_timer.stop()
+        if self.sock is not None:
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            if self.reachable:
+                print(f"Cannot reach the scheduler daemon at {self.path} ({e.strerror}), retrying")
+            self.reachable = False
+            self.disconnected()
+            return
+        self.reachable = True
+        sock.setblocking(False)
+        self.sock = sock
+        self.notifier = QSocketNotifier(sock.fileno(), QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self.read)
+        self.send_command("subscribe", **self.settings)
+
+    def send_command(self, command, **arguments):
+        if self.sock is None:
+            return
+        try:
+            self.sock.send((json.dumps(dict(arguments, command=command)) + "\n").encode())
+        except OSError as e:
+            print(f"Lost the scheduler daemon: {e}")
+            self.disconnected()
+
+    def read(self):
+        try:
+            data = self.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            print("The scheduler daemon went away, reconnecting")
+            self.disconnected()
+            return
+        self.inbox += data
+        while b"\n" in self.inbox:
+            line, self.inbox = self.inbox.split(b"\n", 1)
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("event") == "status":
+                self.apply(message)
+            elif not message.get("ok", True):
+                print(f"The scheduler daemon refused a command: {message.get('error')}")
+
+    def disconnected(self):
+        if self.sock is not None:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+            self.sock.close()
+            self.sock = None
+        self.inbox = b""
+        self.apply(None)
+        self.reconnect_timer.start()
+
+    # What the daemon said
+
+    def apply(self, status):
+        was_in_break = self.state == "break"
+        self.status = status
+        self.deadline = time.monotonic() + status["remaining"] if status else None
+        if self.state == "break" and not was_in_break:
+            self.overlay_text = None
+            self.refresh_display()
+            self.overlay_pool.show()
+            return
+        if was_in_break and self.state != "break":
+            self.overlay_pool.hide()
+        self.refresh_display()
+
+    def time_left(self):
+        return int(math.ceil(max(0.0, self.deadline - time.monotonic())))
+
+    def countdown_length(self):
+        tier = self.status["tier"]
+        if tier is None:
+            return 0
+        return self.status["interval"] if tier == 0 else self.status["tiers"][tier - 1][0]
+
+    def refresh_display(self):
+        self.refresh_timer.stop()
+        if self.state is None:
+            self.set_tray_text("Not connected to the break scheduler")
+            self.set_tray_step(None)
+            return
+        if self.state == "paused":
+            self.set_tray_text("Paused")
+            self.set_tray_step(None)
+            return
+        remaining = max(0.0, self.deadline - time.monotonic())
+        delay = next_display_change(remaining)
+        if self.state == "break":
+            self.set_overlay_text()
+            self.set_tray_step(PROGRESS_STEPS)
+        else:
+            self.set_tray_text(f"Time until next break: {format_time_remaining(self.time_left())}")
+            total = self.countdown_length()
+            self.set_tray_step(progress_step(remaining, total))
+            step_delay = next_step_change(remaining, total)
+            if step_delay is not None and (delay is None or step_delay < delay):
+                delay = step_delay
+        if delay is not None:
+            self.refresh_timer.start(int(math.ceil(delay * 1000)))
+
+    def set_tray_text(self, text):
+        if text != self.tray_text:
+            self.tray_text = text
+            self.show_remaining_action.setText(text)
+            self.tray_icon.setToolTip(text)
+
+    def set_tray_step(self, step):
+        if step != self.tray_step:
+            self.tray_step = step
+            self.tray_icon.setIcon(self.countdown_icons.icon(step))
+
+    def set_overlay_text(self):
+        headline = "Take a short pause!" if self.status["tier"] == 0 else "Take a break!"
+        text = f"{headline}\nTime left: {format_time_remaining(self.time_left())}"
+        if text != self.overlay_text:
+            self.overlay_text = text
+            self.overlay_pool.set_text(text)
+
+    def toggle_pause(self):
+        self.send_command("resume" if self.state == "paused" else "pause")
+
+    def close(self):
+        self.reconnect_timer.stop()
+        self.refresh_timer.stop()
+        if self.sock is not None:
+            self.notifier.setEnabled(False)
+            self.sock.close()
+            self.sock = None
+        self.overlay_pool.clear()
+        self.tray_icon.hide()
+
+
+def run_client(path, settings):
+    """Run a session's client of the daemon at `path` until it is told to quit"""
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+    app = QApplication(sys.argv)
+    app.setQuitOnLastWindowClosed(False)
+    client = BreakClient(app, path, settings)
+
+    # Signals arrive through a socket pair, as in the full application
+    receiver, emitter = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    receiver.setblocking(False)
+    emitter.setblocking(False)
+    signal_notifier = QSocketNotifier(receiver.fileno(), QSocketNotifier.Read, app)
+    signal_notifier.activated.connect(app.quit)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda sig, frame: None)
+    signal.set_wakeup_fd(emitter.fileno())
+
+    code = app.exec_()
+    client.close()
+    return code
@@ -0,0 +1,53 @@
+"""Notice suspends and wall clock steps, independent of Qt.
+
+The break deadlines are CLOCK_MONOTONIC timestamps, and on Linux that clock
+stops while the machine is suspended: after an hour of sleep the countdown
+is exactly where it was. CLOCK_BOOTTIME keeps counting, so the distance
+between the two grows by the time spent suspended. In the same way, a
+change in the distance between time.time() and the monotonic clock that
+is not explained by a suspend is a step of the wall clock (NTP, the user
+setting the time), which moves every deadline exported as a Unix time.
+
+ClockWatch.check() reads three clocks and compares; it is cheap enough to
+run on every wakeup.
+"""
+
+import time
+
+# Differences below this are clock reading jitter and NTP slewing
+THRESHOLD = 1.0
+
+
+def _boottime():
+    return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+
+class ClockWatch:
+    def __init__(self, threshold=THRESHOLD, monotonic=time.monotonic, boottime=None, wall=time.time):
+        self.threshold = threshold
+        self.monotonic = monotonic
+        self.wall = wall
+        if boottime is None and hasattr(time, "CLOCK_BOOTTIME"):
+            boottime = _boottime
+        # Without CLOCK_BOOTTIME suspends look like wall clock steps
+        self.boottime = boottime
+        self.sleep_offset, self.wall_offset = self.offsets()
+
+    def offsets(self):
+        now = self.monotonic()
+        sleep_offset = self.boottime() - now if self.boottime else 0.0
+        return sleep_offset, self.wall() - now
+
+    def check(self):
+        """Return (seconds suspended, seconds the wall clock stepped) since the last check.
+
+        Either is 0.0 unless it reaches the threshold.
+        """
+        sleep_offset, wall_offset = self.offsets()
+        slept = sleep_offset - self.sleep_offset
+        step = wall_offset - self.wall_offset - slept
+        self.sleep_offset, self.wall_offset = sleep_offset, wall_offset
+        return (
+            slept if slept >= self.threshold else 0.0,
+            step if abs(step) >= self.threshold else 0.0,
+        )
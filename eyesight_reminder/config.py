@@ -0,0 +1,147 @@
+"""The settings file in $XDG_CONFIG_HOME, e.g.
+
+    [breaks]
+    interval = 1200
+    duration = 20
+    tiers = 3600:300, 7200:900
+
+    [hooks]
+    break-start = playerctl pause
+    break-end = playerctl play
+    timeout = 10
+
+    [defer]
+    processes = zoom, obs, soffice.bin
+    grace = 300
+
+Settings are keyed as update_settings() takes them: break_interval,
+break_duration and tiers. Keys missing from the file are left out, so the
+command line and the running instance keep their own values for them.
+The [hooks] section becomes `hooks` (event -> (command, timeout)) and
+`hook_concurrency`, [defer] becomes `defer_processes` and `defer_grace`.
+Does not import Qt.
+"""
+
+import configparser
+import os
+import tempfile
+
+from .engine import parse_tier
+from .paths import config_path
+
+SECTION = "breaks"
+KEYS = {"interval": "break_interval", "duration": "break_duration", "tiers": "tiers"}
+
+HOOKS_SECTION = "hooks"
+HOOK_EVENTS = ("break-start", "break-end", "pause", "resume")
+DEFAULT_HOOK_TIMEOUT = 10
+DEFAULT_HOOK_CONCURRENCY = 2
+
+DEFER_SECTION = "defer"
+DEFAULT_DEFER_GRACE = 300
+
+
+class ConfigError(Exception):
+    pass
+
+
+def format_tiers(tiers):
+    return ", ".join(f"{interval}:{duration}" for interval, duration in tiers)
+
+
+def parse_tiers(text):
+    return [tuple(parse_tier(part.strip())) for part in text.split(",") if part.strip()]
+
+
+def read_parser(path):
+    # No interpolation: hook commands may well contain "%"
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        with open(path) as f:
+            parser.read_file(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, configparser.Error) as e:
+        raise ConfigError(f"cannot read {path}: {e}")
+    return parser
+
+
+def section_or_empty(parser, name):
+    if not parser.has_section(name):
+        parser.add_section(name)
+    return parser[name]
+
+
+def positive_int(section, name, default=None):
+    value = section.getint(name, default)
+    if value is not None and value <= 0:
+        raise ValueError(f"{name} must be positive")
+    return value
+
+
+def load_config(path=None):
+    """The settings given in the config file.
+
+    Hooks and deferral are always included, empty if the file has none.
+    """
+    path = path or config_path()
+    parser = read_parser(path)
+    settings = {}
+    try:
+        if parser.has_section(SECTION):
+            section = parser[SECTION]
+            for name in ("interval", "duration"):
+                if name in section:
+                    settings[KEYS[name]] = positive_int(section, name)
+            if "tiers" in section:
+                settings["tiers"] = parse_tiers(section["tiers"])
+        section = section_or_empty(parser, HOOKS_SECTION)
+        timeout = positive_int(section, "timeout", DEFAULT_HOOK_TIMEOUT)
+        settings["hooks"] = {
+            event: (section[event], positive_int(section, f"{event}-timeout", timeout))
+            for event in HOOK_EVENTS if section.get(event, "").strip()
+        }
+        settings["hook_concurrency"] = positive_int(section, "max-running", DEFAULT_HOOK_CONCURRENCY)
+        section = section_or_empty(parser, DEFER_SECTION)
+        settings["defer_processes"] = [
+            name.strip() for name in section.get("processes", "").split(",") if name.strip()
+        ]
+        settings["defer_grace"] = positive_int(section, "grace", DEFAULT_DEFER_GRACE)
+    except ValueError as e:
+        raise ConfigError(f"{path}: {e}")
+    return settings
+
+
+def save_config(settings, path=None):
+    """Write `settings` into the config file, atomically.
+
+    Other sections and keys in the file are kept, comments are not. The
+    file is written to a temporary file next to it and renamed over it, so
+    readers (and a crash) only ever see the old or the new file.
+    """
+    path = path or config_path()
+    parser = read_parser(path)
+    if not parser.has_section(SECTION):
+        parser.add_section(SECTION)
+    for name, key in KEYS.items():
+        if key in settings:
+            value = settings[key]
+            parser[SECTION][name] = format_tiers(value) if key == "tiers" else str(value)
+    fd, temp_path = tempfile.mkstemp(prefix=".config-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w") as f:
+            parser.write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def changed_settings(old, new):
+    """The settings of `new` that differ from `old`"""
+    return {key: value for key, value in new.items() if old.get(key) != value}
@@ -0,0 +1,130 @@
+"""Notice edits of the config file through inotify, without polling.
+
+The directory is watched rather than the file: editors, config management
+and save_config() all replace the file by renaming a new one over it,
+which a watch on the file itself would not survive.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer, pyqtSignal
+
+from .config import ConfigError, changed_settings, load_config
+
+# Bursts of events (an editor writing a backup, the file and renaming it)
+# are only acted on once things have been quiet for this long
+DEBOUNCE_INTERVAL = 0.2
+
+# From sys/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+def inotify_watch_directory(path, mask):
+    """A non-blocking inotify fd watching `path`; OSError if that is not possible"""
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        raise OSError("inotify needs the C library")
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError("inotify is not available on this system")
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+        errno = ctypes.get_errno()
+        os.close(fd)
+        raise OSError(errno, os.strerror(errno))
+    return fd
+
+
+def event_names(data):
+    """The file names in a buffer of inotify events"""
+    names = []
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(data):
+        _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+        offset += EVENT_HEADER.size
+        names.append(data[offset:offset + length].rstrip(b"\0"))
+        offset += length
+    return names
+
+
+class ConfigWatcher(QObject):
+    """Emits `changed` with the settings that differ after the file was edited.
+
+    Only keys whose value in the file changed are reported, so a setting
+    changed some other way (ctl, the command line) stays as it is unless
+    the file's value for it changes too.
+    """
+
+    changed = pyqtSignal(dict)
+
+    def __init__(self, path, settings, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.name = os.fsencode(os.path.basename(path))
+        self.settings = settings  # The file's settings as of the last load or save
+        self.fd = None
+        self.notifier = None
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(int(DEBOUNCE_INTERVAL * 1000))
+        self.debounce_timer.timeout.connect(self.reload)
+        try:
+            self.fd = inotify_watch_directory(
+                os.path.dirname(path), IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE
+            )
+        except OSError as e:
+            print(f"Config file changes are only picked up on SIGHUP ({e})")
+            return
+        self.notifier = QSocketNotifier(self.fd, QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self.readable)
+
+    def readable(self):
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            relevant = relevant or self.name in event_names(data)
+        if relevant:
+            self.debounce_timer.start()
+
+    def reload(self):
+        """Read the file and report what changed since it was last read"""
+        self.debounce_timer.stop()
+        try:
+            settings = load_config(self.path)
+        except ConfigError as e:
+            print(f"Ignoring config file change: {e}")
+            return
+        changed = changed_settings(self.settings, settings)
+        self.settings = settings
+        if changed:
+            self.changed.emit(changed)
+
+    def saved(self, settings):
+        """The application wrote `settings` itself; nothing to report for them"""
+        self.settings = dict(self.settings, **settings)
+
+    def close(self):
+        self.debounce_timer.stop()
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
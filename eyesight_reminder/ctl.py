@@ -0,0 +1,157 @@
+"""Control a running eyesight reminder from scripts and keybindings.
+
+This module must not import PyQt5: it talks to the running instance over
+its control socket and exits, so it has to start fast.
+"""
+
+import argparse
+import json
+import socket
+import sys
+
+from .engine import parse_tier
+from .metrics import format_summary
+from .paths import control_socket_path
+
+TIMEOUT = 5.0
+
+
+class ControlError(Exception):
+    pass
+
+
+def send_command(command, path=None, timeout=TIMEOUT, **arguments):
+    """Send one command to the running instance and return its reply"""
+    request = dict(arguments, command=command)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(path or control_socket_path())
+        except OSError as e:
+            raise ControlError(f"Eyesight reminder is not running ({e.strerror})")
+        sock.sendall((json.dumps(request) + "\n").encode())
+        reply = b""
+        while not reply.endswith(b"\n"):
+            data = sock.recv(4096)
+            if not data:
+                break
+            reply += data
+    except socket.timeout:
+        raise ControlError("Timed out waiting for the eyesight reminder to reply")
+    except OSError as e:
+        # It quit or dropped the connection halfway through
+        raise ControlError(f"Lost the connection to the eyesight reminder ({e.strerror})")
+    finally:
+        sock.close()
+    try:
+        return json.loads(reply)
+    except ValueError:
+        raise ControlError("Invalid reply from the eyesight reminder")
+
+
+def format_status(status):
+    remaining = int(status["remaining"])
+    if status["state"] == "paused":
+        return f"paused ({remaining}s left when resumed)"
+    if status["state"] == "break":
+        return f"break ({remaining}s left)"
+    return f"running ({remaining}s until next break)"
+
+
+def tier_argument(text):
+    try:
+        return parse_tier(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="eyesight-reminder ctl",
+        description="Control a running eyesight reminder.",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the raw JSON reply."
+    )
+    parser.add_argument(
+        "--socket", metavar="PATH",
+        help="Send the command to the socket at PATH, such as the scheduler daemon's "
+             "when this session runs with --connect, instead of this session's instance."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+    commands.add_parser("status", help="Show the current state.")
+    commands.add_parser("pause", help="Pause the countdown.")
+    commands.add_parser("resume", help="Resume the countdown.")
+    commands.add_parser("skip", help="Skip the next break, or end the running one.")
+    commands.add_parser("break", help="Start a break now.")
+    commands.add_parser("metrics", help="Show latency metrics (needs --metrics).")
+    commands.add_parser("stats", help="Show break statistics from the break history.")
+    postpone = commands.add_parser("postpone", help="Postpone the next break.")
+    postpone.add_argument("seconds", type=int, help="Seconds to add to the countdown.")
+    settings = commands.add_parser("set", help="Change the break interval and/or duration.")
+    settings.add_argument("--interval", "-i", type=int, help="Time between breaks in seconds.")
+    settings.add_argument("--duration", "-d", type=int, help="Duration of the break in seconds.")
+    settings.add_argument(
+        "--tier", "-t", type=tier_argument, action="append", metavar="INTERVAL:DURATION",
+        help="Replace the additional break tiers (repeat for several)."
+    )
+    settings.add_argument(
+        "--no-tiers", action="store_true", help="Remove all additional break tiers."
+    )
+    return parser
+
+
+def show_stats(as_json):
+    """Print the statistics; read from the history files, so no instance needs to run"""
+    from .history import History, format_stats
+
+    try:
+        stats = History().stats()
+    except OSError as e:
+        print(f"Cannot read the break history: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(stats) if as_json else format_stats(stats))
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        return show_stats(args.json)
+
+    arguments = {}
+    if args.command == "postpone":
+        arguments["seconds"] = args.seconds
+    elif args.command == "set":
+        if args.interval is None and args.duration is None and args.tier is None and not args.no_tiers:
+            parser.error("set needs --interval, --duration, --tier or --no-tiers")
+        if args.interval is not None:
+            arguments["interval"] = args.interval
+        if args.duration is not None:
+            arguments["duration"] = args.duration
+        if args.tier is not None or args.no_tiers:
+            arguments["tiers"] = [list(tier) for tier in args.tier or ()]
+
+    try:
+        reply = send_command(args.command, path=args.socket, **arguments)
+    except ControlError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(reply))
+    elif not reply.get("ok"):
+        print(f"Error: {reply.get('error')}", file=sys.stderr)
+    elif args.command == "metrics":
+        print(format_summary(reply["metrics"]))
+    else:
+        print(format_status(reply["status"]))
+    return 0 if reply.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
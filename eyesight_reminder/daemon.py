@@ -0,0 +1,354 @@
+"""One scheduler for every session on the machine, for terminal servers.
+
+`eyesight-reminder daemon` keeps the break schedule of every user with a
+session on the machine in one process without Qt: a BreakEngine per user,
+whose next deadlines all sit in one DeadlineQueue, and a selectors loop
+that sleeps until the earliest of them or until a session has something
+to say. Sessions run `eyesight-reminder --connect` (see client.py), which
+only shows the tray icon and the overlays.
+
+The protocol is newline-delimited JSON on a Unix socket every user can
+connect to. A session subscribes with its settings and from then on is
+sent a status line (the same dict status bars get from a full instance,
+plus "event": "status") whenever the state of its user's schedule
+changes. Any connection can also send the commands of `eyesight-reminder
+ctl`, one reply line each. Users are told apart by the credentials of the
+connecting process (SO_PEERCRED), so nobody can touch another user's
+schedule. All sessions of a user share one schedule; it is dropped once
+the last of them disconnects.
+"""
+
+import argparse
+import json
+import os
+import selectors
+import signal
+import socket
+import time
+
+from .clocks import ClockWatch
+from .engine import BreakEngine, DeadlineQueue, EngineListener, Tier
+from .paths import daemon_socket_path
+from .sockets import listen_unix, peer_credentials
+from .status import engine_status
+
+MAX_REQUEST_SIZE = 4096
+# A session that lets this much output pile up is stuck and dropped
+MAX_BACKLOG = 64 * 1024
+
+SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def positive_settings(interval, duration, tiers=()):
+    tiers = [Tier(int(tier_interval), int(tier_duration)) for tier_interval, tier_duration in tiers]
+    if min([int(interval), int(duration)] + [min(tier) for tier in tiers]) <= 0:
+        raise ValueError("interval and duration must be positive")
+    return int(interval), int(duration), tiers
+
+
+class Connection:
+    """A session or ctl client, and what is still to be read from and sent to it"""
+
+    def __init__(self, sock, uid):
+        self.sock = sock
+        self.uid = uid
+        self.inbox = b""
+        self.outbox = b""
+        self.schedule = None  # The UserSchedule it subscribed to
+
+
+class UserSchedule(EngineListener):
+    """The breaks of one user, and the sessions showing them"""
+
+    def __init__(self, daemon, uid, interval, duration, tiers):
+        self.daemon = daemon
+        self.uid = uid
+        self.sessions = set()
+        self.engine = BreakEngine(interval, duration, clock=daemon.clock, listener=self, tiers=tiers)
+
+    def on_changed(self):
+        self.daemon.changed.add(self)
+
+    def status(self):
+        return dict(engine_status(self.engine), sessions=len(self.sessions))
+
+
+class SchedulerDaemon:
+    """Break schedules of all users, driven by one selectors loop"""
+
+    def __init__(self, path=None, clock=time.monotonic):
+        self.path = path or daemon_socket_path()
+        self.clock = clock
+        self.selector = selectors.DefaultSelector()
+        self.connections = {}  # fd -> Connection
+        self.schedules = {}  # uid -> UserSchedule
+        self.deadlines = DeadlineQueue()  # uid -> next deadline of the user's schedule
+        self.changed = set()  # UserSchedules whose state changed since they were last sent
+        self.clock_watch = ClockWatch()
+        self.running = False
+        os.makedirs(os.path.dirname(self.path), mode=0o755, exist_ok=True)
+        # Every user's sessions connect here; SO_PEERCRED tells them apart
+        self.server = listen_unix(self.path, backlog=128, mode=0o666)
+        if self.server is None:
+            raise OSError(f"{self.path} is already served by another daemon")
+        self.selector.register(self.server, selectors.EVENT_READ)
+        # Signals are read from a socket pair like in the application
+        self.signal_receiver, self.signal_emitter = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.signal_receiver.setblocking(False)
+        self.signal_emitter.setblocking(False)
+        self.selector.register(self.signal_receiver, selectors.EVENT_READ)
+
+    def install_signal_handlers(self):
+        for sig in SHUTDOWN_SIGNALS:
+            signal.signal(sig, lambda sig, frame: None)
+        signal.set_wakeup_fd(self.signal_emitter.fileno())
+
+    def serve_forever(self):
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def run_once(self, timeout=None):
+        """Wait until the next deadline or socket event, but at most `timeout`, and act on it"""
+        head = self.deadlines.peek()
+        if head is not None:
+            delay = max(0.0, head[0] - self.clock())
+            timeout = delay if timeout is None else min(timeout, delay)
+        for key, events in self.selector.select(timeout):
+            if key.fileobj is self.server:
+                self.accept()
+            elif key.fileobj is self.signal_receiver:
+                self.read_signals()
+            else:
+                if events & selectors.EVENT_WRITE:
+                    self.flush(key.data)
+                if events & selectors.EVENT_READ and key.data.sock.fileno() in self.connections:
+                    self.read(key.data)
+        self.check_clocks()
+        self.advance()
+        self.publish()
+
+    def read_signals(self):
+        try:
+            data = self.signal_receiver.recv(1024)
+        except BlockingIOError:
+            return
+        if any(sig in SHUTDOWN_SIGNALS for sig in data):
+            self.running = False
+
+    def check_clocks(self):
+        # The monotonic deadlines stand still while the machine is suspended
+        slept, step = self.clock_watch.check()
+        for schedule in self.schedules.values():
+            if slept:
+                schedule.engine.credit_sleep(slept)
+            if step:
+                # The status has Unix deadlines
+                self.changed.add(schedule)
+
+    def advance(self):
+        now = self.clock()
+        while True:
+            head = self.deadlines.peek()
+            if head is None or head[0] > now:
+                return
+            schedule = self.schedules[head[1]]
+            schedule.engine.advance(now)
+            self.reschedule(schedule)
+
+    def reschedule(self, schedule):
+        deadline = schedule.engine.next_deadline()
+        if deadline is None:
+            self.deadlines.discard(schedule.uid)
+        else:
+            self.deadlines.set(schedule.uid, deadline)
+
+    def publish(self):
+        """Send every changed schedule's status to its sessions"""
+        changed, self.changed = self.changed, set()
+        for schedule in changed:
+            self.reschedule(schedule)
+            line = dict(schedule.status(), event="status")
+            for connection in list(schedule.sessions):
+                self.send(connection, line)
+
+    # Connections
+
+    def accept(self):
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"Error accepting a connection: {e}")
+                return
+            sock.setblocking(False)
+            _, uid, _ = peer_credentials(sock)
+            connection = Connection(sock, uid)
+            self.connections[sock.fileno()] = connection
+            self.selector.register(sock, selectors.EVENT_READ, connection)
+
+    def read(self, connection):
+        try:
+            data = connection.sock.recv(MAX_REQUEST_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.drop(connection)
+            return
+        connection.inbox += data
+        while b"\n" in connection.inbox:
+            line, connection.inbox = connection.inbox.split(b"\n", 1)
+            self.send(connection, self.dispatch(connection, line))
+        if len(connection.inbox) > MAX_REQUEST_SIZE:
+            self.send(connection, {"ok": False, "error": "request too long"})
+            self.drop(connection)
+
+    def send(self, connection, message):
+        if connection.sock.fileno() not in self.connections:
+            return
+        connection.outbox += (json.dumps(message) + "\n").encode()
+        if len(connection.outbox) > MAX_BACKLOG:
+            print(f"Dropping a session of user {connection.uid} that stopped reading")
+            self.drop(connection)
+            return
+        self.flush(connection)
+
+    def flush(self, connection):
+        try:
+            sent = connection.sock.send(connection.outbox)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self.drop(connection)
+            return
+        connection.outbox = connection.outbox[sent:]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if connection.outbox else 0)
+        self.selector.modify(connection.sock, events, connection)
+
+    def drop(self, connection):
+        if self.connections.pop(connection.sock.fileno(), None) is None:
+            return
+        self.selector.unregister(connection.sock)
+        connection.sock.close()
+        schedule = connection.schedule
+        if schedule is not None:
+            schedule.sessions.discard(connection)
+            if not schedule.sessions:
+                # The user's last session is gone
+                del self.schedules[schedule.uid]
+                self.deadlines.discard(schedule.uid)
+                self.changed.discard(schedule)
+            else:
+                self.changed.add(schedule)
+
+    # Commands
+
+    def dispatch(self, connection, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            return {"ok": False, "error": f"invalid request: {e}"}
+        try:
+            return self.handle_command(connection, request)
+        except Exception as e:
+            # Report errors to the client instead of killing every user's schedule
+            return {"ok": False, "error": str(e)}
+
+    def subscribe(self, connection, request):
+        schedule = self.schedules.get(connection.uid)
+        if schedule is None:
+            # The first session's settings start the schedule; later ones share it
+            settings = positive_settings(
+                request.get("interval", 1200), request.get("duration", 20), request.get("tiers", ()),
+            )
+            schedule = self.schedules[connection.uid] = UserSchedule(self, connection.uid, *settings)
+            self.reschedule(schedule)
+        if connection.schedule is None:
+            connection.schedule = schedule
+            schedule.sessions.add(connection)
+        self.changed.add(schedule)
+        return schedule
+
+    def handle_command(self, connection, request):
+        """Run a session's or ctl's command on the schedule of the user who sent it"""
+        command = request.get("command")
+        if command == "subscribe":
+            schedule = self.subscribe(connection, request)
+            return {"ok": True, "status": schedule.status()}
+        schedule = self.schedules.get(connection.uid)
+        if schedule is None:
+            return {"ok": False, "error": "no session of this user is connected"}
+        engine = schedule.engine
+        if command == "status":
+            pass
+        elif command == "pause":
+            engine.pause()
+        elif command == "resume":
+            engine.resume()
+        elif command == "skip":
+            engine.skip()
+        elif command == "postpone":
+            engine.postpone(int(request["seconds"]))
+        elif command == "break":
+            engine.start_break()
+        elif command == "set":
+            interval, duration, tiers = positive_settings(
+                request.get("interval", engine.break_interval),
+                request.get("duration", engine.break_duration),
+                request.get("tiers", engine.tiers[1:]),
+            )
+            engine.update_settings(
+                interval, duration, tiers=tiers if "tiers" in request else None,
+            )
+        else:
+            return {"ok": False, "error": f"unknown command: {command}"}
+        self.reschedule(schedule)
+        return {"ok": True, "status": schedule.status()}
+
+    def close(self):
+        for connection in list(self.connections.values()):
+            self.drop(connection)
+        self.selector.unregister(self.server)
+        self.server.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        self.selector.close()
+        self.signal_receiver.close()
+        self.signal_emitter.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="eyesight-reminder daemon",
+        description="Keep the break schedules of every session on this machine; sessions "
+                    "run 'eyesight-reminder --connect' to show the breaks.",
+    )
+    parser.add_argument(
+        "--socket", metavar="PATH",
+        help=f"Socket the sessions connect to (default: {daemon_socket_path()})."
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        daemon = SchedulerDaemon(args.socket)
+    except OSError as e:
+        print(f"Cannot start the scheduler daemon: {e}")
+        return 1
+    daemon.install_signal_handlers()
+    print(f"Scheduling breaks for the sessions connecting to {daemon.path}")
+    try:
+        daemon.serve_forever()
+    finally:
+        daemon.close()
+    return 0
@@ -0,0 +1,30 @@
+import math
+
+
+def format_time_remaining(seconds):
+    """Format seconds into a human-readable string (minutes or seconds)"""
+    if seconds >= 60:
+        minutes = seconds // 60
+        return f"{minutes} minute{'s' if minutes != 1 else ''}"
+    else:
+        return f"{seconds} second{'s' if seconds != 1 else ''}"
+
+
+def next_display_change(remaining):
+    """Return the delay in seconds until the displayed countdown text changes.
+
+    The countdown shows ceil(remaining) whole seconds, formatted by
+    format_time_remaining(). Above a minute only whole minutes are shown, so
+    the text changes when the count drops below the current minute; in the
+    last minute it changes every second. Returns None once the countdown has
+    run out and nothing will change any more.
+    """
+    shown = math.ceil(remaining)
+    if shown <= 0:
+        return None
+    if shown >= 60:
+        # e.g. 1199 is shown as "19 minutes" until the count reaches 1139
+        next_shown = (shown // 60) * 60 - 1
+    else:
+        next_shown = shown - 1
+    return remaining - next_shown
@@ -0,0 +1,470 @@
+"""Break scheduling logic, independent of Qt.
+
+BreakEngine holds the whole break state machine: the countdowns to the next
+breaks, the running break, pausing and settings changes. It never sleeps or
+arms timers itself; whoever drives it asks next_deadline() when to call
+advance() again. The Qt application does that with a single QTimer (see
+scheduler.py), while tests and benchmarks use a VirtualClock to run weeks
+of schedules in milliseconds.
+"""
+
+import collections
+import heapq
+import itertools
+import time
+
+# A longer break due within this fraction of a shorter tier's interval
+# replaces the shorter break instead of following right after it
+MERGE_FRACTION = 0.25
+
+# How a break ended, as reported to EngineListener.on_break_recorded()
+TAKEN = "taken"  # Ran for its whole duration
+SKIPPED = "skipped"  # Ended early, or skipped before it started
+POSTPONED = "postponed"  # Cut short or pushed back to come again later
+PAUSED = "paused"  # Not a break: the countdown was paused for `actual` seconds
+IDLE = "idle"  # The user was away from the keyboard instead
+SUSPENDED = "suspended"  # The machine was suspended instead
+INTERRUPTED = "interrupted"  # The application quit during the break
+DEFERRED = "deferred"  # Put off when due because of what the user was doing
+OUTCOMES = (TAKEN, SKIPPED, POSTPONED, PAUSED, IDLE, SUSPENDED, INTERRUPTED, DEFERRED)
+
+
+class Tier(collections.namedtuple("Tier", "interval duration")):
+    """A break of `duration` seconds every `interval` seconds"""
+
+
+def parse_tier(text):
+    """Parse INTERVAL:DURATION (in seconds) into a Tier"""
+    try:
+        interval, duration = (int(part) for part in text.split(":"))
+    except ValueError:
+        raise ValueError(f"expected INTERVAL:DURATION in seconds, got {text!r}")
+    if interval <= 0 or duration <= 0:
+        raise ValueError("interval and duration must be positive")
+    return Tier(interval, duration)
+
+
+class BreakRecord(collections.namedtuple("BreakRecord", "outcome tier start planned actual")):
+    """What became of a break; `start` is a timestamp of the engine's clock"""
+
+
+class DeadlineQueue:
+    """Deadlines by key in a heap; the earliest one is found in O(1).
+
+    Rescheduling a key pushes a new entry and marks the old one stale, so
+    every change is O(log n); stale entries are dropped once they reach
+    the top.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.entries = {}  # key -> [deadline, sequence, key, valid]
+        self.sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def set(self, key, deadline):
+        self.discard(key)
+        entry = [deadline, next(self.sequence), key, True]
+        self.entries[key] = entry
+        heapq.heappush(self.heap, entry)
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            entry[3] = False
+
+    def clear(self):
+        self.heap = []
+        self.entries = {}
+
+    def peek(self):
+        """(deadline, key) of the earliest entry, or None"""
+        while self.heap and not self.heap[0][3]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None
+        return self.heap[0][0], self.heap[0][2]
+
+    def shift(self, seconds):
+        """Move every deadline by `seconds`; the heap order is unchanged"""
+        for entry in self.entries.values():
+            entry[0] += seconds
+
+    def items(self):
+        return [(key, entry[0]) for key, entry in self.entries.items()]
+
+
+class EngineListener:
+    """Callbacks BreakEngine makes; override the ones you need"""
+
+    def on_break_started(self, due):
+        """A break started; `due` is when it was scheduled to"""
+
+    def on_break_ended(self):
+        pass
+
+    def on_changed(self):
+        """The state or one of the deadlines changed"""
+
+    def on_break_recorded(self, record):
+        """A break ended, was skipped or was made up for; `record` is a BreakRecord"""
+
+
+class BreakEngine:
+    """Countdowns, breaks, pause and settings changes as absolute deadlines.
+
+    Breaks come in tiers, e.g. 20 s every 20 minutes and 5 minutes every
+    hour. Tier 0 is set by `break_interval` and `break_duration`; `tiers`
+    adds more as (interval, duration) pairs. Every tier counts down to its
+    own deadline and all of them sit in one DeadlineQueue, so the driver
+    only waits for the earliest. Taking a break restarts the countdown of
+    every tier whose break is no longer than it, and a longer break due
+    soon after a shorter one takes its place (see MERGE_FRACTION).
+
+    Deadlines are timestamps of `clock`, which defaults to time.monotonic().
+    While counting down the tiers' deadlines are queued, during a break
+    `break_end_at` is set. Pausing freezes the countdowns; a break that is
+    already running still ends on time and the countdowns after it start
+    out frozen.
+
+    `idle_time`, if given, returns how many seconds the user has been away
+    from the keyboard. Being away for a whole break duration counts as a
+    break: a break that comes due then is not shown at all. `defer`, if
+    given, returns how many seconds to put off a break that comes due, or 0
+    to start it; it is called for every due break, so it has to be quick.
+
+    What became of every break (taken, skipped, made up for by idle time,
+    ...) and every pause is reported to the listener as a BreakRecord.
+    """
+
+    def __init__(self, break_interval, break_duration, clock=time.monotonic, listener=None,
+                 idle_time=None, tiers=(), defer=None):
+        self.clock = clock
+        self.listener = listener or EngineListener()
+        self.idle_time = idle_time
+        self.defer = defer
+        self.tiers = [Tier(break_interval, break_duration)] + [Tier(*tier) for tier in tiers]
+        self.paused = False
+        self.queue = DeadlineQueue()  # Tier index -> deadline of its next break
+        self.break_end_at = None  # Deadline of the end of the running break
+        self.break_tier = None  # Tier index of the running break
+        self.break_started_at = None  # When the running break started
+        self.rested_until = None  # Time away before this went into a break or an idle credit
+        self.paused_remaining = None  # Countdowns frozen by pause(), tier index -> seconds
+        self.paused_at = None  # When pause() was called
+        now = self.clock()
+        for index, tier in enumerate(self.tiers):
+            self.queue.set(index, now + tier.interval)
+
+    @property
+    def break_interval(self):
+        return self.tiers[0].interval
+
+    @property
+    def break_duration(self):
+        return self.tiers[0].duration
+
+    @property
+    def next_break_at(self):
+        """Deadline of the next break while counting down"""
+        head = self.queue.peek()
+        return head[0] if head else None
+
+    # Queries
+
+    def in_break(self):
+        return self.break_end_at is not None
+
+    def remaining(self):
+        """Seconds until the next break, or until the end of the running break"""
+        if self.break_end_at is not None:
+            return max(0.0, self.break_end_at - self.clock())
+        if self.paused:
+            return min(self.paused_remaining.values()) if self.paused_remaining else 0.0
+        next_break_at = self.next_break_at
+        if next_break_at is None:
+            return 0.0
+        return max(0.0, next_break_at - self.clock())
+
+    def next_deadline(self):
+        """When advance() has to be called next, or None if nothing is pending"""
+        if self.break_end_at is not None:
+            return self.break_end_at
+        return self.next_break_at
+
+    def next_tier(self):
+        """Index of the tier the countdown is heading for"""
+        if self.paused:
+            if not self.paused_remaining:
+                return None
+            return min(self.paused_remaining, key=lambda index: (self.paused_remaining[index], index))
+        head = self.queue.peek()
+        return head[1] if head else None
+
+    # Driving the engine
+
+    def advance(self, now=None):
+        """Act on every deadline that has passed by `now` and return the next one"""
+        if now is None:
+            now = self.clock()
+        if self.break_end_at is not None and now >= self.break_end_at:
+            self.end_break()
+        head = None if self.in_break() else self.queue.peek()
+        if head is not None and now >= head[0]:
+            due, first = head
+            index = self.merge_tier(first, due)
+            duration = self.tiers[index].duration
+            idle = self.idle_time() if self.idle_time is not None else 0.0
+            grace = self.defer() if self.defer is not None and idle < duration else 0
+            if idle >= duration:
+                # The user is already away, which is as good as a break; what
+                # an earlier break or credit covered is not counted again
+                rest = self.unrested(idle)
+                self.record(IDLE, index, self.clock() - rest, actual=rest)
+                self.rested_until = self.clock()
+                self.restart_tiers(duration)
+                self.listener.on_changed()
+            elif grace > 0:
+                # Something the user must not be interrupted in is going on
+                self.record(DEFERRED, index, self.clock(), actual=0.0)
+                for tier in {first, index}:
+                    self.queue.set(tier, self.clock() + grace)
+                self.listener.on_changed()
+            else:
+                self.start_break(due=due, tier=index)
+        return self.next_deadline()
+
+    def merge_tier(self, index, due):
+        """The longest break due close enough after tier `index`'s to take its place"""
+        window = self.tiers[index].interval * MERGE_FRACTION
+        best = index
+        for other, deadline in self.queue.items():
+            if deadline <= due + window and self.tiers[other].duration > self.tiers[best].duration:
+                best = other
+        return best
+
+    def restart_tiers(self, rested):
+        """Restart the countdown of every tier whose break fits into `rested` seconds"""
+        now = self.clock()
+        for index, tier in enumerate(self.tiers):
+            if tier.duration > rested:
+                continue
+            if self.paused:
+                self.paused_remaining[index] = float(tier.interval)
+            else:
+                self.queue.set(index, now + tier.interval)
+
+    def record(self, outcome, tier, start, actual=None):
+        """Report what became of a break of `tier` that started at `start`"""
+        if actual is None:
+            actual = max(0.0, self.clock() - start)
+        duration = self.tiers[tier].duration if tier is not None else 0
+        self.listener.on_break_recorded(BreakRecord(outcome, tier, start, duration, actual))
+
+    # Transitions
+
+    def start_break(self, due=None, tier=0):
+        """Start a break of `tier` now, whether or not one is due"""
+        if self.in_break():
+            return
+        now = self.clock()
+        self.break_tier = tier
+        self.break_started_at = now
+        self.break_end_at = now + self.tiers[tier].duration
+        self.listener.on_break_started(now if due is None else due)
+        self.listener.on_changed()
+
+    def end_break(self, outcome=TAKEN):
+        if not self.in_break():
+            return
+        rested = self.tiers[self.break_tier].duration
+        self.record(outcome, self.break_tier, self.break_started_at)
+        self.break_end_at = None
+        self.break_tier = None
+        self.rested_until = self.clock()
+        self.listener.on_break_ended()
+        self.restart_tiers(rested)
+        self.listener.on_changed()
+
+    def skip(self):
+        """End the running break, or skip the upcoming one"""
+        if self.in_break():
+            self.end_break(SKIPPED)
+            return
+        index = self.next_tier()
+        if index is None:
+            return
+        self.record(SKIPPED, index, self.clock(), actual=0.0)
+        if self.paused:
+            self.paused_remaining[index] = float(self.tiers[index].interval)
+        else:
+            self.queue.set(index, self.clock() + self.tiers[index].interval)
+        self.listener.on_changed()
+
+    def postpone(self, seconds):
+        """Push the next break back by `seconds`; a running break is cut short"""
+        if seconds <= 0:
+            raise ValueError("postpone needs a positive number of seconds")
+        if self.in_break():
+            index = self.break_tier
+            self.record(POSTPONED, index, self.break_started_at)
+            self.break_end_at = None
+            self.break_tier = None
+            self.rested_until = self.clock()
+            self.listener.on_break_ended()
+            # The break was not taken, so it comes back after `seconds`
+            if self.paused:
+                self.paused_remaining[index] = float(seconds)
+            else:
+                self.queue.set(index, self.clock() + seconds)
+            self.listener.on_changed()
+        elif self.paused:
+            for index in self.paused_remaining:
+                self.paused_remaining[index] += seconds
+            self.listener.on_changed()
+        elif self.queue:
+            self.record(POSTPONED, self.next_tier(), self.clock(), actual=0.0)
+            self.queue.shift(seconds)
+            self.listener.on_changed()
+
+    def credit_idle(self, seconds):
+        """Count the last `seconds` the user was away as a break if they are long enough.
+
+        A running break ends, and every tier whose break fits into `seconds`
+        restarts its countdown from its full interval. Time away that already
+        went into a break or an earlier credit is not counted again. Returns
+        whether the idle time was counted.
+        """
+        if not self.in_break():
+            seconds = self.unrested(seconds)
+        return self.credit_rest(seconds, IDLE)
+
+    def unrested(self, seconds):
+        """The part of the last `seconds` away that no break or credit covered yet"""
+        if self.rested_until is None:
+            return seconds
+        return max(0.0, min(seconds, self.clock() - self.rested_until))
+
+    def credit_rest(self, seconds, outcome):
+        if self.paused or seconds < min(tier.duration for tier in self.tiers):
+            return False
+        if self.in_break():
+            if seconds < self.tiers[self.break_tier].duration:
+                return False
+            self.end_break(outcome)
+        else:
+            # Recorded as the longest break the time away made up for
+            tier = max(
+                (index for index, tier in enumerate(self.tiers) if tier.duration <= seconds),
+                key=lambda index: self.tiers[index].duration,
+            )
+            self.record(outcome, tier, self.clock() - seconds, actual=seconds)
+        self.rested_until = self.clock()
+        self.restart_tiers(seconds)
+        self.listener.on_changed()
+        return True
+
+    def credit_sleep(self, seconds):
+        """The machine was suspended for `seconds` that the clock did not count.
+
+        A suspend counts as time away from the screen. One shorter than a
+        break still shortens a running break by its length.
+        """
+        # The clock stood still meanwhile, so no break overlaps the suspend
+        if self.credit_rest(seconds, SUSPENDED):
+            return True
+        if self.in_break():
+            self.break_end_at -= seconds
+            self.listener.on_changed()
+        return False
+
+    def pause(self):
+        if self.paused:
+            return
+        now = self.clock()
+        self.paused_remaining = {
+            index: max(0.0, deadline - now) for index, deadline in self.queue.items()
+        }
+        if self.in_break():
+            # The running break still ends; its tier restarts when it does
+            self.paused_remaining.pop(self.break_tier, None)
+        self.queue.clear()
+        self.paused = True
+        self.paused_at = now
+        self.listener.on_changed()
+
+    def resume(self):
+        if not self.paused:
+            return
+        self.record(PAUSED, None, self.paused_at)
+        self.paused = False
+        now = self.clock()
+        for index, remaining in self.paused_remaining.items():
+            self.queue.set(index, now + remaining)
+        self.paused_remaining = None
+        self.listener.on_changed()
+
+    def toggle_pause(self):
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def shutdown(self):
+        """Record a running break as interrupted, and a pause as over"""
+        if self.in_break():
+            self.end_break(INTERRUPTED)
+        if self.paused:
+            self.record(PAUSED, None, self.paused_at)
+
+    def update_settings(self, break_interval, break_duration, tiers=None):
+        """Apply new settings; the countdowns restart, a running break may get shorter.
+
+        `tiers` replaces the tiers after tier 0 if given.
+        """
+        self.tiers[0] = Tier(break_interval, break_duration)
+        if tiers is not None:
+            self.tiers[1:] = [Tier(*tier) for tier in tiers]
+            if self.break_tier is not None and self.break_tier >= len(self.tiers):
+                self.break_tier = 0
+        now = self.clock()
+        countdowns = {index: float(tier.interval) for index, tier in enumerate(self.tiers)}
+        if self.in_break():
+            # Counted down again when the break ends
+            del countdowns[self.break_tier]
+            duration = self.tiers[self.break_tier].duration
+            if duration < self.remaining():
+                # If the new duration is shorter than what is left, end the break sooner
+                self.break_end_at = now + duration
+        if self.paused:
+            self.paused_remaining = countdowns
+        else:
+            self.queue.clear()
+            for index, seconds in countdowns.items():
+                self.queue.set(index, now + seconds)
+        self.listener.on_changed()
+
+
+class VirtualClock:
+    """A clock that only moves when told to, for simulating schedules"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def run(self, engine, until):
+        """Jump from deadline to deadline, letting `engine` act on each, up to `until`"""
+        while True:
+            deadline = engine.next_deadline()
+            if deadline is None or deadline > until:
+                break
+            self.now = max(self.now, deadline)
+            engine.advance()
+        self.now = max(self.now, until)
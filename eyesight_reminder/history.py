@@ -0,0 +1,229 @@
+"""Append-only history of breaks under $XDG_STATE_HOME.
+
+The log is a header followed by fixed-size records, one per break that
+ended, was skipped or made up for, and one per pause. Records are only ever
+appended, one write() per state transition, and never rewritten. Reading
+the whole log after years of use would be slow, so compaction folds the
+records appended since the last compaction into daily and weekly rollups,
+and the statistics are computed from the rollups plus the few records
+after them. Does not import Qt, so `eyesight-reminder ctl stats` is quick.
+"""
+
+import collections
+import datetime
+import json
+import os
+import struct
+import time
+
+from .engine import OUTCOMES, PAUSED
+from .paths import history_path, history_rollup_path
+
+# Fixed layout of the log (little endian):
+#   header: magic, layout version, record size
+#   records: start (Unix time), planned duration, actual duration,
+#            outcome (index into OUTCOMES), tier (255 for none), screens
+MAGIC = b"EYEH"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<dffBBBx")
+NO_TIER = 255
+
+ROLLUP_VERSION = 1
+
+
+class Entry(collections.namedtuple("Entry", "start planned actual outcome tier screens")):
+    """One break in the history; `outcome` is one of engine.OUTCOMES"""
+
+    def pack(self):
+        tier = NO_TIER if self.tier is None else min(self.tier, NO_TIER - 1)
+        return RECORD.pack(
+            self.start, self.planned, self.actual, OUTCOMES.index(self.outcome),
+            tier, min(self.screens, 255),
+        )
+
+    @classmethod
+    def unpack(cls, data):
+        start, planned, actual, outcome, tier, screens = RECORD.unpack(data)
+        outcome = OUTCOMES[outcome] if outcome < len(OUTCOMES) else "unknown"
+        return cls(start, planned, actual, outcome, None if tier == NO_TIER else tier, screens)
+
+
+def day_key(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+def week_key(timestamp):
+    year, week, _ = datetime.date.fromtimestamp(timestamp).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def add_to_bucket(bucket, entry):
+    """Count `entry` into a rollup bucket: outcome -> [count, seconds]"""
+    totals = bucket.setdefault(entry.outcome, [0, 0.0])
+    totals[0] += 1
+    totals[1] += entry.actual
+
+
+def empty_rollups():
+    return {"version": ROLLUP_VERSION, "records": 0, "days": {}, "weeks": {}, "total": {}}
+
+
+def read_entries(path, start=0):
+    """The entries of the log at `path` from record number `start` on"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        magic, version, size = HEADER.unpack(header)
+        if magic != MAGIC or version != LAYOUT_VERSION or size != RECORD.size:
+            print(f"Ignoring break history in an unknown format: {path}")
+            return
+        f.seek(HEADER.size + start * RECORD.size)
+        while True:
+            data = f.read(RECORD.size)
+            # A torn record at the end is left out (and cut off by the next append)
+            if len(data) < RECORD.size:
+                return
+            yield Entry.unpack(data)
+
+
+class History:
+    """The break log and its rollups.
+
+    Opening the history reads the rollups and only the records appended
+    after them. The rollups are kept up to date in memory as entries are
+    appended, so stats() never touches the disk; compact() writes them out
+    so that the next start does not have to read those records again.
+    """
+
+    def __init__(self, path=None, rollup_path=None):
+        self.path = path or history_path()
+        self.rollup_path = rollup_path or history_rollup_path()
+        self.file = None  # Opened for appending on the first append()
+        self.rollups = self.load_rollups()
+        if self.log_records() < self.rollups["records"] or not self.log_format_known():
+            # The log was removed or replaced; the rollups no longer match it
+            self.rollups = empty_rollups()
+        self.count = self.rollups["records"]  # Records in the log
+        for entry in self.read(self.rollups["records"]):
+            self.fold(entry)
+            self.count += 1
+
+    def load_rollups(self):
+        try:
+            with open(self.rollup_path) as f:
+                rollups = json.load(f)
+            if rollups.get("version") == ROLLUP_VERSION:
+                return rollups
+        except (OSError, ValueError):
+            pass
+        return empty_rollups()
+
+    def log_format_known(self):
+        """Whether the log is in this layout, or has no header yet"""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER.size)
+        except FileNotFoundError:
+            return True
+        return len(header) < HEADER.size or HEADER.unpack(header) == (MAGIC, LAYOUT_VERSION, RECORD.size)
+
+    def log_records(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        return max(0, (size - HEADER.size) // RECORD.size)
+
+    def read(self, start=0):
+        """The entries of the log from record number `start` on"""
+        return read_entries(self.path, start)
+
+    def fold(self, entry):
+        add_to_bucket(self.rollups["days"].setdefault(day_key(entry.start), {}), entry)
+        add_to_bucket(self.rollups["weeks"].setdefault(week_key(entry.start), {}), entry)
+        add_to_bucket(self.rollups["total"], entry)
+
+    def open_log(self):
+        if not self.log_format_known():
+            # Written by another version: keep it, but do not mix our records into it
+            aside = self.path + ".unknown"
+            os.replace(self.path, aside)
+            print(f"Break history {self.path} is in an unknown format, moved it to {aside}")
+        self.file = open(self.path, "ab")
+        size = self.file.tell()
+        if size < HEADER.size:
+            self.file.truncate(0)
+            self.file.write(HEADER.pack(MAGIC, LAYOUT_VERSION, RECORD.size))
+        elif HEADER.size + self.count * RECORD.size < size:
+            # Drop a record torn by a crash so the next one lines up
+            self.file.truncate(HEADER.size + self.count * RECORD.size)
+
+    def append(self, entry):
+        """Add `entry` to the log; written out right away, without fsync()"""
+        if self.file is None:
+            self.open_log()
+        self.file.write(entry.pack())
+        self.file.flush()
+        self.fold(entry)
+        self.count += 1
+
+    def compact(self):
+        """Save the rollups so the records up to now are not read again"""
+        if self.count == self.rollups["records"]:
+            return
+        self.rollups["records"] = self.count
+        temp_path = self.rollup_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.rollups, f, separators=(",", ":"))
+        os.replace(temp_path, self.rollup_path)
+
+    def close(self):
+        self.compact()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def stats(self, now=None):
+        """Rollup buckets for today, this week and all time"""
+        if now is None:
+            now = time.time()
+        return {
+            "today": self.rollups["days"].get(day_key(now), {}),
+            "week": self.rollups["weeks"].get(week_key(now), {}),
+            "total": self.rollups["total"],
+        }
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds}s"
+
+
+def format_bucket(bucket):
+    counts = [
+        f"{bucket[outcome][0]} {outcome}" for outcome in OUTCOMES
+        if outcome in bucket and outcome != PAUSED
+    ]
+    rested = sum(seconds for outcome, (_, seconds) in bucket.items() if outcome != PAUSED)
+    line = ", ".join(counts) if counts else "no breaks"
+    line += f"; rested {format_duration(rested)}"
+    if PAUSED in bucket:
+        line += f", paused {format_duration(bucket[PAUSED][1])}"
+    return line
+
+
+def format_stats(stats):
+    return "\n".join(
+        f"{label:<10} {format_bucket(stats[key])}"
+        for label, key in (("Today:", "today"), ("This week:", "week"), ("All time:", "total"))
+    )
@@ -0,0 +1,164 @@
+"""Run user commands when breaks start and end and on pause and resume.
+
+Hooks are shell commands from the [hooks] section of the config file (see
+config.py). They run as QProcesses, so the event loop never waits for
+one: a hook is started from a zero timer after the event that fired it,
+its output is collected as it arrives and printed when it exits, and a
+timer kills it once its timeout is up. At most `concurrency` hooks run at
+a time; others queue. A hook that fires again while it is still queued
+is only run once, with the newest environment.
+"""
+
+import collections
+import time
+
+from PyQt5.QtCore import QObject, QProcess, QProcessEnvironment, QTimer
+
+# Output kept from a hook; the end is what tells what went wrong
+MAX_OUTPUT = 16 * 1024
+# How long close() waits for a killed hook to be reaped
+KILL_WAIT = 1.0
+
+
+class HookRun:
+    """A hook that fired, and its process once it runs"""
+
+    def __init__(self, event, command, timeout, environment):
+        self.event = event
+        self.command = command
+        self.timeout = timeout
+        self.environment = environment
+        self.fired_at = time.monotonic()
+        self.started_at = None
+        self.process = None
+        self.timer = None
+        self.output = b""
+        self.timed_out = False
+
+
+class HookRunner(QObject):
+    """Runs the hooks of each event without ever blocking"""
+
+    def __init__(self, hooks, parent=None, concurrency=2, metrics=None):
+        super().__init__(parent)
+        self.hooks = hooks  # event -> (command, timeout in seconds)
+        self.concurrency = concurrency
+        self.metrics = metrics
+        self.pending = collections.OrderedDict()  # event -> HookRun waiting for a slot
+        self.running = {}  # QProcess -> HookRun
+        self.start_timer = QTimer(self)
+        self.start_timer.setSingleShot(True)
+        self.start_timer.setInterval(0)
+        self.start_timer.timeout.connect(self.start_pending)
+
+    def configure(self, hooks, concurrency):
+        self.hooks = hooks
+        self.concurrency = concurrency
+        self.start_timer.start()
+
+    def fire(self, event, **environment):
+        """Queue the hook of `event`, with EYESIGHT_* variables from `environment`"""
+        hook = self.hooks.get(event)
+        if hook is None:
+            return
+        command, timeout = hook
+        variables = {"EYESIGHT_EVENT": event}
+        variables.update(
+            (f"EYESIGHT_{name.upper()}", str(value)) for name, value in environment.items()
+        )
+        self.pending.pop(event, None)
+        self.pending[event] = HookRun(event, command, timeout, variables)
+        # Started once control is back in the event loop, after what fired it
+        self.start_timer.start()
+
+    def start_pending(self):
+        while self.pending and len(self.running) < self.concurrency:
+            _, run = self.pending.popitem(last=False)
+            self.start(run)
+
+    def environment(self, run):
+        environment = QProcessEnvironment.systemEnvironment()
+        for name, value in run.environment.items():
+            environment.insert(name, value)
+        return environment
+
+    def start(self, run):
+        process = QProcess(self)
+        process.setProcessEnvironment(self.environment(run))
+        process.setProcessChannelMode(QProcess.MergedChannels)
+        process.setStandardInputFile(QProcess.nullDevice())
+        process.readyReadStandardOutput.connect(lambda: self.read_output(process))
+        process.finished.connect(lambda code, status: self.finished(process, code, status))
+        process.errorOccurred.connect(lambda error: self.failed(process, error))
+        run.process = process
+        run.timer = QTimer(process)
+        run.timer.setSingleShot(True)
+        run.timer.timeout.connect(lambda: self.time_out(process))
+        run.timer.start(run.timeout * 1000)
+        run.started_at = time.monotonic()
+        self.running[process] = run
+        if self.metrics:
+            self.metrics.record("hook_delay." + run.event, (run.started_at - run.fired_at) * 1000)
+        process.start("/bin/sh", ["-c", run.command])
+
+    def read_output(self, process):
+        run = self.running.get(process)
+        if run is not None:
+            run.output = (run.output + bytes(process.readAllStandardOutput()))[-MAX_OUTPUT:]
+
+    def time_out(self, process):
+        run = self.running.get(process)
+        if run is not None:
+            run.timed_out = True
+            process.kill()
+
+    def failed(self, process, error):
+        # Crashes and kills also end up in finished(); only a failed start does not
+        if error == QProcess.FailedToStart:
+            run = self.running.get(process)
+            if run is not None:
+                print(f"Hook {run.event} failed to start: {process.errorString()}")
+                self.done(process)
+
+    def finished(self, process, code, status):
+        run = self.running.get(process)
+        if run is None:
+            return
+        self.read_output(process)
+        elapsed = time.monotonic() - run.started_at
+        if self.metrics:
+            self.metrics.record("hook_runtime." + run.event, elapsed * 1000)
+        for line in run.output.decode(errors="replace").splitlines():
+            print(f"[hook {run.event}] {line}")
+        if run.timed_out:
+            print(f"Hook {run.event} killed after its timeout of {run.timeout}s")
+        elif status != QProcess.NormalExit:
+            print(f"Hook {run.event} crashed after {elapsed * 1000:.0f} ms")
+        elif code != 0:
+            print(f"Hook {run.event} exited with status {code} after {elapsed * 1000:.0f} ms")
+        self.done(process)
+
+    def done(self, process):
+        run = self.running.pop(process, None)
+        if run is not None:
+            run.timer.stop()
+        process.deleteLater()
+        self.start_timer.start()
+
+    def close(self):
+        """Stop the running hooks; queued ones are still started, detached"""
+        self.start_timer.stop()
+        for run in self.pending.values():
+            process = QProcess()
+            process.setProgram("/bin/sh")
+            process.setArguments(["-c", run.command])
+            process.setProcessEnvironment(self.environment(run))
+            process.setStandardInputFile(QProcess.nullDevice())
+            process.startDetached()
+        self.pending.clear()
+        for process in list(self.running):
+            process.finished.disconnect()
+            process.kill()
+            # Reap it, so no zombie or "destroyed while running" is left behind
+            process.waitForFinished(int(KILL_WAIT * 1000))
+            self.done(process)
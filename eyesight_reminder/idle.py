@@ -0,0 +1,216 @@
+"""Detect when the user is away from the keyboard.
+
+A backend reports user activity as it happens: input devices through
+QSocketNotifiers on /dev/input, GNOME's idle monitor over D-Bus, or
+datagrams on a local socket for tests and custom integrations. Nothing is
+polled. While the user is active the backend is switched off for a
+moment after each report, so a moving mouse costs at most one wakeup per
+COALESCE_INTERVAL instead of one per input event.
+"""
+
+import fcntl
+import glob
+import os
+import socket
+import time
+
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer, pyqtSignal
+
+from .paths import activity_socket_path
+
+COALESCE_INTERVAL = 1.0
+
+# From linux/input.h: EVIOCGBIT(0, len) reads the event types a device sends
+EV_KEY = 0x01
+EV_REL = 0x02
+EV_MAX = 0x1f
+
+
+def eviocgbit(length):
+    return (2 << 30) | (length << 16) | (ord("E") << 8) | 0x20
+
+
+class IdleBackend(QObject):
+    """Emits `activity` when the user does something, while enabled"""
+
+    activity = pyqtSignal()
+    name = None
+
+    def set_enabled(self, enabled):
+        """Switch reporting activity on or off; a backend may keep reporting"""
+
+    def close(self):
+        pass
+
+
+class FdBackend(IdleBackend):
+    """Activity is anything becoming readable on a set of file descriptors"""
+
+    def __init__(self, fds, parent=None):
+        super().__init__(parent)
+        self.fds = fds
+        self.notifiers = []
+        for fd in fds:
+            notifier = QSocketNotifier(fd, QSocketNotifier.Read, self)
+            notifier.activated.connect(self.readable)
+            self.notifiers.append(notifier)
+
+    def readable(self, fd):
+        # The contents do not matter, only that something happened
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        except OSError:
+            # The device went away (e.g. an unplugged keyboard)
+            self.drop(fd)
+        self.activity.emit()
+
+    def drop(self, fd):
+        index = self.fds.index(fd)
+        self.notifiers[index].setEnabled(False)
+        self.notifiers[index].deleteLater()
+        del self.fds[index], self.notifiers[index]
+        os.close(fd)
+
+    def set_enabled(self, enabled):
+        for notifier in self.notifiers:
+            notifier.setEnabled(enabled)
+
+    def close(self):
+        for fd in list(self.fds):
+            self.drop(fd)
+
+
+class EvdevBackend(FdBackend):
+    """Keyboards and pointing devices under /dev/input (needs read access)"""
+
+    name = "evdev"
+
+    def __init__(self, parent=None, pattern="/dev/input/event*"):
+        fds = []
+        for path in sorted(glob.glob(pattern)):
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+            except OSError:
+                continue
+            if self.is_user_input(fd):
+                fds.append(fd)
+            else:
+                os.close(fd)
+        if not fds:
+            raise OSError(f"no readable input devices match {pattern}")
+        super().__init__(fds, parent)
+
+    @staticmethod
+    def is_user_input(fd):
+        """Only keys and relative axes; leaves out e.g. accelerometers"""
+        bits = bytearray((EV_MAX + 8) // 8)
+        try:
+            fcntl.ioctl(fd, eviocgbit(len(bits)), bits)
+        except OSError:
+            return False
+        return bool(bits[0] & ((1 << EV_KEY) | (1 << EV_REL)))
+
+
+class SocketBackend(FdBackend):
+    """Any datagram sent to a local socket counts as activity"""
+
+    name = "socket"
+
+    def __init__(self, parent=None, path=None):
+        self.path = path or activity_socket_path()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.sock.setblocking(False)
+        super().__init__([self.sock.fileno()], parent)
+
+    def readable(self, fd):
+        try:
+            while self.sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        self.activity.emit()
+
+    def close(self):
+        self.set_enabled(False)
+        self.sock.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def create_backend(name="auto", parent=None):
+    """Build the named backend, or the first that works for "auto".
+
+    Returns None (after printing why) if idle detection is not available.
+    """
+    if name == "none":
+        return None
+    candidates = {
+        "auto": ("dbus", "evdev"),
+        "dbus": ("dbus",),
+        "evdev": ("evdev",),
+        "socket": ("socket",),
+    }[name]
+    errors = []
+    for candidate in candidates:
+        try:
+            if candidate == "dbus":
+                # QtDBus is packaged separately on some distributions
+                from .idle_dbus import DBusBackend as backend
+            else:
+                backend = {"evdev": EvdevBackend, "socket": SocketBackend}[candidate]
+            return backend(parent)
+        except (OSError, ImportError) as e:
+            errors.append(f"{candidate}: {e}")
+    print(f"Idle detection disabled ({'; '.join(errors)})")
+    return None
+
+
+class IdleMonitor(QObject):
+    """Tracks when the user was last active.
+
+    `returned` is emitted with the number of seconds the user was away
+    whenever activity follows a pause of at least `threshold` seconds.
+    """
+
+    returned = pyqtSignal(float)
+
+    def __init__(self, backend, parent=None, threshold=0.0, coalesce=COALESCE_INTERVAL):
+        super().__init__(parent)
+        self.backend = backend
+        self.threshold = threshold
+        self.last_activity = time.monotonic()
+        self.backend.activity.connect(self.on_activity)
+        # Re-enables the backend once the current burst of input is recorded
+        self.coalesce_timer = QTimer(self)
+        self.coalesce_timer.setSingleShot(True)
+        self.coalesce_timer.setInterval(int(coalesce * 1000))
+        self.coalesce_timer.timeout.connect(lambda: self.backend.set_enabled(True))
+        self.backend.set_enabled(True)
+
+    def idle_time(self):
+        """Seconds since the last recorded activity"""
+        return max(0.0, time.monotonic() - self.last_activity)
+
+    def on_activity(self):
+        now = time.monotonic()
+        away = now - self.last_activity
+        self.last_activity = now
+        self.backend.set_enabled(False)
+        self.coalesce_timer.start()
+        if self.threshold and away >= self.threshold:
+            self.returned.emit(away)
+
+    def close(self):
+        self.coalesce_timer.stop()
+        self.backend.close()
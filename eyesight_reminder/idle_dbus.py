@@ -0,0 +1,75 @@
+"""Idle detection through GNOME's idle monitor over D-Bus.
+
+Kept apart from idle.py because PyQt5.QtDBus is not always installed.
+"""
+
+from PyQt5.QtCore import QMetaType, pyqtSlot
+from PyQt5.QtDBus import (
+    QDBusArgument, QDBusConnection, QDBusInterface, QDBusMessage, QDBusPendingCallWatcher,
+    QDBusPendingReply,
+)
+
+from .idle import IdleBackend
+
+
+class DBusBackend(IdleBackend):
+    """GNOME's idle monitor, which sees all input of the session.
+
+    A user active watch fires once on the next input event; it is only
+    added again when the backend is re-enabled. The calls are asynchronous,
+    so a slow session bus never holds up the event loop and the break
+    timers.
+    """
+
+    name = "dbus"
+    SERVICE = "org.gnome.Mutter.IdleMonitor"
+    PATH = "/org/gnome/Mutter/IdleMonitor/Core"
+    INTERFACE = "org.gnome.Mutter.IdleMonitor"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.bus = QDBusConnection.sessionBus()
+        if not self.bus.isConnected():
+            raise OSError("no D-Bus session bus")
+        self.monitor = QDBusInterface(self.SERVICE, self.PATH, self.INTERFACE, self.bus, self)
+        if not self.monitor.isValid():
+            raise OSError(f"{self.SERVICE} is not available")
+        self.bus.connect(self.SERVICE, self.PATH, self.INTERFACE, "WatchFired", self.watch_fired)
+        self.watch = None  # Id of the watch that is armed
+        self.pending = None  # QDBusPendingCallWatcher of an AddUserActiveWatch call
+        self.enabled = False
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if enabled and self.watch is None and self.pending is None:
+            self.pending = QDBusPendingCallWatcher(self.monitor.asyncCall("AddUserActiveWatch"), self)
+            self.pending.finished.connect(self.watch_added)
+        elif not enabled and self.watch is not None:
+            self.remove_watch()
+
+    def watch_added(self, pending):
+        self.pending = None
+        pending.deleteLater()
+        reply = QDBusPendingReply(pending)
+        if reply.isError():
+            print(f"Cannot watch for activity: {reply.error().message()}")
+            return
+        self.watch = reply.argumentAt(0)
+        if not self.enabled:
+            # Disabled again while the call was on its way
+            self.remove_watch()
+
+    def remove_watch(self):
+        self.monitor.asyncCall("RemoveWatch", QDBusArgument(self.watch, QMetaType.UInt))
+        self.watch = None
+
+    @pyqtSlot(QDBusMessage)
+    def watch_fired(self, message):
+        arguments = message.arguments()
+        if self.watch is not None and arguments and arguments[0] == self.watch:
+            # User active watches remove themselves once they fired
+            self.watch = None
+            self.activity.emit()
+
+    def close(self):
+        self.set_enabled(False)
@@ -0,0 +1,74 @@
+"""Single-instance lock and forwarding to the running instance.
+
+Qt-free, so a duplicate launch (e.g. from session autostart) is settled
+in milliseconds, before PyQt5 is even imported.
+"""
+
+import fcntl
+import os
+import time
+
+from .ctl import ControlError, send_command
+from .paths import instance_lock_path
+
+# How long to wait for a starting instance to open its control socket
+FORWARD_TIMEOUT = 5.0
+FORWARD_RETRY_DELAY = 0.05
+
+
+class InstanceLock:
+    """An flock() on a file in the runtime directory.
+
+    The kernel drops the lock when the holding process exits, however it
+    exits, so a crashed instance never blocks the next start. The file
+    itself is left in place and only holds the pid of the holder.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or instance_lock_path()
+        self.fd = None
+
+    def acquire(self):
+        """Take the lock; returns False if another process holds it"""
+        if self.fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self.fd = fd
+        return True
+
+    def release(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def holder(self):
+        """Pid written by the process holding the lock, if any"""
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+
+def forward_settings(path=None, timeout=FORWARD_TIMEOUT, **settings):
+    """Send `settings` (interval, duration and/or tiers) to the running instance.
+
+    The instance may have taken the lock but not opened its control socket
+    yet, so connecting is retried for up to `timeout` seconds. Returns the
+    reply; raises ControlError if the instance cannot be reached.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return send_command("set", path=path, **settings)
+        except ControlError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(FORWARD_RETRY_DELAY)
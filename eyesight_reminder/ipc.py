@@ -0,0 +1,347 @@
+import errno
+import json
+import os
+import socket
+
+from PyQt5.QtCore import QObject, QSocketNotifier
+
+from .sockets import listen_unix
+
+
+class StatusSubscriber:
+    """One connected status bar widget and what is still to be sent to it"""
+
+    def __init__(self, sock, server):
+        self.sock = sock
+        self.fd = sock.fileno()
+        self.in_flight = b""  # Rest of a line the kernel did not take yet
+        self.latest = None  # Newest line waiting behind it; older ones are dropped
+        self.read_notifier = QSocketNotifier(sock.fileno(), QSocketNotifier.Read, server)
+        self.write_notifier = QSocketNotifier(sock.fileno(), QSocketNotifier.Write, server)
+        self.write_notifier.setEnabled(False)
+
+    def close(self):
+        self.read_notifier.setEnabled(False)
+        self.write_notifier.setEnabled(False)
+        self.read_notifier.deleteLater()
+        self.write_notifier.deleteLater()
+        self.sock.close()
+
+
+class StatusServer(QObject):
+    """Stream state changes as newline-delimited JSON to any number of subscribers.
+
+    Everything runs on QSocketNotifiers in the GUI thread and never blocks:
+    a subscriber that cannot keep up only ever has the line currently being
+    written and the newest state queued, so intermediate states are coalesced
+    away instead of piling up. Between state changes nothing is woken up.
+    """
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.subscribers = {}
+        self.last_line = None
+        self.server = listen_unix(path)
+        if self.server is None:
+            self.accept_notifier = None
+            return
+        self.accept_notifier = QSocketNotifier(self.server.fileno(), QSocketNotifier.Read, self)
+        self.accept_notifier.activated.connect(self.accept_subscribers)
+
+    def accept_subscribers(self):
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"Error accepting status subscriber: {e}")
+                return
+            sock.setblocking(False)
+            subscriber = StatusSubscriber(sock, self)
+            self.subscribers[subscriber.fd] = subscriber
+            subscriber.read_notifier.activated.connect(self.read_subscriber)
+            subscriber.write_notifier.activated.connect(self.flush_subscriber)
+            # New subscribers start with the current state
+            if self.last_line is not None:
+                self.send(subscriber, self.last_line)
+
+    def publish(self, status):
+        """Send `status` (a JSON-serialisable dict) to every subscriber"""
+        line = (json.dumps(status, separators=(",", ":")) + "\n").encode()
+        self.last_line = line
+        for subscriber in list(self.subscribers.values()):
+            self.send(subscriber, line)
+
+    def send(self, subscriber, line):
+        if subscriber.in_flight:
+            # Still busy with an older line; only the newest state is worth sending
+            subscriber.latest = line
+            return
+        subscriber.in_flight = line
+        self.flush(subscriber)
+
+    def flush(self, subscriber):
+        while subscriber.in_flight:
+            try:
+                sent = subscriber.sock.send(subscriber.in_flight)
+            except BlockingIOError:
+                subscriber.write_notifier.setEnabled(True)
+                return
+            except OSError:
+                self.drop(subscriber)
+                return
+            subscriber.in_flight = subscriber.in_flight[sent:]
+            if not subscriber.in_flight and subscriber.latest is not None:
+                subscriber.in_flight, subscriber.latest = subscriber.latest, None
+        subscriber.write_notifier.setEnabled(False)
+
+    def flush_subscriber(self, fd):
+        subscriber = self.subscribers.get(int(fd))
+        if subscriber:
+            self.flush(subscriber)
+
+    def read_subscriber(self, fd):
+        subscriber = self.subscribers.get(int(fd))
+        if not subscriber:
+            return
+        # Subscribers have nothing to say; reading only detects hang-ups
+        try:
+            data = subscriber.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            if e.errno != errno.EINTR:
+                self.drop(subscriber)
+            return
+        if not data:
+            self.drop(subscriber)
+
+    def drop(self, subscriber):
+        self.subscribers.pop(subscriber.fd, None)
+        subscriber.close()
+
+    def close(self):
+        for subscriber in list(self.subscribers.values()):
+            self.drop(subscriber)
+        if self.server is not None:
+            self.accept_notifier.setEnabled(False)
+            self.server.close()
+            self.server = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def listen_tcp(host, port, backlog=16):
+    """Bind a non-blocking listening TCP socket, or return None if that fails"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    try:
+        server = socket.create_server((host, port), family=family, backlog=backlog)
+    except OSError as e:
+        print(f"Warning: cannot listen on {host}:{port}: {e.strerror}")
+        return None
+    server.setblocking(False)
+    return server
+
+
+def http_response(status, content_type, body, head=False):
+    body = body.encode()
+    header = (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode()
+    return header if head else header + body
+
+
+class ControlConnection:
+    """One control client: a single request line in, a single reply line out"""
+
+    def __init__(self, sock, server):
+        self.sock = sock
+        self.fd = sock.fileno()
+        self.request = b""
+        self.reply = b""
+        self.read_notifier = QSocketNotifier(self.fd, QSocketNotifier.Read, server)
+        self.write_notifier = QSocketNotifier(self.fd, QSocketNotifier.Write, server)
+        self.write_notifier.setEnabled(False)
+
+    def close(self):
+        self.read_notifier.setEnabled(False)
+        self.write_notifier.setEnabled(False)
+        self.read_notifier.deleteLater()
+        self.write_notifier.deleteLater()
+        self.sock.close()
+
+
+class ControlServer(QObject):
+    """Accept JSON commands from the ctl client on a Unix socket.
+
+    Each connection sends one JSON object terminated by a newline and gets
+    one JSON object back, produced by `handler`. Like StatusServer it runs
+    on QSocketNotifiers and never blocks the GUI thread.
+    """
+
+    MAX_REQUEST_SIZE = 4096
+
+    def __init__(self, path, handler, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.handler = handler
+        self.connections = {}
+        self.server = self.listen()
+        if self.server is None:
+            self.accept_notifier = None
+            return
+        self.accept_notifier = QSocketNotifier(self.server.fileno(), QSocketNotifier.Read, self)
+        self.accept_notifier.activated.connect(self.accept_connections)
+
+    def listen(self):
+        return listen_unix(self.path)
+
+    def accept_connections(self):
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"Error accepting control connection: {e}")
+                return
+            sock.setblocking(False)
+            connection = ControlConnection(sock, self)
+            self.connections[connection.fd] = connection
+            connection.read_notifier.activated.connect(self.read_connection)
+            connection.write_notifier.activated.connect(self.write_connection)
+
+    def read_connection(self, fd):
+        connection = self.connections.get(int(fd))
+        if not connection:
+            return
+        try:
+            data = connection.sock.recv(self.MAX_REQUEST_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.drop(connection)
+            return
+        if not data:
+            self.drop(connection)
+            return
+        connection.request += data
+        self.handle_request(connection)
+
+    def handle_request(self, connection):
+        """Reply once a whole request has been read"""
+        if b"\n" in connection.request:
+            line = connection.request.split(b"\n", 1)[0]
+            self.respond(connection, self.dispatch(line))
+        elif len(connection.request) > self.MAX_REQUEST_SIZE:
+            self.respond(connection, {"ok": False, "error": "request too long"})
+
+    def dispatch(self, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            return {"ok": False, "error": f"invalid request: {e}"}
+        try:
+            return self.handler(request)
+        except Exception as e:
+            # Report handler errors to the client instead of killing the app
+            return {"ok": False, "error": str(e)}
+
+    def respond(self, connection, reply):
+        self.send_reply(connection, (json.dumps(reply) + "\n").encode())
+
+    def send_reply(self, connection, data):
+        connection.read_notifier.setEnabled(False)
+        connection.reply = data
+        self.write_connection(connection.fd)
+
+    def write_connection(self, fd):
+        connection = self.connections.get(int(fd))
+        if not connection:
+            return
+        try:
+            sent = connection.sock.send(connection.reply)
+        except BlockingIOError:
+            connection.write_notifier.setEnabled(True)
+            return
+        except OSError:
+            self.drop(connection)
+            return
+        connection.reply = connection.reply[sent:]
+        if connection.reply:
+            connection.write_notifier.setEnabled(True)
+        else:
+            self.drop(connection)
+
+    def drop(self, connection):
+        self.connections.pop(connection.fd, None)
+        connection.close()
+
+    def close(self):
+        for connection in list(self.connections.values()):
+            self.drop(connection)
+        if self.server is not None:
+            self.accept_notifier.setEnabled(False)
+            self.server.close()
+            self.server = None
+            if self.path:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+
+class ScrapeServer(ControlServer):
+    """Serve the text `handler()` returns over HTTP, for metrics scrapers.
+
+    Listens on a Unix socket path or a (host, port) pair. Speaks just the
+    HTTP that scrapers need: every GET gets the text and the connection is
+    closed. Like ControlServer it never blocks the GUI thread.
+    """
+
+    MAX_REQUEST_SIZE = 8192
+
+    def __init__(self, address, handler, content_type, parent=None):
+        self.address = address
+        self.content_type = content_type
+        super().__init__(address if isinstance(address, str) else None, handler, parent)
+
+    def listen(self):
+        if self.path:
+            return listen_unix(self.path)
+        return listen_tcp(*self.address)
+
+    def handle_request(self, connection):
+        request = connection.request
+        if b"\r\n\r\n" not in request and b"\n\n" not in request:
+            if len(request) > self.MAX_REQUEST_SIZE:
+                self.send_reply(connection, http_response(
+                    "431 Request Header Fields Too Large", "text/plain", "request too long\n"
+                ))
+            return
+        method = request.split(b" ", 1)[0]
+        if method not in (b"GET", b"HEAD"):
+            self.send_reply(connection, http_response(
+                "405 Method Not Allowed", "text/plain", "only GET is supported\n"
+            ))
+            return
+        try:
+            body = self.handler()
+        except Exception as e:
+            # Report handler errors to the scraper instead of killing the app
+            self.send_reply(connection, http_response(
+                "500 Internal Server Error", "text/plain", f"{e}\n"
+            ))
+            return
+        self.send_reply(connection, http_response(
+            "200 OK", self.content_type, body, head=method == b"HEAD"
+        ))
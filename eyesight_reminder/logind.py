@@ -0,0 +1,35 @@
+"""Learn about suspend and resume from systemd-logind over D-Bus.
+
+Optional: without QtDBus or a system bus, a suspend is still noticed on the
+app's next wakeup (at most a minute later while counting down), or right
+away on SIGHUP.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtDBus import QDBusConnection, QDBusMessage
+
+
+class LogindSleepWatcher(QObject):
+    """Emits `resumed` when logind reports that the system woke up"""
+
+    resumed = pyqtSignal()
+    SERVICE = "org.freedesktop.login1"
+    PATH = "/org/freedesktop/login1"
+    INTERFACE = "org.freedesktop.login1.Manager"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.bus = QDBusConnection.systemBus()
+        if not self.bus.isConnected():
+            raise OSError("no D-Bus system bus")
+        if not self.bus.connect(
+            self.SERVICE, self.PATH, self.INTERFACE, "PrepareForSleep", self.prepare_for_sleep
+        ):
+            raise OSError("cannot subscribe to logind's PrepareForSleep")
+
+    @pyqtSlot(QDBusMessage)
+    def prepare_for_sleep(self, message):
+        arguments = message.arguments()
+        # True before suspending, False after resuming
+        if arguments and not arguments[0]:
+            self.resumed.emit()
@@ -0,0 +1,124 @@
+import bisect
+import math
+import time
+from contextlib import contextmanager
+
+
+class Histogram:
+    """Fixed-size histogram with logarithmic buckets.
+
+    Values are counted into a preallocated list of buckets, so recording is
+    cheap and memory use does not grow however long the process runs.
+    Percentiles are accurate to the bucket width (about 12% with the default
+    of 20 buckets per decade).
+    """
+
+    def __init__(self, low=0.01, high=600000.0, buckets_per_decade=20):
+        decades = math.log10(high / low)
+        count = int(math.ceil(decades * buckets_per_decade))
+        self.bounds = [low * 10 ** (i / buckets_per_decade) for i in range(count + 1)]
+        # One extra bucket each for values below `low` and above `high`
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (0-100)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * p / 100.0)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index >= len(self.bounds):
+                    return self.max
+                return min(self.bounds[index], self.max)
+        return self.max
+
+    def cumulative(self, limits):
+        """Number of values up to each of `limits`, accurate to the bucket width"""
+        result = []
+        index = 0
+        seen = 0
+        for limit in limits:
+            while index < len(self.bounds) and self.bounds[index] <= limit * (1 + 1e-9):
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """Named latency histograms, all in milliseconds, and named counters"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.monotonic()
+        self.version = 0  # Changes whenever anything is recorded or counted
+
+    def record(self, name, milliseconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(milliseconds)
+        self.version += 1
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        self.version += 1
+
+    def record_lateness(self, name, due):
+        """Record how late a timer callback ran relative to its `due` deadline"""
+        self.record(name, max(0.0, time.monotonic() - due) * 1000)
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        return {
+            "uptime": time.monotonic() - self.started,
+            "histograms": {name: h.summary() for name, h in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def format_summary(summary):
+    """Render Metrics.summary() output as a text table"""
+    lines = [
+        f"Metrics after {summary['uptime']:.0f}s (milliseconds)",
+        f"{'name':<32}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}",
+    ]
+    for name, h in summary["histograms"].items():
+        lines.append(
+            f"{name:<32}{h['count']:>8}{h['mean']:>10.2f}{h['p50']:>10.2f}"
+            f"{h['p90']:>10.2f}{h['p99']:>10.2f}{h['max']:>10.2f}"
+        )
+    if summary.get("counters"):
+        lines.append("")
+        lines.extend(f"{name:<32}{value:>8g}" for name, value in summary["counters"].items())
+    return "\n".join(lines)
@@ -0,0 +1,143 @@
+"""Render the metrics in the OpenMetrics text format for scrapers.
+
+Counters and histograms only change when something happens, so their text
+is rendered once per change and cached; a scrape only adds the few gauges
+that are read fresh (memory, pause state). Does not import Qt.
+"""
+
+import os
+import time
+
+from .engine import OUTCOMES, PAUSED
+from .paths import openmetrics_socket_path
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# The outcomes the application counts as breaks.<outcome>; pauses are counted in seconds
+BREAK_OUTCOMES = [outcome for outcome in OUTCOMES if outcome != PAUSED]
+
+# Counters of Metrics.count(), by the part of their name before the dot:
+#   prefix -> (metric family, label for the part after the dot, help)
+COUNTERS = {
+    "breaks_started": ("eyesight_breaks_started", None, "Breaks shown."),
+    "breaks": ("eyesight_breaks", "outcome",
+               f"Breaks by how they ended: {', '.join(BREAK_OUTCOMES[:-1])} or {BREAK_OUTCOMES[-1]}."),
+    "wakeups": ("eyesight_wakeups", "source", "Times the process woke up, by what woke it."),
+}
+
+# Histograms of Metrics.record() exported with their buckets, in milliseconds
+HISTOGRAMS = {
+    "timer_lateness": ("eyesight_timer_lateness_seconds", "timer",
+                       "How late timers fired relative to their deadline."),
+    "hook_runtime": ("eyesight_hook_duration_seconds", "hook", "How long hooks ran."),
+}
+# Upper bounds of the exported buckets, a decade each
+BUCKETS_MS = (0.1, 1.0, 10.0, 100.0, 1000.0, 10000.0)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def parse_address(text):
+    """A socket path, or a (host, port) pair from `[HOST:]PORT`.
+
+    "unix" stands for the default socket in the runtime directory, and a
+    port without a host listens on localhost only.
+    """
+    if text == "unix":
+        return openmetrics_socket_path()
+    if text.startswith("/"):
+        return text
+    host, _, port = text.rpartition(":")
+    try:
+        port = int(port)
+    except ValueError:
+        raise ValueError(f"expected 'unix', a socket path or [HOST:]PORT, got {text!r}")
+    if not 0 < port < 65536:
+        raise ValueError(f"invalid port: {port}")
+    return (host.strip("[]") or "127.0.0.1", port)
+
+
+def resident_memory():
+    """Resident set size of this process in bytes, or None if unknown"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def sample(name, value, labels=None):
+    if labels:
+        label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+        name = f"{name}{{{label_text}}}"
+    return f"{name} {value}"
+
+
+def family(name, kind, help_text, unit=None):
+    lines = [f"# TYPE {name} {kind}", f"# HELP {name} {help_text}"]
+    if unit:
+        lines.append(f"# UNIT {name} {unit}")
+    return lines
+
+
+class OpenMetricsRenderer:
+    """Render a Metrics object, caching the text until it changes"""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.cached_version = None
+        self.cached_text = ""
+        self.started_at = time.time() - (time.monotonic() - metrics.started)
+
+    def render(self, gauges=()):
+        """The exposition text; `gauges` are (name, kind, help, unit, value) read just now"""
+        if self.cached_version != self.metrics.version:
+            self.cached_text = self.render_recorded()
+            self.cached_version = self.metrics.version
+        lines = []
+        for name, kind, help_text, unit, value in self.process_gauges() + list(gauges):
+            if value is None:
+                continue
+            lines.extend(family(name, kind, help_text, unit))
+            lines.append(sample(name + "_total" if kind == "counter" else name, value))
+        lines.append("# EOF\n")
+        return self.cached_text + "\n".join(lines)
+
+    def process_gauges(self):
+        """Gauges about the process itself, named as Prometheus clients name them"""
+        return [
+            ("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.", "bytes",
+             resident_memory()),
+            ("process_start_time_seconds", "gauge", "Start time of the process since the Unix epoch.",
+             "seconds", round(self.started_at, 3)),
+        ]
+
+    def render_recorded(self):
+        lines = []
+        grouped = {}
+        for name, value in sorted(self.metrics.counters.items()):
+            prefix, _, label = name.partition(".")
+            if prefix in COUNTERS:
+                grouped.setdefault(prefix, []).append((label, value))
+        for prefix, (metric, label_name, help_text) in COUNTERS.items():
+            lines.extend(family(metric, "counter", help_text))
+            for label, value in grouped.get(prefix, ()):
+                labels = {label_name: label} if label_name and label else None
+                lines.append(sample(metric + "_total", value, labels))
+            if prefix not in grouped and not label_name:
+                lines.append(sample(metric + "_total", 0))
+
+        for prefix, (metric, label_name, help_text) in HISTOGRAMS.items():
+            lines.extend(family(metric, "histogram", help_text, "seconds"))
+            for name, histogram in sorted(self.metrics.histograms.items()):
+                histogram_prefix, _, label = name.partition(".")
+                if histogram_prefix != prefix:
+                    continue
+                labels = {label_name: label} if label else {}
+                for limit, count in zip(BUCKETS_MS, histogram.cumulative(BUCKETS_MS)):
+                    lines.append(sample(metric + "_bucket", count, dict(labels, le=f"{limit / 1000:g}")))
+                lines.append(sample(metric + "_bucket", histogram.count, dict(labels, le="+Inf")))
+                lines.append(sample(metric + "_count", histogram.count, labels))
+                lines.append(sample(metric + "_sum", histogram.total / 1000, labels))
+        return "\n".join(lines) + "\n"
+
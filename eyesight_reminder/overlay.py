@@ -0,0 +1,185 @@
+from PyQt5.QtCore import QObject, QPointF, QRectF, Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QPainter, QStaticText, QTransform
+from PyQt5.QtWidgets import QWidget
+
+BACKGROUND = QColor(Qt.black)
+FOREGROUND = QColor(Qt.white)
+FONT_FAMILY = "Arial"
+FONT_SIZE = 24
+
+# (logical DPI, device pixel ratio) -> (font, font metrics)
+_font_cache = {}
+
+
+def overlay_font(widget):
+    """The overlay font and its metrics for the screen `widget` is on"""
+    key = (widget.logicalDpiY(), widget.devicePixelRatioF())
+    cached = _font_cache.get(key)
+    if cached is None:
+        font = QFont(FONT_FAMILY, FONT_SIZE, QFont.Bold)
+        cached = _font_cache[key] = (font, QFontMetricsF(font, widget))
+    return cached
+
+
+class OverlayWindow(QWidget):
+    """Full-screen black window with centred lines of white text.
+
+    Paints the background and text itself instead of going through
+    stylesheets and a QLabel. Each line is kept as a prepared QStaticText,
+    so an unchanged line is never laid out again, and changing the text
+    only repaints the area of the lines that changed.
+    """
+
+    def __init__(self, on_shown=None):
+        super().__init__()
+        self.on_shown = on_shown
+        self.setAttribute(Qt.WA_OpaquePaintEvent)  # paintEvent() fills every pixel
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        self.text = ""
+        self.lines = []  # [(line text, QStaticText, QRectF)] in paint order
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.on_shown:
+            self.on_shown(self)
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        old_lines = self.lines
+        self.layout_lines()
+        if not self.isVisible():
+            return
+        dirty = QRectF()
+        for index in range(max(len(old_lines), len(self.lines))):
+            old = old_lines[index] if index < len(old_lines) else None
+            new = self.lines[index] if index < len(self.lines) else None
+            if old and new and old[0] == new[0] and old[2] == new[2]:
+                continue
+            for line in (old, new):
+                if line:
+                    dirty = dirty.united(line[2])
+        if not dirty.isEmpty():
+            self.update(dirty.toAlignedRect().adjusted(-1, -1, 1, 1))
+
+    def layout_lines(self):
+        """Centre the lines of the text, reusing the prepared ones that did not change"""
+        font, metrics = overlay_font(self)
+        prepared = {line: static for line, static, _ in self.lines}
+        texts = self.text.split("\n") if self.text else []
+        line_height = metrics.lineSpacing()
+        top = (self.height() - line_height * len(texts)) / 2
+        lines = []
+        for index, line in enumerate(texts):
+            static = prepared.get(line)
+            if static is None:
+                static = QStaticText(line)
+                static.setTextFormat(Qt.PlainText)
+                static.setPerformanceHint(QStaticText.AggressiveCaching)
+                static.prepare(QTransform(), font)
+            width = metrics.horizontalAdvance(line)
+            rect = QRectF((self.width() - width) / 2, top + index * line_height, width, line_height)
+            lines.append((line, static, rect))
+        self.lines = lines
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.layout_lines()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), BACKGROUND)
+        painter.setPen(FOREGROUND)
+        painter.setFont(overlay_font(self)[0])
+        area = QRectF(event.rect())
+        for _, static, rect in self.lines:
+            if rect.intersects(area):
+                painter.drawStaticText(QPointF(rect.left(), rect.top()), static)
+
+
+def create_overlay(screen, on_shown=None):
+    """Build a hidden full-screen overlay window for `screen`"""
+    window = OverlayWindow(on_shown)
+    window.setWindowFlags(
+        Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool
+    )
+    place_overlay(window, screen)
+    return window
+
+
+def place_overlay(window, screen):
+    window.setGeometry(screen.geometry())
+    # The new screen may have a different DPI
+    window.lines = []
+    window.layout_lines()
+    window.update()
+
+
+class OverlayPool(QObject):
+    """One reusable overlay window per screen.
+
+    Building the windows and fonts is what makes a break start visibly
+    late, so each screen's overlay is built once and then only shown and
+    hidden. Screens that are added, removed or change geometry update just
+    their own entry.
+    """
+
+    def __init__(self, app, on_shown=None):
+        super().__init__(app)
+        self.app = app
+        self.on_shown = on_shown  # Called with each overlay as it is shown
+        self.overlays = {}  # QScreen -> overlay window
+        self.text = ""
+        self.visible = False
+        app.screenAdded.connect(self.add_screen)
+        app.screenRemoved.connect(self.remove_screen)
+
+    def prewarm(self):
+        """Build overlays for all current screens ahead of the first break"""
+        for screen in self.app.screens():
+            self.add_screen(screen)
+
+    def add_screen(self, screen):
+        if screen in self.overlays:
+            return
+        overlay = create_overlay(screen, self.on_shown)
+        overlay.set_text(self.text)
+        self.overlays[screen] = overlay
+        screen.geometryChanged.connect(lambda geometry, screen=screen: self.move_screen(screen))
+        if self.visible:
+            overlay.showFullScreen()
+
+    def remove_screen(self, screen):
+        overlay = self.overlays.pop(screen, None)
+        if overlay is not None:
+            overlay.close()
+            overlay.deleteLater()
+
+    def move_screen(self, screen):
+        overlay = self.overlays.get(screen)
+        if overlay is not None:
+            place_overlay(overlay, screen)
+
+    def set_text(self, text):
+        self.text = text
+        for overlay in self.overlays.values():
+            overlay.set_text(text)
+
+    def show(self):
+        # Screens may have appeared before the pool was warmed up
+        self.prewarm()
+        self.visible = True
+        for overlay in self.overlays.values():
+            overlay.showFullScreen()
+
+    def hide(self):
+        self.visible = False
+        for overlay in self.overlays.values():
+            overlay.hide()
+
+    def clear(self):
+        """Delete all overlays, e.g. when the application quits"""
+        self.visible = False
+        for screen in list(self.overlays):
+            self.remove_screen(screen)
@@ -0,0 +1,83 @@
+import os
+import stat
+import tempfile
+
+APP_DIR_NAME = "eyesight-reminder"
+
+
+def runtime_dir():
+    """Per-user directory for sockets and status files, created on demand"""
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base and os.path.isdir(base):
+        path = os.path.join(base, APP_DIR_NAME)
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        return path
+    # No session runtime dir (e.g. started outside a login session)
+    path = os.path.join(tempfile.gettempdir(), f"{APP_DIR_NAME}-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    # Anyone can create it first in the shared temporary directory
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700:
+        raise PermissionError(f"{path} is not a private directory of this user, not using it")
+    return path
+
+
+def status_segment_path():
+    return os.path.join(runtime_dir(), "status")
+
+
+def status_socket_path():
+    return os.path.join(runtime_dir(), "status.sock")
+
+
+def control_socket_path():
+    return os.path.join(runtime_dir(), "control.sock")
+
+
+def instance_lock_path():
+    return os.path.join(runtime_dir(), "instance.lock")
+
+
+def activity_socket_path():
+    return os.path.join(runtime_dir(), "activity.sock")
+
+
+def state_dir():
+    """Per-user directory for data kept across restarts, created on demand"""
+    base = os.environ.get("XDG_STATE_HOME")
+    if not base or not os.path.isabs(base):
+        base = os.path.join(os.path.expanduser("~"), ".local", "state")
+    path = os.path.join(base, APP_DIR_NAME)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def history_path():
+    return os.path.join(state_dir(), "history")
+
+
+def history_rollup_path():
+    return os.path.join(state_dir(), "history-rollups.json")
+
+
+def openmetrics_socket_path():
+    return os.path.join(runtime_dir(), "metrics.sock")
+
+
+def config_dir():
+    """Per-user directory for the settings file, created on demand"""
+    base = os.environ.get("XDG_CONFIG_HOME")
+    if not base or not os.path.isabs(base):
+        base = os.path.join(os.path.expanduser("~"), ".config")
+    path = os.path.join(base, APP_DIR_NAME)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def config_path():
+    return os.path.join(config_dir(), "config.ini")
+
+
+def daemon_socket_path():
+    """Socket of the scheduler daemon, shared by every user of the machine"""
+    return os.path.join("/run", APP_DIR_NAME, "scheduler.sock")
@@ -0,0 +1,241 @@
+"""Know which of a set of programs are running, without rescanning /proc.
+
+ProcessWatcher keeps an index of the running processes whose name is in
+a list. It is built by one scan of /proc and then kept up to date by
+events: the kernel's process connector reports every exec() and rename
+over netlink, filtered in the kernel down to just those two, and every
+indexed process gets a pidfd that becomes readable when it exits. The
+process connector needs CAP_NET_ADMIN; without it new processes are found
+every SCAN_INTERVAL seconds by a scan that reads only the comm of every
+process and looks closer at the new ones and those whose comm changed
+(an exec() changes it).
+"""
+
+import ctypes
+import os
+import socket
+import struct
+
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer
+
+SCAN_INTERVAL = 10.0
+
+# From linux/netlink.h, linux/connector.h and linux/cn_proc.h
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+NLMSG_DONE = 3
+PROC_CN_MCAST_LISTEN = 1
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_COMM = 0x00000200
+PROC_EVENT_EXIT = 0x80000000
+NLMSG_HEADER = struct.Struct("=IHHII")  # length, type, flags, sequence, port
+CN_MSG = struct.Struct("=IIIIHH")  # index, value, sequence, ack, length, flags
+EVENT = struct.Struct("=IIQii")  # what, cpu, timestamp, pid, thread group id
+EVENT_OFFSET = NLMSG_HEADER.size + CN_MSG.size
+
+# From linux/filter.h: a classic BPF program run on every message
+SO_ATTACH_FILTER = 26
+BPF_LD_W_ABS = 0x20
+BPF_JEQ_K = 0x15
+BPF_RET_K = 0x06
+SOCK_FILTER = struct.Struct("=HBBI")
+
+
+def list_pids():
+    return {int(name) for name in os.listdir("/proc") if name.isdigit()}
+
+
+def read_comm(pid):
+    """The name of `pid` as the kernel knows it, or None if it is gone"""
+    try:
+        with open(f"/proc/{pid}/comm", "rb") as f:
+            return f.read().rstrip(b"\n").decode(errors="replace")
+    except OSError:
+        return None
+
+
+def process_names(pid):
+    """The names `pid` goes by: its comm and the file name of its argv[0]"""
+    comm = read_comm(pid)
+    if comm is None:
+        return set()
+    names = {comm}
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            argv0 = f.read().split(b"\0", 1)[0]
+        if argv0:
+            names.add(os.path.basename(argv0).decode(errors="replace"))
+    except OSError:
+        # Gone already, or a kernel thread
+        pass
+    return names
+
+
+def event_filter(events):
+    """A BPF program keeping only process connector messages of `events`"""
+    # Loads are big endian, the event type is in host order
+    keys = [int.from_bytes(struct.pack("=I", event), "big") for event in events]
+    program = [(BPF_LD_W_ABS, 0, 0, EVENT_OFFSET)]
+    for index, key in enumerate(keys):
+        # Jump to the accepting return at the very end if it matches
+        program.append((BPF_JEQ_K, len(keys) - index, 0, key))
+    program += [(BPF_RET_K, 0, 0, 0), (BPF_RET_K, 0, 0, 0xFFFFFFFF)]
+    return b"".join(SOCK_FILTER.pack(*instruction) for instruction in program)
+
+
+def open_process_connector(events):
+    """A non-blocking netlink socket receiving `events`; OSError if not allowed"""
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+    try:
+        program = ctypes.create_string_buffer(event_filter(events))
+        fprog = struct.pack("@HP", len(program.raw) // SOCK_FILTER.size, ctypes.addressof(program))
+        sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+        sock.bind((0, CN_IDX_PROC))
+        operation = struct.pack("=I", PROC_CN_MCAST_LISTEN)
+        message = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(operation), 0) + operation
+        sock.send(NLMSG_HEADER.pack(NLMSG_HEADER.size + len(message), NLMSG_DONE, 0, 0, 0) + message)
+    except OSError:
+        sock.close()
+        raise
+    sock.setblocking(False)
+    return sock
+
+
+class ProcessWatcher(QObject):
+    """An index of running processes named in `names`, kept up to date by events"""
+
+    def __init__(self, names=(), parent=None, use_connector=True, scan_interval=SCAN_INTERVAL):
+        super().__init__(parent)
+        self.names = set()
+        self.use_connector = use_connector
+        self.running = {}  # pid -> matching name
+        self.pidfds = {}  # pid -> (pidfd, notifier)
+        self.comms = {}  # pid -> comm, as the last scan found them
+        self.connector = None
+        self.connector_notifier = None
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setInterval(int(scan_interval * 1000))
+        self.scan_timer.timeout.connect(self.scan)
+        self.configure(names)
+
+    def active(self):
+        """Whether any of the programs runs; O(1)"""
+        return bool(self.running)
+
+    def running_names(self):
+        return sorted(set(self.running.values()))
+
+    def configure(self, names):
+        """Watch for `names` instead, starting from a fresh scan"""
+        self.stop()
+        self.names = set(names)
+        if not self.names:
+            return
+        if self.use_connector:
+            events = [PROC_EVENT_EXEC, PROC_EVENT_COMM]
+            if not hasattr(os, "pidfd_open"):
+                events.append(PROC_EVENT_EXIT)
+            try:
+                self.connector = open_process_connector(events)
+            except OSError as e:
+                print(f"Looking for new processes every {self.scan_timer.interval() // 1000}s "
+                      f"(no process events: {e.strerror})")
+        if self.connector is not None:
+            self.connector_notifier = QSocketNotifier(self.connector.fileno(), QSocketNotifier.Read, self)
+            self.connector_notifier.activated.connect(self.read_events)
+        else:
+            self.scan_timer.start()
+        self.scan()
+
+    def scan(self):
+        """Look at the processes that appeared or changed their comm since the last scan"""
+        comms = {}
+        for pid in list_pids():
+            comm = read_comm(pid)
+            if comm is None:
+                continue
+            comms[pid] = comm
+            if self.comms.get(pid) != comm:
+                self.check(pid)
+        # Processes without a pidfd are only noticed to be gone here
+        for pid in set(self.running) - set(self.pidfds) - set(comms):
+            self.remove(pid)
+        self.comms = comms
+        if self.connector is not None and set(self.running) <= set(self.pidfds):
+            self.scan_timer.stop()
+
+    def check(self, pid):
+        matching = self.names & process_names(pid)
+        if matching:
+            self.add(pid, min(matching))
+        elif pid in self.running:
+            # Renamed or replaced by another program
+            self.remove(pid)
+
+    def add(self, pid, name):
+        if pid in self.running:
+            return
+        self.running[pid] = name
+        if not hasattr(os, "pidfd_open"):
+            return
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            del self.running[pid]
+            return
+        except OSError:
+            # Out of file descriptors, say: scans notice when it is gone
+            if not self.scan_timer.isActive():
+                self.scan_timer.start()
+            return
+        notifier = QSocketNotifier(pidfd, QSocketNotifier.Read, self)
+        notifier.activated.connect(lambda fd, pid=pid: self.remove(pid))
+        self.pidfds[pid] = (pidfd, notifier)
+
+    def remove(self, pid):
+        self.running.pop(pid, None)
+        entry = self.pidfds.pop(pid, None)
+        if entry is not None:
+            pidfd, notifier = entry
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+            os.close(pidfd)
+
+    def read_events(self):
+        while True:
+            try:
+                data = self.connector.recv(4096)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                # ENOBUFS: events were lost; catch up with a scan
+                print(f"Process events lost ({e.strerror}), rescanning")
+                self.scan()
+                return
+            if len(data) < EVENT_OFFSET + EVENT.size:
+                continue
+            what, _, _, pid, tgid = EVENT.unpack_from(data, EVENT_OFFSET)
+            # Threads exec and rename too; only whole processes matter
+            if pid != tgid:
+                continue
+            if what == PROC_EVENT_EXIT:
+                self.remove(pid)
+            else:
+                self.check(pid)
+
+    def stop(self):
+        self.scan_timer.stop()
+        for pid in list(self.running):
+            self.remove(pid)
+        self.comms = {}
+        if self.connector is not None:
+            self.connector_notifier.setEnabled(False)
+            self.connector_notifier.deleteLater()
+            self.connector_notifier = None
+            self.connector.close()
+            self.connector = None
+
+    def close(self):
+        self.stop()
+        self.names = set()
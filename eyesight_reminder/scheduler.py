@@ -0,0 +1,103 @@
+import math
+
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+
+from .clocks import ClockWatch
+from .engine import EngineListener
+
+# A timer firing this close to its deadline counts as on time
+EARLY_TOLERANCE = 0.005
+
+
+class BreakScheduler(QObject, EngineListener):
+    """Drive a BreakEngine from the Qt event loop.
+
+    The engine keeps the schedule as absolute deadlines; this adapter arms a
+    single single-shot timer for whichever deadline comes next, so nothing
+    has to wake up while waiting, and turns the engine's callbacks into Qt
+    signals.
+
+    The monotonic clock stops during suspend, so check_clocks() (called on
+    every wakeup of the app, including this timer's) hands the time spent
+    suspended to the engine as rest.
+    """
+
+    break_started = pyqtSignal(float)  # Carries the deadline the break was due at
+    break_ended = pyqtSignal()
+    changed = pyqtSignal()
+    clock_jumped = pyqtSignal(float, float)  # Seconds suspended, seconds the wall clock stepped
+    break_recorded = pyqtSignal(object)  # Carries the engine's BreakRecord
+
+    def __init__(self, engine, parent=None, metrics=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.metrics = metrics
+        engine.listener = self
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        # Coarse timers may fire up to 5% early or late, which is a full
+        # minute on a 20 minute interval
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._on_timer)
+        self.armed_for = None
+        self.clock_watch = ClockWatch()
+        self.resync()
+
+    def on_break_started(self, due):
+        self.break_started.emit(due)
+
+    def on_break_ended(self):
+        self.break_ended.emit()
+
+    def on_changed(self):
+        self.resync()
+        self.changed.emit()
+
+    def on_break_recorded(self, record):
+        self.break_recorded.emit(record)
+
+    def resync(self):
+        """Re-arm the timer from the engine's next deadline.
+
+        Also call this after the process was suspended or the event loop
+        stalled; an overdue deadline fires right away, otherwise the timer
+        is re-armed for whatever time is actually left.
+        """
+        self.timer.stop()
+        self.armed_for = self.engine.next_deadline()
+        if self.armed_for is None:
+            return
+        delay = max(0.0, self.armed_for - self.engine.clock())
+        self.timer.start(int(math.ceil(delay * 1000)))
+
+    def check_clocks(self):
+        """Act on a suspend or wall clock step since the last check"""
+        slept, step = self.clock_watch.check()
+        if not slept and not step:
+            return False
+        if slept:
+            self.engine.credit_sleep(slept)
+        self.clock_jumped.emit(slept, step)
+        return True
+
+    def stop(self):
+        self.timer.stop()
+        self.armed_for = None
+
+    def _on_timer(self):
+        if self.metrics:
+            self.metrics.count("wakeups.break_timer")
+        self.check_clocks()
+        due = self.armed_for
+        # Timers can fire a little early (or be restarted by the platform
+        # after a resume); re-arm for the rest instead of acting early
+        if due is None or self.engine.clock() < due - EARLY_TOLERANCE:
+            self.resync()
+            return
+        if self.metrics:
+            name = "timer_lateness.break_end" if self.engine.in_break() else "timer_lateness.break"
+            self.metrics.record_lateness(name, due)
+        # Anything within the tolerance counts as due
+        self.engine.advance(max(due, self.engine.clock()))
+        self.resync()
@@ -0,0 +1,170 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QFormLayout,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QMainWindow,
+    QPushButton,
+    QSpinBox,
+    QVBoxLayout,
+    QWidget,
+)
+
+
+class SettingsWindow(QMainWindow):
+    def __init__(self, app, break_interval=1200, break_duration=20, tiers=()):
+        super().__init__()
+        self.app = app  # Store the app reference
+        self.setWindowTitle("Eyesight Reminder Settings")
+        self.setMinimumWidth(350)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
+        
+        # Make sure dialog doesn't close the app
+        self.setAttribute(Qt.WA_QuitOnClose, False)
+        # A fresh window is built every time the settings are opened, so
+        # don't keep closed ones around
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        
+        # Store initial values
+        self.initial_break_interval = break_interval
+        self.initial_break_duration = break_duration
+        self.initial_tiers = [tuple(tier) for tier in tiers]
+        
+        # Create central widget and main layout
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+        
+        # Add info label about 20-20-20 rule
+        info_label = QLabel(
+            "The 20-20-20 rule recommends looking at something\n"
+            "20 feet away for 20 seconds every 20 minutes to\n"
+            "reduce eye strain."
+        )
+        info_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(info_label)
+        
+        # Add description about current default settings
+        current_settings_label = QLabel(
+            f"Current settings: Break every {break_interval//60} minutes for {break_duration} seconds"
+        )
+        current_settings_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(current_settings_label)
+        
+        # Add a small spacer
+        layout.addSpacing(10)
+        
+        form_layout = QFormLayout()
+        
+        # Interval setting - simplified layout
+        self.interval_spinbox = QSpinBox()
+        self.interval_spinbox.setMinimum(60)  # Minimum 1 minute
+        self.interval_spinbox.setMaximum(7200)  # Maximum 2 hours
+        self.interval_spinbox.setValue(break_interval)
+        self.interval_spinbox.setSuffix(" seconds")
+        
+        # Show the interval in minutes for reference
+        self.interval_minutes_label = QLabel(f"({break_interval // 60} minutes)")
+        
+        form_layout.addRow("Break interval:", self.interval_spinbox)
+        form_layout.addRow("", self.interval_minutes_label)
+        self.interval_spinbox.valueChanged.connect(self.update_minutes_label)
+        
+        # Duration setting - simplified layout
+        self.duration_spinbox = QSpinBox()
+        self.duration_spinbox.setMinimum(5)  # Minimum 5 seconds
+        self.duration_spinbox.setMaximum(300)  # Maximum 5 minutes
+        self.duration_spinbox.setValue(break_duration)
+        self.duration_spinbox.setSuffix(" seconds")
+        form_layout.addRow("Break duration:", self.duration_spinbox)
+        
+        layout.addLayout(form_layout)
+        layout.addSpacing(10)
+
+        # Additional, usually longer breaks on their own schedules
+        tiers_group = QGroupBox("Longer breaks")
+        tiers_group_layout = QVBoxLayout(tiers_group)
+        self.tiers_layout = QVBoxLayout()
+        tiers_group_layout.addLayout(self.tiers_layout)
+        self.tier_rows = []  # (row widget, interval spinbox, duration spinbox)
+        for interval, duration in tiers:
+            self.add_tier_row(interval, duration)
+        add_tier_button = QPushButton("Add break")
+        add_tier_button.clicked.connect(lambda: self.add_tier_row(3600, 300))
+        tiers_group_layout.addWidget(add_tier_button)
+        layout.addWidget(tiers_group)
+        layout.addSpacing(10)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.save_button = QPushButton("Save")
+        self.cancel_button = QPushButton("Cancel")
+        
+        self.save_button.clicked.connect(self.save_settings)
+        self.cancel_button.clicked.connect(self.close)
+        
+        button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.cancel_button)
+        
+        layout.addLayout(button_layout)
+    
+    def add_tier_row(self, interval, duration):
+        row = QWidget()
+        row_layout = QHBoxLayout(row)
+        row_layout.setContentsMargins(0, 0, 0, 0)
+
+        interval_spinbox = QSpinBox()
+        interval_spinbox.setRange(60, 24 * 3600)
+        interval_spinbox.setValue(interval)
+        interval_spinbox.setSuffix(" s")
+        duration_spinbox = QSpinBox()
+        duration_spinbox.setRange(5, 3600)
+        duration_spinbox.setValue(duration)
+        duration_spinbox.setSuffix(" s")
+        remove_button = QPushButton("Remove")
+
+        row_layout.addWidget(QLabel("Every"))
+        row_layout.addWidget(interval_spinbox)
+        row_layout.addWidget(QLabel("for"))
+        row_layout.addWidget(duration_spinbox)
+        row_layout.addWidget(remove_button)
+
+        entry = (row, interval_spinbox, duration_spinbox)
+        remove_button.clicked.connect(lambda: self.remove_tier_row(entry))
+        self.tier_rows.append(entry)
+        self.tiers_layout.addWidget(row)
+
+    def remove_tier_row(self, entry):
+        self.tier_rows.remove(entry)
+        entry[0].deleteLater()
+
+    def update_minutes_label(self, value):
+        minutes = value // 60
+        self.interval_minutes_label.setText(f"({minutes} minute{'s' if minutes != 1 else ''})")
+    
+    def get_settings(self):
+        return {
+            'break_interval': self.interval_spinbox.value(),
+            'break_duration': self.duration_spinbox.value(),
+            'tiers': [
+                (interval.value(), duration.value()) for _, interval, duration in self.tier_rows
+            ],
+        }
+        
+    def settings_changed(self):
+        """Check if settings have been changed from their initial values"""
+        return (self.interval_spinbox.value() != self.initial_break_interval or
+                self.duration_spinbox.value() != self.initial_break_duration or
+                self.get_settings()['tiers'] != self.initial_tiers)
+    
+    def save_settings(self):
+        """Save settings to the app and its config file if they've changed"""
+        if self.settings_changed():
+            new_settings = self.get_settings()
+            self.app.save_settings(new_settings)
+        self.close()
+        
+    def closeEvent(self, event):
+        """Override close event to handle window closing"""
+        super().closeEvent(event)
@@ -0,0 +1,442 @@
+"""Replay recorded activity through break policies to compare them.
+
+`eyesight-reminder simulate` runs a trace of when the user was at the
+keyboard through BreakEngine, with the same break, idle and pause logic
+the application uses, once per (interval, duration) policy of a grid, on
+a VirtualClock. The breaks each policy would have shown are then scored
+against the trace: how many started while the user was active, how much
+of them overlapped time the user was away anyway, and the longest active
+stretch without any rest. A schedule can only be replayed break by break,
+since every break restarts the countdown, but the scoring looks up all
+the breaks at once: vectorized with NumPy if it is installed, with bisect
+otherwise.
+
+A trace is a CSV file of `start,end,state` rows, `state` being `active`,
+`idle` or `paused` and the times Unix timestamps or ISO 8601, or the
+application's own break history. Time a CSV trace does not cover counts
+as idle. Does not import Qt.
+"""
+
+import argparse
+import bisect
+import csv
+import datetime
+import itertools
+import json
+import sys
+import time
+
+from .config import ConfigError, load_config
+from .engine import IDLE, PAUSED, SUSPENDED, BreakEngine, EngineListener, VirtualClock
+from .history import MAGIC, format_duration, read_entries
+from .paths import history_path
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ACTIVE = "active"
+STATES = (ACTIVE, "idle", PAUSED)
+
+# The history only has records around breaks; a longer stretch without any
+# is taken as the reminder not running rather than as the user working
+MAX_HISTORY_GAP = 3 * 3600
+
+
+class TraceError(Exception):
+    pass
+
+
+def merge(periods):
+    """Sorted, disjoint (start, end) periods covering the same time as `periods`"""
+    merged = []
+    for start, end in sorted(periods):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(period) for period in merged]
+
+
+def subtract(periods, others):
+    """The parts of merged `periods` not covered by merged `others`"""
+    result = []
+    others = iter(others)
+    other = next(others, None)
+    for start, end in periods:
+        while other is not None and start < end:
+            if other[1] <= start:
+                other = next(others, None)
+            elif other[0] >= end:
+                break
+            else:
+                if other[0] > start:
+                    result.append((start, other[0]))
+                start = other[1]
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+class Periods:
+    """Sorted, disjoint periods, looked up for many times at once"""
+
+    def __init__(self, periods):
+        self.periods = periods
+        self.starts = [start for start, _ in periods]
+        self.ends = [end for _, end in periods]
+        # Seconds covered by the periods before each one, and by all of them
+        self.covered = list(itertools.accumulate(
+            (end - start for start, end in periods), initial=0.0,
+        ))
+        self.arrays = None
+
+    def __len__(self):
+        return len(self.periods)
+
+    def numpy_arrays(self):
+        if self.arrays is None:
+            self.arrays = tuple(numpy.array(values, dtype=float)
+                                for values in (self.starts, self.ends, self.covered))
+        return self.arrays
+
+    def period_at(self, when):
+        """Index of the period `when` falls into, or None"""
+        index = bisect.bisect_right(self.starts, when) - 1
+        if index >= 0 and when < self.ends[index]:
+            return index
+        return None
+
+    def contains(self, times):
+        """Whether each of `times` falls into one of the periods"""
+        if numpy is None:
+            return [self.period_at(when) is not None for when in times]
+        times = numpy.asarray(times, dtype=float)
+        if not self.periods:
+            return numpy.zeros(len(times), dtype=bool)
+        starts, ends, _ = self.numpy_arrays()
+        index = numpy.searchsorted(starts, times, side="right") - 1
+        return (index >= 0) & (times < ends[numpy.maximum(index, 0)])
+
+    def covered_before(self, times):
+        """Seconds of the periods before each of `times`"""
+        if numpy is None:
+            result = []
+            for when in times:
+                index = bisect.bisect_right(self.starts, when)
+                if index == 0:
+                    result.append(0.0)
+                else:
+                    start, end = self.periods[index - 1]
+                    result.append(self.covered[index - 1] + min(when, end) - start)
+            return result
+        times = numpy.asarray(times, dtype=float)
+        if not self.periods:
+            return numpy.zeros(len(times))
+        starts, ends, covered = self.numpy_arrays()
+        index = numpy.searchsorted(starts, times, side="right")
+        last = numpy.maximum(index - 1, 0)
+        partial = covered[last] + numpy.minimum(times, ends[last]) - starts[last]
+        return numpy.where(index > 0, partial, 0.0)
+
+
+class Trace:
+    """When the user was away and when the reminder was paused, from `start` to `end`.
+
+    Every other moment in between the user was active. Paused time is
+    never counted as idle.
+    """
+
+    def __init__(self, start, end, idle, paused):
+        self.start = start
+        self.end = end
+        self.paused = Periods(merge(paused))
+        self.idle = Periods(subtract(merge(idle), self.paused.periods))
+
+    @classmethod
+    def from_periods(cls, periods):
+        """A trace of (start, end, state) periods; time none of them covers is idle"""
+        periods = [(start, end, state) for start, end, state in periods if end > start]
+        if not periods:
+            raise TraceError("the trace is empty")
+        start = min(period[0] for period in periods)
+        end = max(period[1] for period in periods)
+        covered = merge((period[0], period[1]) for period in periods)
+        gaps = subtract([(start, end)], covered)
+        idle = [(first, last) for first, last, state in periods if state == "idle"]
+        paused = [(first, last) for first, last, state in periods if state == PAUSED]
+        return cls(start, end, idle + gaps, paused)
+
+    def active_before(self, times):
+        """Seconds the user was active between the start of the trace and each of `times`"""
+        if numpy is None:
+            clipped = [min(max(when, self.start), self.end) for when in times]
+            return [
+                when - self.start - idle - paused for when, idle, paused in zip(
+                    clipped, self.idle.covered_before(clipped), self.paused.covered_before(clipped),
+                )
+            ]
+        clipped = numpy.clip(numpy.asarray(times, dtype=float), self.start, self.end)
+        return (clipped - self.start - self.idle.covered_before(clipped)
+                - self.paused.covered_before(clipped))
+
+    def active_seconds(self):
+        return self.end - self.start - self.idle.covered[-1] - self.paused.covered[-1]
+
+    def idle_time(self, when):
+        """Seconds the user had been away at `when`, 0 if at the keyboard"""
+        index = self.idle.period_at(when)
+        return 0.0 if index is None else when - self.idle.starts[index]
+
+
+def parse_time(text):
+    text = text.strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise TraceError(f"not a Unix timestamp or ISO 8601 time: {text!r}")
+
+
+def read_csv_trace(path):
+    periods = []
+    with open(path, newline="") as f:
+        for number, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].startswith("#") or (number == 1 and row[0].strip() == "start"):
+                continue
+            if len(row) < 3 or row[2].strip() not in STATES:
+                raise TraceError(f"{path}:{number}: expected start,end,{'|'.join(STATES)}")
+            try:
+                periods.append((parse_time(row[0]), parse_time(row[1]), row[2].strip()))
+            except TraceError as e:
+                raise TraceError(f"{path}:{number}: {e}")
+    return Trace.from_periods(periods)
+
+
+def read_history_trace(path):
+    """A trace from the break history: idle and suspend records are idle, pauses paused"""
+    # No rollups: every record is needed, not just the totals
+    entries = sorted(read_entries(path))
+    periods = []
+    for previous, entry in zip([None] + entries, entries):
+        end = entry.start + entry.actual
+        if entry.outcome in (IDLE, SUSPENDED):
+            periods.append((entry.start, end, "idle"))
+        elif entry.outcome == PAUSED:
+            periods.append((entry.start, end, PAUSED))
+        else:
+            periods.append((entry.start, max(end, entry.start + 1), ACTIVE))
+        if previous is not None and entry.start - previous.start <= MAX_HISTORY_GAP:
+            periods.append((previous.start, entry.start, ACTIVE))
+    return Trace.from_periods(periods)
+
+
+def load_trace(path):
+    """A CSV trace, or a break history, whichever `path` holds"""
+    try:
+        with open(path, "rb") as f:
+            is_history = f.read(len(MAGIC)) == MAGIC
+        return read_history_trace(path) if is_history else read_csv_trace(path)
+    except OSError as e:
+        raise TraceError(f"cannot read {path}: {e.strerror}")
+    except UnicodeDecodeError:
+        raise TraceError(f"{path} is neither a CSV trace nor a break history")
+
+
+class Replay(EngineListener):
+    """One policy run through a trace; notes every break it shows"""
+
+    def __init__(self, trace, interval, duration, tiers=()):
+        self.trace = trace
+        self.clock = VirtualClock(trace.start)
+        self.engine = BreakEngine(
+            interval, duration, clock=self.clock, listener=self,
+            idle_time=lambda: trace.idle_time(self.clock.now), tiers=tiers,
+        )
+        self.started_at = None
+        self.breaks = []  # (start, end) of every break shown
+
+    def on_break_started(self, due):
+        self.started_at = self.clock.now
+
+    def on_break_ended(self):
+        self.breaks.append((self.started_at, self.clock.now))
+
+    def run(self):
+        """Replay the trace; returns the breaks shown"""
+        # The idle monitor only reports returns after at least the shortest break
+        threshold = min(tier.duration for tier in self.engine.tiers)
+        events = [
+            (end, 0, end - start) for start, end in self.trace.idle.periods
+            if end - start >= threshold
+        ]
+        events += [(start, 1, 0.0) for start, _ in self.trace.paused.periods]
+        events += [(end, 2, 0.0) for _, end in self.trace.paused.periods]
+        for when, kind, away in sorted(events):
+            self.clock.run(self.engine, when)
+            if kind == 0:
+                self.engine.credit_idle(away)
+            elif kind == 1:
+                self.engine.pause()
+            else:
+                self.engine.resume()
+        self.clock.run(self.engine, self.trace.end)
+        self.engine.shutdown()
+        return self.breaks
+
+
+def score(trace, breaks, threshold):
+    """How the breaks of one policy fit the trace"""
+    starts = [start for start, _ in breaks]
+    ends = [end for _, end in breaks]
+    shown = sum(end - start for start, end in breaks)
+    if numpy is None:
+        while_active = sum(
+            not idle and not paused for idle, paused in zip(
+                trace.idle.contains(starts), trace.paused.contains(starts),
+            )
+        )
+        overlap = sum(
+            after - before for before, after in zip(
+                trace.idle.covered_before(starts), trace.idle.covered_before(ends),
+            )
+        )
+    else:
+        while_active = int(numpy.count_nonzero(
+            ~(trace.idle.contains(starts) | trace.paused.contains(starts))
+        ))
+        overlap = float(numpy.sum(trace.idle.covered_before(ends)
+                                  - trace.idle.covered_before(starts)))
+    active_hours = trace.active_seconds() / 3600
+    return {
+        "breaks": len(breaks),
+        "per_active_hour": len(breaks) / active_hours if active_hours else 0.0,
+        "while_active": while_active,
+        "idle_overlap": overlap / shown if shown else 0.0,
+        "longest_stretch": longest_stretch(trace, breaks, threshold),
+    }
+
+
+def longest_stretch(trace, breaks, threshold):
+    """The most active seconds between two rests, breaks or time away of `threshold`"""
+    rests = [(trace.start, trace.start), (trace.end, trace.end)] + list(breaks) + [
+        (start, end) for start, end in trace.idle.periods if end - start >= threshold
+    ]
+    rests.sort()
+    starts = [start for start, _ in rests]
+    # Rests can overlap; a stretch starts when all the rests before it are over
+    ends = list(itertools.accumulate((end for _, end in rests), max))
+    if numpy is None:
+        stretches = [
+            after - before for before, after in zip(
+                trace.active_before(ends[:-1]), trace.active_before(starts[1:]),
+            )
+        ]
+        return max(0.0, max(stretches))
+    stretches = trace.active_before(starts[1:]) - trace.active_before(ends[:-1])
+    return max(0.0, float(numpy.max(stretches)))
+
+
+def simulate(trace, intervals, durations, tiers=()):
+    """The score of every (interval, duration) policy on `trace`"""
+    results = []
+    for interval, duration in itertools.product(intervals, durations):
+        replay = Replay(trace, interval, duration, tiers)
+        breaks = replay.run()
+        threshold = min(tier.duration for tier in replay.engine.tiers)
+        results.append(dict(score(trace, breaks, threshold), interval=interval, duration=duration))
+    return results
+
+
+COLUMNS = (
+    ("Interval", lambda result: format_duration(result["interval"])),
+    ("Duration", lambda result: format_duration(result["duration"])),
+    ("Breaks", lambda result: str(result["breaks"])),
+    ("Per active hour", lambda result: f"{result['per_active_hour']:.2f}"),
+    ("While active", lambda result: f"{result['while_active']}"),
+    ("Overlapping idle", lambda result: f"{result['idle_overlap'] * 100:.0f}%"),
+    ("Longest stretch", lambda result: format_duration(result["longest_stretch"])),
+)
+
+
+def format_table(results):
+    rows = [[title for title, _ in COLUMNS]]
+    rows += [[cell(result) for _, cell in COLUMNS] for result in results]
+    widths = [max(len(row[column]) for row in rows) for column in range(len(COLUMNS))]
+    return "\n".join(
+        "  ".join(text.rjust(width) for text, width in zip(row, widths)) for row in rows
+    )
+
+
+def seconds_list(text):
+    try:
+        values = [int(part) for part in text.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected seconds separated by commas, got {text!r}")
+    if not values or min(values) <= 0:
+        raise argparse.ArgumentTypeError("expected positive numbers of seconds")
+    return values
+
+
+def build_parser():
+    from .ctl import tier_argument
+
+    parser = argparse.ArgumentParser(
+        prog="eyesight-reminder simulate",
+        description="Compare break policies by replaying recorded activity through them.",
+    )
+    parser.add_argument(
+        "trace", nargs="?",
+        help="CSV file of start,end,state rows (state: active, idle or paused; times as "
+             "Unix timestamps or ISO 8601), or a break history (default: this user's)."
+    )
+    parser.add_argument(
+        "--interval", "-i", type=seconds_list, metavar="SECONDS[,SECONDS...]",
+        help="Break intervals to try (default: from the config file, or 1200)."
+    )
+    parser.add_argument(
+        "--duration", "-d", type=seconds_list, metavar="SECONDS[,SECONDS...]",
+        help="Break durations to try with each interval (default: from the config file, or 20)."
+    )
+    parser.add_argument(
+        "--tier", "-t", type=tier_argument, action="append", metavar="INTERVAL:DURATION",
+        help="Additional break tiers for every policy (default: from the config file)."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        config = load_config()
+    except ConfigError as e:
+        print(f"Ignoring the config file: {e}", file=sys.stderr)
+        config = {}
+    intervals = args.interval or [config.get("break_interval", 1200)]
+    durations = args.duration or [config.get("break_duration", 20)]
+    tiers = args.tier if args.tier is not None else config.get("tiers", ())
+    try:
+        trace = load_trace(args.trace or history_path())
+    except TraceError as e:
+        print(f"Cannot simulate: {e}", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    results = simulate(trace, intervals, durations, tiers)
+    if args.json:
+        print(json.dumps(results))
+        return 0
+    print(format_table(results))
+    print(
+        f"\n{format_duration(trace.end - trace.start)} of trace, "
+        f"{format_duration(trace.active_seconds())} active; "
+        f"{len(results)} policies in {time.perf_counter() - started:.2f}s"
+        f"{'' if numpy is not None else ' (without NumPy)'}"
+    )
+    return 0
@@ -0,0 +1,47 @@
+"""Socket helpers shared by the Qt servers and the Qt-free scheduler daemon."""
+
+import os
+import socket
+import struct
+
+# struct ucred from sys/socket.h
+UCRED = struct.Struct("=iII")  # pid, uid, gid
+
+
+def listen_unix(path, backlog=16, mode=0o600):
+    """Bind a non-blocking listening socket at `path`.
+
+    A socket file left behind by a crashed instance is replaced, but one that
+    still accepts connections belongs to a live instance and is left alone;
+    None is returned in that case.
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        # Nobody is listening there (any more)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    else:
+        print(f"Warning: {path} is already served by another process")
+        return None
+    finally:
+        probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # The socket file is created with `mode` rather than chmod()ed after the fact
+    umask = os.umask(0o777 & ~mode)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+    server.listen(backlog)
+    server.setblocking(False)
+    return server
+
+
+def peer_credentials(sock):
+    """(pid, uid, gid) of the process at the other end of a Unix socket"""
+    return UCRED.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, UCRED.size))
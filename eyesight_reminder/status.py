@@ -0,0 +1,165 @@
+import collections
+import mmap
+import os
+import struct
+import sys
+import time
+
+from .paths import status_segment_path
+
+# Fixed layout of the status segment (little endian):
+#   magic, layout version, sequence counter,
+#   state, break interval, break duration,
+#   next break deadline, break end deadline, remaining seconds,
+#   offset between time.time() and time.monotonic()
+# Deadlines are CLOCK_MONOTONIC timestamps, which are shared by all processes
+# on the machine; add the clock offset to turn them into Unix timestamps.
+MAGIC = b"EYES"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+PAYLOAD = struct.Struct("<B7xdddddd")
+SEQ_OFFSET = 8
+SEGMENT_SIZE = HEADER.size + PAYLOAD.size
+
+STATE_STOPPED = 0
+STATE_RUNNING = 1
+STATE_PAUSED = 2
+STATE_BREAK = 3
+STATE_NAMES = {
+    STATE_STOPPED: "stopped",
+    STATE_RUNNING: "running",
+    STATE_PAUSED: "paused",
+    STATE_BREAK: "break",
+}
+
+# A writer holds the sequence counter odd while it updates the payload
+READ_RETRIES = 100
+
+
+class StatusSnapshot(collections.namedtuple(
+    "StatusSnapshot",
+    "seq state interval duration next_break break_end remaining clock_offset",
+)):
+    """One consistent view of the status segment"""
+
+    @property
+    def state_name(self):
+        return STATE_NAMES.get(self.state, "unknown")
+
+    def time_left(self, now=None):
+        """Seconds until the next break (or the end of the break) at `now`"""
+        if now is None:
+            now = time.monotonic()
+        if self.state == STATE_BREAK:
+            return max(0.0, self.break_end - now)
+        if self.state == STATE_RUNNING:
+            return max(0.0, self.next_break - now)
+        return self.remaining
+
+
+def engine_state(engine):
+    if engine.in_break():
+        return STATE_BREAK
+    if engine.paused:
+        return STATE_PAUSED
+    return STATE_RUNNING
+
+
+def engine_status(engine):
+    """The state of a BreakEngine as a JSON-serialisable dict with Unix timestamps"""
+    remaining = engine.remaining()
+    deadline = None
+    if engine.in_break() or not engine.paused:
+        deadline = time.time() + remaining
+    return {
+        "state": STATE_NAMES[engine_state(engine)],
+        "remaining": round(remaining, 3),
+        "deadline": deadline,
+        "interval": engine.break_interval,
+        "duration": engine.break_duration,
+        "tiers": [tuple(tier) for tier in engine.tiers[1:]],
+        # Tier 0 is the interval/duration pair, the others follow in order
+        "tier": engine.break_tier if engine.in_break() else engine.next_tier(),
+    }
+
+
+class StatusSegment:
+    """Writer side of the memory-mapped status segment.
+
+    The file is mapped once and updated in place whenever the state changes,
+    so exporting the status costs no system calls. Updates follow a seqlock
+    protocol: the sequence counter is odd while the payload is being
+    written, letting readers detect and retry torn reads without locking.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or status_segment_path()
+        self.seq = 0
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, SEGMENT_SIZE)
+            self.map = mmap.mmap(fd, SEGMENT_SIZE)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self.map, 0, MAGIC, LAYOUT_VERSION, self.seq)
+
+    def update(self, state, interval, duration, next_break=0.0, break_end=0.0, remaining=0.0):
+        if self.map is None:
+            return
+        clock_offset = time.time() - time.monotonic()
+        self.seq += 1
+        struct.pack_into("<Q", self.map, SEQ_OFFSET, self.seq)
+        PAYLOAD.pack_into(
+            self.map, HEADER.size,
+            state, interval, duration, next_break, break_end, remaining, clock_offset,
+        )
+        self.seq += 1
+        struct.pack_into("<Q", self.map, SEQ_OFFSET, self.seq)
+
+    def close(self, remove=True):
+        """Mark the segment as stopped and unmap it"""
+        if self.map is None:
+            return
+        self.update(STATE_STOPPED, 0, 0)
+        self.map.close()
+        self.map = None
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def read_status(path=None):
+    """Read a consistent snapshot of the status segment.
+
+    Returns None if no instance is exporting its status at `path`.
+    """
+    path = path or status_segment_path()
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), SEGMENT_SIZE, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, version, _ = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            return None
+        for _ in range(READ_RETRIES):
+            (seq,) = struct.unpack_from("<Q", data, SEQ_OFFSET)
+            if seq % 2:
+                continue
+            payload = PAYLOAD.unpack_from(data, HEADER.size)
+            if struct.unpack_from("<Q", data, SEQ_OFFSET)[0] == seq:
+                return StatusSnapshot(seq, *payload)
+        return None
+    finally:
+        data.close()
+
+
+if __name__ == "__main__":
+    snapshot = read_status(sys.argv[1] if len(sys.argv) > 1 else None)
+    if snapshot is None:
+        print("Eyesight reminder is not running")
+        sys.exit(1)
+    print(f"{snapshot.state_name} {int(snapshot.time_left())}")
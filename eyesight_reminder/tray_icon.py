@@ -0,0 +1,100 @@
+"""The tray icon, with a ring filling up toward the next break.
+
+The ring moves in PROGRESS_STEPS steps. The icon of every step is
+rendered once, at each of ICON_SIZES and for every device pixel ratio of
+the screens, and kept in CountdownIcons; counting down only switches the
+tray between the cached QIcons, and only when the step changes (see
+next_step_change()), so the ring costs nothing between steps.
+"""
+
+import math
+
+from PyQt5.QtCore import QObject, QRect, QRectF, Qt
+from PyQt5.QtGui import QColor, QIcon, QPainter, QPen, QPixmap
+
+PROGRESS_STEPS = 24
+ICON_SIZES = (16, 22, 24, 32, 48)
+RING_COLOR = QColor(76, 175, 80)
+PAUSED_COLOR = QColor(158, 158, 158)
+TRACK_COLOR = QColor(0, 0, 0, 96)
+
+
+def progress_step(remaining, total, steps=PROGRESS_STEPS):
+    """How many of `steps` of a countdown from `total` seconds have passed"""
+    if total <= 0:
+        return steps
+    # The epsilon keeps a step that was just reached from rounding back down
+    done = math.floor((1 - remaining / total) * steps + 1e-9)
+    return min(steps, max(0, done))
+
+
+def next_step_change(remaining, total, steps=PROGRESS_STEPS):
+    """Seconds until progress_step() changes, or None once the ring is full"""
+    step = progress_step(remaining, total, steps)
+    if step >= steps:
+        return None
+    return max(0.0, remaining - total * (1 - (step + 1) / steps))
+
+
+class CountdownIcons(QObject):
+    """The tray icon of every progress step, and of the paused countdown (step None)"""
+
+    def __init__(self, base_icon, app, steps=PROGRESS_STEPS, parent=None):
+        super().__init__(parent or app)
+        self.base_icon = base_icon
+        self.app = app
+        self.steps = steps
+        self.ratios = self.screen_ratios()
+        self.icons = {}  # step -> QIcon
+
+    def screen_ratios(self):
+        return sorted({1.0} | {screen.devicePixelRatio() for screen in self.app.screens()})
+
+    def prewarm(self):
+        """Render every step for the pixel ratios of the screens; True if anything was rendered"""
+        ratios = self.screen_ratios()
+        if ratios != self.ratios:
+            # Frames for a ratio no screen has any more are not worth keeping
+            self.ratios = ratios
+            self.icons = {}
+        missing = [step for step in [None] + list(range(self.steps + 1)) if step not in self.icons]
+        for step in missing:
+            self.icons[step] = self.render(step)
+        return bool(missing)
+
+    def icon(self, step):
+        icon = self.icons.get(step)
+        if icon is None:
+            # Only until prewarm() has run
+            icon = self.icons[step] = self.render(step)
+        return icon
+
+    def render(self, step):
+        icon = QIcon()
+        for size in ICON_SIZES:
+            for ratio in self.ratios:
+                icon.addPixmap(self.render_pixmap(step, size, ratio))
+        return icon
+
+    def render_pixmap(self, step, size, ratio):
+        pixmap = QPixmap(round(size * ratio), round(size * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        width = max(2.0, size / 8)
+        ring = QRectF(width / 2, width / 2, size - width, size - width)
+        inset = math.ceil(width)
+        self.base_icon.paint(painter, QRect(inset, inset, size - 2 * inset, size - 2 * inset))
+        painter.setPen(QPen(TRACK_COLOR, width))
+        painter.drawEllipse(ring)
+        if step is None:
+            painter.setPen(QPen(PAUSED_COLOR, width))
+            painter.drawEllipse(ring)
+        elif step:
+            painter.setPen(QPen(RING_COLOR, width, Qt.SolidLine, Qt.FlatCap))
+            # Clockwise from 12 o'clock, in sixteenths of a degree
+            painter.drawArc(ring, 90 * 16, -round(360 * 16 * step / self.steps))
+        painter.end()
+        return pixmap
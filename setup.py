@@ -15,9 +15,12 @@ setup(
     version=version,
     packages=find_packages(),
     install_requires=["PyQt5"],
+    extras_require={
+        "simulate": ["numpy"],
+    },
     entry_points={
         "console_scripts": [
-            "eyesight-reminder=eyesight_reminder.main:main",
+            "eyesight-reminder=eyesight_reminder.cli:main",
         ],
     },
     package_data={
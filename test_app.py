@@ -0,0 +1,86 @@
+"""
+Tests for driving the running application from outside. The `app` fixture
+is in conftest.py.
+"""
+
+import concurrent.futures
+import os
+import signal
+
+import pytest
+
+from conftest import wait_for
+from eyesight_reminder.ctl import send_command
+
+pytest.importorskip("PyQt5")
+
+
+def command(app, name, **arguments):
+    """Send a command like `eyesight-reminder ctl` while the app's event loop runs"""
+    with concurrent.futures.ThreadPoolExecutor(1) as pool:
+        reply = pool.submit(send_command, name, path=app.control_server.path, **arguments)
+        assert wait_for(app, reply.done)
+        return reply.result()
+
+
+def test_commands_on_the_control_socket(app):
+    interval, duration, tiers = app.break_interval, app.break_duration, list(app.tiers)
+    try:
+        reply = command(app, "pause")
+        assert reply["ok"] and reply["status"]["state"] == "paused"
+        assert app.engine.paused
+        # Pausing twice is not an error
+        assert command(app, "pause")["status"]["state"] == "paused"
+
+        reply = command(app, "resume")
+        assert reply["status"]["state"] == "running"
+        assert not app.engine.paused
+
+        remaining = app.engine.remaining()
+        reply = command(app, "postpone", seconds=300)
+        assert reply["ok"]
+        assert app.engine.remaining() == pytest.approx(remaining + 300, abs=1)
+
+        reply = command(app, "set", interval=900, duration=30, tiers=[[3600, 300]])
+        assert reply["status"]["interval"] == 900
+        assert reply["status"]["tiers"] == [[3600, 300]]
+        assert (app.break_interval, app.break_duration) == (900, 30)
+        assert app.engine.remaining() == pytest.approx(900, abs=1)
+
+        assert command(app, "set", interval=0) == {
+            "ok": False, "error": "interval and duration must be positive",
+        }
+        assert command(app, "launch") == {"ok": False, "error": "unknown command: launch"}
+        assert app.break_interval == 900
+    finally:
+        app.engine.resume()
+        app.update_settings({"break_interval": interval, "break_duration": duration, "tiers": tiers})
+
+
+@pytest.fixture
+def signal_handlers(app):
+    """The app's signal handlers, as main() installs them, for one test"""
+    from eyesight_reminder.app import HANDLED_SIGNALS
+
+    previous = {sig: signal.getsignal(sig) for sig in HANDLED_SIGNALS}
+    app.install_signal_handlers()
+    yield
+    signal.set_wakeup_fd(-1)
+    for sig, handler in previous.items():
+        signal.signal(sig, handler)
+
+
+def test_signals_arrive_through_the_wakeup_fd(app, signal_handlers, monkeypatch):
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert wait_for(app, lambda: app.engine.paused)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert wait_for(app, lambda: not app.engine.paused)
+
+        quits = []
+        monkeypatch.setattr(app, "quit", lambda: quits.append(True))
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert wait_for(app, lambda: quits)
+        assert quits == [True]
+    finally:
+        app.engine.resume()
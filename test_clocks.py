@@ -0,0 +1,48 @@
+"""
+Tests for noticing suspends and wall clock steps.
+"""
+
+from eyesight_reminder.clocks import ClockWatch
+
+
+class FakeClocks:
+    def __init__(self):
+        self.monotonic = 100.0
+        self.boottime = 100.0
+        self.wall = 1_700_000_000.0
+
+    def run(self, seconds):
+        self.monotonic += seconds
+        self.boottime += seconds
+        self.wall += seconds
+
+    def suspend(self, seconds):
+        self.boottime += seconds
+        self.wall += seconds
+
+
+def make_watch():
+    clocks = FakeClocks()
+    watch = ClockWatch(
+        monotonic=lambda: clocks.monotonic,
+        boottime=lambda: clocks.boottime,
+        wall=lambda: clocks.wall,
+    )
+    return watch, clocks
+
+
+def test_normal_running_is_not_a_jump():
+    watch, clocks = make_watch()
+    clocks.run(3600)
+    assert watch.check() == (0.0, 0.0)
+
+
+def test_suspend_is_told_apart_from_wall_clock_step():
+    watch, clocks = make_watch()
+    clocks.run(10)
+    clocks.suspend(3600)
+    assert watch.check() == (3600.0, 0.0)
+    assert watch.check() == (0.0, 0.0)
+    clocks.wall -= 120
+    assert watch.check() == (0.0, -120.0)
+
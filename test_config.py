@@ -0,0 +1,82 @@
+"""
+Tests for the config file and for applying edits of it to a running app.
+"""
+
+import os
+
+import pytest
+
+from conftest import wait_for
+from eyesight_reminder.config import ConfigError, changed_settings, load_config, save_config
+
+NO_HOOKS = {"hooks": {}, "hook_concurrency": 2, "defer_processes": [], "defer_grace": 300}
+
+
+def test_saved_settings_load_back(tmp_path):
+    path = str(tmp_path / "config.ini")
+    with open(path, "w") as f:
+        f.write("[breaks]\nduration = 30\n\n[other]\nkey = value\n")
+    assert load_config(path) == dict(NO_HOOKS, break_duration=30)
+
+    save_config({"break_interval": 600, "break_duration": 20, "tiers": [(3600, 300)]}, path)
+    assert load_config(path) == dict(
+        NO_HOOKS, break_interval=600, break_duration=20, tiers=[(3600, 300)],
+    )
+    assert "key = value" in open(path).read()
+    assert os.listdir(tmp_path) == ["config.ini"]
+
+
+def test_invalid_config_is_reported(tmp_path):
+    path = str(tmp_path / "config.ini")
+    assert load_config(path) == NO_HOOKS
+    for text in ("[breaks]\ninterval = soon\n", "[breaks]\ntiers = 3600\n", "interval = 1\n",
+                 "[hooks]\ntimeout = 0\n"):
+        with open(path, "w") as f:
+            f.write(text)
+        with pytest.raises(ConfigError):
+            load_config(path)
+
+
+def test_hooks_are_read(tmp_path):
+    path = str(tmp_path / "config.ini")
+    with open(path, "w") as f:
+        f.write(
+            "[hooks]\nbreak-start = date +%H:%M >> ~/breaks\nbreak-end =\n"
+            "timeout = 5\npause = true\npause-timeout = 1\nmax-running = 1\n"
+        )
+    assert load_config(path) == dict(
+        NO_HOOKS,
+        hooks={"break-start": ("date +%H:%M >> ~/breaks", 5), "pause": ("true", 1)},
+        hook_concurrency=1,
+    )
+
+
+def test_only_changed_keys_are_reported():
+    old = {"break_interval": 1200, "break_duration": 20}
+    new = {"break_interval": 1200, "break_duration": 30, "tiers": []}
+    assert changed_settings(old, new) == {"break_duration": 30, "tiers": []}
+
+
+def test_edits_of_the_file_are_applied(app):
+    if app.config_watcher.notifier is None:
+        pytest.skip("inotify is not available")
+    interval, duration = app.break_interval, app.break_duration
+    reloads = []
+    app.config_watcher.changed.connect(reloads.append)
+    try:
+        # Our own save is not reported as a change
+        app.save_settings({"break_interval": 900, "break_duration": duration, "tiers": []})
+        wait_for(app, lambda: False, timeout=0.5)
+        assert reloads == []
+
+        # Someone else changes the duration; the interval set through ctl stays
+        app.update_settings({"break_interval": 1500, "break_duration": duration})
+        with open(app.config_path, "w") as f:
+            f.write(f"[breaks]\ninterval = 900\nduration = {duration + 5}\n")
+        assert wait_for(app, lambda: app.break_duration == duration + 5)
+        assert app.break_interval == 1500
+        assert reloads == [{"break_duration": duration + 5}]
+    finally:
+        app.config_watcher.changed.disconnect(reloads.append)
+        app.update_settings({"break_interval": interval, "break_duration": duration, "tiers": []})
+        os.remove(app.config_path)
@@ -0,0 +1,121 @@
+"""
+Tests for the scheduler daemon and the thin session clients it drives.
+"""
+
+import json
+import socket
+
+from conftest import wait_for
+from eyesight_reminder.daemon import SchedulerDaemon
+from eyesight_reminder.engine import VirtualClock
+
+
+def connect(daemon):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(daemon.path)
+    sock.settimeout(1.0)
+    daemon.run_once(0)
+    return sock
+
+
+def request(daemon, sock, message):
+    sock.sendall((json.dumps(message) + "\n").encode())
+    daemon.run_once(0)
+
+
+def read_lines(sock):
+    data = b""
+    sock.setblocking(False)
+    try:
+        while True:
+            data += sock.recv(65536)
+    except BlockingIOError:
+        pass
+    sock.setblocking(True)
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def states(sock):
+    return [line["state"] for line in read_lines(sock) if line.get("event") == "status"]
+
+
+def test_sessions_of_a_user_share_one_schedule(tmp_path):
+    clock = VirtualClock()
+    daemon = SchedulerDaemon(str(tmp_path / "scheduler.sock"), clock=clock)
+    try:
+        sessions = [connect(daemon) for _ in range(2)]
+        request(daemon, sessions[0], {"command": "subscribe", "interval": 600, "duration": 20})
+        # The second session's settings do not replace the running schedule
+        request(daemon, sessions[1], {"command": "subscribe", "interval": 60, "duration": 5})
+        assert [line.get("status", line)["sessions"] for line in read_lines(sessions[1])] == [2, 2]
+        assert states(sessions[0])[-1] == "running"
+        assert list(daemon.deadlines.items()) == [(tmp_path.stat().st_uid, 600)]
+
+        clock.advance(600)
+        daemon.run_once(0)
+        assert [states(session) for session in sessions] == [["break"], ["break"]]
+        clock.advance(20)
+        daemon.run_once(0)
+        assert [states(session) for session in sessions] == [["running"], ["running"]]
+
+        # ctl talks to the same schedule
+        ctl = connect(daemon)
+        request(daemon, ctl, {"command": "pause"})
+        assert read_lines(ctl)[0]["status"]["state"] == "paused"
+        assert states(sessions[1]) == ["paused"]
+        assert len(daemon.deadlines) == 0
+
+        for sock in sessions:
+            sock.close()
+            daemon.run_once(0)
+        assert daemon.schedules == {}
+        request(daemon, ctl, {"command": "status"})
+        assert read_lines(ctl) == [{"ok": False, "error": "no session of this user is connected"}]
+    finally:
+        daemon.close()
+
+
+def served(daemon, condition):
+    """`condition`, serving the daemon's sockets every time it is checked"""
+    def check():
+        daemon.run_once(0.005)
+        return condition()
+    return check
+
+
+def test_clients_show_the_breaks_of_the_daemon(app, tmp_path):
+    from eyesight_reminder.client import BreakClient
+
+    daemon = SchedulerDaemon(str(tmp_path / "scheduler.sock"))
+    clients = [
+        BreakClient(app, daemon.path, {"interval": 1200, "duration": 20}) for _ in range(3)
+    ]
+    try:
+        assert wait_for(app, served(daemon, lambda: all(client.state == "running" for client in clients)))
+        assert clients[2].tray_text == "Time until next break: 20 minutes"
+
+        clients[0].send_command("break")
+        assert wait_for(app, served(daemon, lambda: all(client.overlay_pool.visible for client in clients)))
+        assert clients[1].overlay_pool.text == "Take a short pause!\nTime left: 20 seconds"
+
+        clients[1].send_command("skip")
+        assert wait_for(
+            app, served(daemon, lambda: not any(client.overlay_pool.visible for client in clients))
+        )
+        clients[2].toggle_pause()
+        assert wait_for(app, served(daemon, lambda: all(client.tray_text == "Paused" for client in clients)))
+
+        # A restarted daemon gets the sessions back
+        daemon.close()
+        assert wait_for(app, lambda: all(client.state is None for client in clients))
+        daemon = SchedulerDaemon(daemon.path)
+        for client in clients:
+            # Instead of waiting for the reconnect timer
+            client.connect_daemon()
+        assert wait_for(app, served(daemon, lambda: all(client.state == "running" for client in clients)))
+        [schedule] = daemon.schedules.values()
+        assert len(schedule.sessions) == 3
+    finally:
+        for client in clients:
+            client.close()
+        daemon.close()
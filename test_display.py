@@ -0,0 +1,65 @@
+"""
+Tests for when the displayed countdown changes, which decides every wakeup.
+"""
+
+import math
+
+import pytest
+
+from eyesight_reminder.display import format_time_remaining, next_display_change
+
+
+def test_minutes_change_once_a_minute():
+    assert format_time_remaining(1200) == "20 minutes"
+    # Shown as "20 minutes" down to 1199, then "19 minutes" down to 1139
+    assert next_display_change(1200) == 1
+    assert next_display_change(1199.5) == pytest.approx(0.5)
+    assert next_display_change(1199) == 60
+    assert next_display_change(120.25) == pytest.approx(1.25)
+    assert format_time_remaining(60) == "1 minute"
+    assert next_display_change(61) == 2
+
+
+def test_seconds_change_every_second():
+    assert next_display_change(60) == 1
+    assert format_time_remaining(59) == "59 seconds"
+    assert next_display_change(59.5) == pytest.approx(0.5)
+    assert next_display_change(30) == 1
+    assert next_display_change(0.2) == pytest.approx(0.2)
+    assert format_time_remaining(1) == "1 second"
+    # Run out: nothing changes until the state does
+    assert next_display_change(0) is None
+
+
+def test_refresh_is_armed_for_breaks_but_not_while_paused(app):
+    try:
+        app.start_break()
+        assert app.refresh_timer.isActive()
+        # Armed a moment after the break started, for its first change of text
+        expected = math.ceil(next_display_change(app.break_duration) * 1000)
+        assert expected - 5 <= app.refresh_timer.interval() <= expected
+        app.engine.pause()
+        # The paused break's countdown stays frozen
+        assert not app.refresh_timer.isActive()
+        app.engine.resume()
+        app.end_break()
+        assert app.refresh_timer.isActive()
+
+        app.engine.pause()
+        assert not app.refresh_timer.isActive()
+    finally:
+        app.engine.resume()
+    assert app.refresh_timer.isActive()
+
+
+def test_status_file_follows_the_displayed_countdown(app, tmp_path):
+    path = tmp_path / "status"
+    app.status_file_path = str(path)
+    try:
+        app.refresh_display()
+        assert path.read_text() == str(app.time_left)
+        app.engine.pause()
+        assert path.read_text() == "-1"
+    finally:
+        app.engine.resume()
+        app.status_file_path = app.status_file_text = None
@@ -0,0 +1,278 @@
+"""
+Tests for the Qt-independent break engine, driven by a virtual clock.
+"""
+
+import time
+
+import pytest
+
+from eyesight_reminder.engine import BreakEngine, EngineListener, Tier, VirtualClock, parse_tier
+
+DAY = 24 * 3600
+
+
+class RecordingListener(EngineListener):
+    def __init__(self):
+        self.events = []
+        self.records = []
+
+    def on_break_started(self, due):
+        self.events.append(("start", due))
+
+    def on_break_ended(self):
+        self.events.append(("end",))
+
+    def on_break_recorded(self, record):
+        self.records.append(record)
+
+
+def make_engine(interval=1200, duration=20):
+    clock = VirtualClock()
+    listener = RecordingListener()
+    engine = BreakEngine(interval, duration, clock=clock, listener=listener)
+    return engine, clock, listener
+
+
+def starts(listener):
+    return [event[1] for event in listener.events if event[0] == "start"]
+
+
+def test_breaks_follow_interval_and_duration():
+    engine, clock, listener = make_engine()
+    clock.run(engine, 3 * (1200 + 20))
+    assert starts(listener) == [1200, 2420, 3640]
+    assert listener.events.count(("end",)) == 3
+
+
+def test_countdown_is_computed_from_deadline():
+    engine, clock, _ = make_engine()
+    clock.advance(100.5)
+    assert engine.remaining() == pytest.approx(1099.5)
+    assert engine.next_deadline() == 1200
+
+
+def test_pause_freezes_countdown():
+    engine, clock, listener = make_engine()
+    clock.run(engine, 200)
+    engine.pause()
+    clock.run(engine, 200 + DAY)
+    assert engine.remaining() == 1000
+    assert listener.events == []
+    engine.resume()
+    clock.run(engine, clock.now + 1000)
+    assert starts(listener) == [200 + DAY + 1000]
+
+
+def test_pause_during_break_ends_break_and_freezes_next_countdown():
+    engine, clock, listener = make_engine()
+    clock.run(engine, 1205)
+    engine.pause()
+    clock.run(engine, 5000)
+    assert listener.events == [("start", 1200), ("end",)]
+    assert not engine.in_break()
+    assert engine.remaining() == 1200
+
+
+def test_settings_change_restarts_countdown():
+    engine, clock, listener = make_engine()
+    clock.run(engine, 500)
+    engine.update_settings(600, 30)
+    clock.run(engine, 1105)
+    assert starts(listener) == [1100]
+    assert engine.break_end_at == 1130
+
+
+def test_settings_change_mid_break_only_shortens_it():
+    engine, clock, listener = make_engine(duration=60)
+    clock.run(engine, 1210)
+    engine.update_settings(1200, 120)
+    assert engine.break_end_at == 1260
+    engine.update_settings(1200, 5)
+    assert engine.break_end_at == 1215
+
+
+def test_skip_postpone_and_manual_break():
+    engine, clock, listener = make_engine()
+    clock.run(engine, 100)
+    engine.postpone(300)
+    assert engine.next_deadline() == 1500
+    engine.skip()
+    assert engine.next_deadline() == 1300
+    engine.start_break()
+    assert starts(listener) == [100]
+    engine.skip()
+    assert not engine.in_break()
+    with pytest.raises(ValueError):
+        engine.postpone(0)
+
+
+def test_idle_time_counts_as_break():
+    engine, clock, listener = make_engine()
+    clock.run(engine, 1000)
+    assert not engine.credit_idle(19)
+    assert engine.credit_idle(20)
+    assert engine.next_deadline() == 2200
+    clock.run(engine, 2205)
+    assert engine.in_break()
+    assert engine.credit_idle(60)
+    assert not engine.in_break()
+    assert engine.next_deadline() == 2205 + 1200
+
+
+def test_time_away_during_a_break_is_not_counted_twice():
+    engine, clock, listener = make_engine()
+    clock.run(engine, 1230)
+    # Away since 1195: the break at 1200-1220 already covered most of it
+    assert not engine.credit_idle(35)
+    assert [(record.outcome, record.start, record.actual) for record in listener.records] == [
+        ("taken", 1200, 20),
+    ]
+    assert engine.next_deadline() == 2420
+    clock.run(engine, 1300)
+    assert engine.credit_idle(105)
+    assert [(record.outcome, record.start, record.actual) for record in listener.records][1:] == [
+        ("idle", 1220, 80),
+    ]
+    assert engine.next_deadline() == 2500
+
+
+def test_time_away_across_several_breaks_is_counted_once():
+    engine, clock, listener = make_engine()
+    away_since = 600
+    engine.idle_time = lambda: max(0.0, clock.now - away_since)
+    clock.run(engine, 2400)
+    assert not engine.credit_idle(1800)
+    records = [(record.outcome, record.start, record.actual) for record in listener.records]
+    assert records == [("idle", 600, 600), ("idle", 1200, 1200)]
+    assert sum(actual for _, _, actual in records) == 2400 - away_since
+
+
+def test_no_break_is_shown_while_user_is_away():
+    engine, clock, listener = make_engine()
+    away_since = 1100
+    engine.idle_time = lambda: max(0.0, clock.now - away_since)
+    clock.run(engine, 3600)
+    assert starts(listener) == []
+    assert engine.next_deadline() == 4 * 1200
+
+
+def test_suspend_counts_as_rest():
+    engine, clock, listener = make_engine(duration=60)
+    clock.run(engine, 1210)
+    # A short suspend shortens the running break
+    engine.credit_sleep(30)
+    assert engine.break_end_at == 1230
+    # A long one ends it
+    assert engine.credit_sleep(3600)
+    assert not engine.in_break()
+    assert engine.next_deadline() == 1210 + 1200
+
+
+def test_break_is_deferred_while_busy():
+    engine, clock, listener = make_engine()
+    busy = [True]
+    engine.defer = lambda: 300 if busy[0] else 0
+    clock.run(engine, 1750)
+    assert starts(listener) == []
+    assert [(record.outcome, record.start) for record in listener.records] == [
+        ("deferred", 1200), ("deferred", 1500),
+    ]
+    busy[0] = False
+    clock.run(engine, 1810)
+    assert starts(listener) == [1800]
+
+
+class TierListener(EngineListener):
+    def __init__(self):
+        self.breaks = []
+
+    def on_break_started(self, due):
+        self.breaks.append((due, self.engine.tiers[self.engine.break_tier].duration))
+
+
+def make_tiered_engine():
+    clock = VirtualClock()
+    listener = TierListener()
+    engine = BreakEngine(1200, 20, clock=clock, listener=listener, tiers=[(3600, 300), (7200, 900)])
+    listener.engine = engine
+    return engine, clock, listener
+
+
+def test_longer_break_takes_over_colliding_shorter_one():
+    engine, clock, listener = make_tiered_engine()
+    clock.run(engine, 3 * 3600)
+    assert listener.breaks[:3] == [(1200, 20), (2420, 20), (3600, 300)]
+    # The long break at 2 h replaces both shorter ones due around then
+    assert (3900 + 3600, 900) not in listener.breaks
+    assert [duration for _, duration in listener.breaks].count(900) == 1
+    # Every break restarts the countdown of the shorter tiers
+    long_break = next(due for due, duration in listener.breaks if duration == 900)
+    after = [due for due, _ in listener.breaks if due > long_break]
+    assert after[0] == long_break + 900 + 1200
+
+
+def test_skip_and_pause_work_per_tier():
+    engine, clock, listener = make_tiered_engine()
+    clock.run(engine, 1000)
+    engine.skip()
+    assert engine.next_tier() == 0
+    assert engine.next_deadline() == 2200
+    engine.pause()
+    clock.run(engine, 5000)
+    engine.resume()
+    assert engine.next_deadline() == 5000 + 1200
+    assert listener.breaks == []
+
+
+def test_every_outcome_is_recorded():
+    engine, clock, listener = make_engine()
+    engine.idle_time = lambda: 0.0
+    clock.run(engine, 1210)
+    engine.skip()  # 10 s into the break
+    clock.run(engine, 2410 + 20)
+    engine.skip()  # Before the next break
+    engine.postpone(60)
+    engine.pause()
+    clock.advance(100)
+    engine.resume()
+    engine.credit_idle(30)
+    engine.credit_sleep(600)
+    engine.start_break()
+    engine.shutdown()
+    assert [(record.outcome, record.start, record.actual) for record in listener.records] == [
+        ("skipped", 1200, 10),
+        ("taken", 2410, 20),
+        ("skipped", 2430, 0),
+        ("postponed", 2430, 0),
+        ("paused", 2430, 100),
+        ("idle", 2500, 30),
+        ("suspended", 1930, 600),
+        ("interrupted", 2530, 0),
+    ]
+    assert {record.planned for record in listener.records if record.outcome != "paused"} == {20}
+
+
+def test_parse_tier():
+    assert parse_tier("3600:300") == Tier(3600, 300)
+    for text in ("3600", "a:b", "0:10"):
+        with pytest.raises(ValueError):
+            parse_tier(text)
+
+
+def test_many_tiers_keep_one_deadline_queue():
+    clock = VirtualClock()
+    tiers = [(600 + index, 1 + index % 30) for index in range(500)]
+    engine = BreakEngine(1200, 20, clock=clock, tiers=tiers)
+    start = time.perf_counter()
+    clock.run(engine, DAY)
+    assert time.perf_counter() - start < 2.0
+    assert len(engine.queue) == 501
+
+
+def test_simulating_weeks_is_fast():
+    engine, clock, listener = make_engine()
+    start = time.perf_counter()
+    clock.run(engine, 4 * 7 * DAY)
+    elapsed = time.perf_counter() - start
+    assert len(starts(listener)) == (4 * 7 * DAY) // 1220
+    assert elapsed < 2.0
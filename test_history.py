@@ -0,0 +1,82 @@
+"""
+Tests for the append-only break history and its rollups. None of this
+needs Qt.
+"""
+
+import os
+
+from eyesight_reminder.history import HEADER, MAGIC, RECORD, Entry, History, format_stats
+
+NOON = 1_700_000_000.0
+
+
+def make_history(tmp_path):
+    return History(str(tmp_path / "history"), str(tmp_path / "rollups.json"))
+
+
+def test_entries_survive_a_restart(tmp_path):
+    history = make_history(tmp_path)
+    history.append(Entry(NOON, 20, 20, "taken", 0, 2))
+    history.append(Entry(NOON + 1200, 20, 5.5, "skipped", 0, 2))
+    history.append(Entry(NOON + 2400, 0, 600, "paused", None, 0))
+    history.close()
+    assert os.path.getsize(tmp_path / "history") == HEADER.size + 3 * RECORD.size
+
+    history = make_history(tmp_path)
+    assert list(history.read()) == [
+        Entry(NOON, 20, 20, "taken", 0, 2),
+        Entry(NOON + 1200, 20, 5.5, "skipped", 0, 2),
+        Entry(NOON + 2400, 0, 600, "paused", None, 0),
+    ]
+    stats = history.stats(now=NOON)
+    assert stats["today"] == {"taken": [1, 20], "skipped": [1, 5.5], "paused": [1, 600]}
+    assert stats["week"] == stats["total"] == stats["today"]
+    assert format_stats(stats).splitlines()[0].split() == [
+        "Today:", "1", "taken,", "1", "skipped;", "rested", "25s,", "paused", "10m", "0s",
+    ]
+
+
+def test_only_records_after_the_rollups_are_read(tmp_path):
+    history = make_history(tmp_path)
+    for day in range(3):
+        history.append(Entry(NOON + day * 86400, 20, 20, "taken", 0, 1))
+    history.compact()
+    history.append(Entry(NOON + 3 * 86400, 20, 20, "idle", 0, 0))
+    history.close()
+
+    history = make_history(tmp_path)
+    assert history.rollups["records"] == 4
+    assert list(history.read(3)) == [Entry(NOON + 3 * 86400, 20, 20, "idle", 0, 0)]
+    assert history.stats(now=NOON)["total"] == {"taken": [3, 60], "idle": [1, 20]}
+
+    # Rollups that no longer match the log are rebuilt from it
+    os.remove(tmp_path / "history")
+    assert make_history(tmp_path).stats(now=NOON)["total"] == {}
+
+
+def test_torn_record_is_dropped(tmp_path):
+    history = make_history(tmp_path)
+    history.append(Entry(NOON, 20, 20, "taken", 0, 1))
+    history.close()
+    with open(tmp_path / "history", "ab") as f:
+        f.write(b"\0" * (RECORD.size // 2))
+
+    history = make_history(tmp_path)
+    assert history.count == 1
+    history.append(Entry(NOON + 1200, 20, 20, "taken", 0, 1))
+    history.close()
+    assert [entry.start for entry in make_history(tmp_path).read()] == [NOON, NOON + 1200]
+
+
+def test_log_in_an_unknown_format_is_moved_aside(tmp_path):
+    foreign = HEADER.pack(MAGIC, 2, RECORD.size + 8) + b"\1" * 3 * (RECORD.size + 8)
+    (tmp_path / "history").write_bytes(foreign)
+    history = make_history(tmp_path)
+    assert history.count == 0
+    history.append(Entry(NOON, 20, 20, "taken", 0, 1))
+    history.close()
+
+    assert (tmp_path / "history.unknown").read_bytes() == foreign
+    history = make_history(tmp_path)
+    assert list(history.read()) == [Entry(NOON, 20, 20, "taken", 0, 1)]
+    assert history.stats(now=NOON)["total"] == {"taken": [1, 20]}
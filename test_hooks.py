@@ -0,0 +1,67 @@
+"""
+Tests for running hook commands without blocking the event loop.
+"""
+
+import time
+
+from conftest import wait_for
+from eyesight_reminder.hooks import HookRunner
+from eyesight_reminder.metrics import Metrics
+
+
+def test_hooks_run_in_the_background(app, tmp_path, capsys):
+    out = tmp_path / "out"
+    metrics = Metrics()
+    runner = HookRunner({
+        "break-start": (f"echo $EYESIGHT_EVENT $EYESIGHT_DURATION >> {out}; echo started", 5),
+        "pause": ("sleep 30", 1),
+    }, concurrency=1, metrics=metrics)
+    try:
+        start = time.monotonic()
+        runner.fire("pause")
+        runner.fire("break-start", duration=20)
+        runner.fire("resume")  # No hook for it
+        # Nothing runs until the event loop gets control back
+        assert not runner.running
+        assert time.monotonic() - start < 0.1
+
+        # The hung hook holds the only slot until its timeout kills it
+        # The redirection creates the file before echo writes to it
+        assert wait_for(app, lambda: out.exists() and out.read_text() == "break-start 20\n")
+        assert time.monotonic() - start >= 0.9
+        assert wait_for(app, lambda: not runner.running and not runner.pending)
+    finally:
+        runner.close()
+        runner.deleteLater()
+    output = capsys.readouterr().out
+    assert "Hook pause killed after its timeout of 1s" in output
+    assert "[hook break-start] started" in output
+    assert metrics.histograms["hook_runtime.pause"].count == 1
+    assert metrics.histograms["hook_delay.break-start"].summary()["max"] >= 900
+
+
+def test_refiring_a_queued_hook_runs_it_once(app, tmp_path):
+    out = tmp_path / "out"
+    runner = HookRunner({"break-end": (f"echo $EYESIGHT_OUTCOME >> {out}", 5)})
+    try:
+        runner.fire("break-end", outcome="skipped")
+        runner.fire("break-end", outcome="taken")
+        assert wait_for(app, lambda: out.exists() and not runner.running)
+        assert out.read_text() == "taken\n"
+    finally:
+        runner.close()
+        runner.deleteLater()
+
+
+def test_closing_reaps_running_hooks(app):
+    from PyQt5.QtCore import QProcess
+
+    runner = HookRunner({"pause": ("sleep 30", 60)})
+    try:
+        runner.fire("pause")
+        assert wait_for(app, lambda: runner.running)
+        processes = list(runner.running)
+    finally:
+        runner.close()
+    assert [process.state() for process in processes] == [QProcess.NotRunning]
+    runner.deleteLater()
@@ -0,0 +1,75 @@
+"""
+Tests for idle detection, fed through the socket backend.
+"""
+
+import os
+import socket
+import time
+
+import pytest
+
+from conftest import wait_for
+
+pytest.importorskip("PyQt5")
+
+
+def test_activity_after_long_pause_reports_return(app, tmp_path):
+    from eyesight_reminder.idle import IdleMonitor, SocketBackend
+
+    path = str(tmp_path / "activity.sock")
+    monitor = IdleMonitor(SocketBackend(path=path), threshold=20, coalesce=0.05)
+    returns = []
+    monitor.returned.connect(returns.append)
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        # Short pauses are only recorded
+        sender.sendto(b"x", path)
+        assert wait_for(app, lambda: monitor.idle_time() < 0.5)
+        assert returns == []
+
+        # Pretend the user left half an hour ago
+        monitor.last_activity -= 1800
+        assert monitor.idle_time() >= 1800
+        wait_for(app, lambda: monitor.backend.notifiers[0].isEnabled())
+        sender.sendto(b"x", path)
+        assert wait_for(app, lambda: returns)
+        assert returns[0] == pytest.approx(1800, abs=5)
+    finally:
+        sender.close()
+        monitor.close()
+    assert not os.path.exists(path)
+
+
+def test_bursts_of_input_are_coalesced(app, tmp_path):
+    from eyesight_reminder.idle import IdleMonitor, SocketBackend
+
+    path = str(tmp_path / "activity.sock")
+    backend = SocketBackend(path=path)
+    monitor = IdleMonitor(backend, threshold=20, coalesce=0.2)
+    reports = []
+    backend.activity.connect(lambda: reports.append(time.monotonic()))
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    # The queue fills up while the backend is switched off
+    sender.setblocking(False)
+    try:
+        start = time.monotonic()
+        while time.monotonic() - start < 0.5:
+            try:
+                sender.sendto(b"x", path)
+            except BlockingIOError:
+                pass
+            app.processEvents()
+            time.sleep(0.002)
+        # Without coalescing this would be a report per datagram
+        assert 1 <= len(reports) <= 4
+    finally:
+        sender.close()
+        monitor.close()
+
+
+def test_unavailable_backend_disables_idle_detection(app):
+    from eyesight_reminder.idle import EvdevBackend, create_backend
+
+    with pytest.raises(OSError):
+        EvdevBackend(pattern="/nonexistent/event*")
+    assert create_backend("none") is None
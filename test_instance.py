@@ -0,0 +1,99 @@
+"""
+Tests for the single-instance lock and forwarding settings to the running
+instance. None of this needs Qt.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from eyesight_reminder.ctl import ControlError, send_command
+from eyesight_reminder.instance import InstanceLock, forward_settings
+
+
+def test_second_lock_fails_until_released(tmp_path):
+    path = str(tmp_path / "instance.lock")
+    first, second = InstanceLock(path), InstanceLock(path)
+    assert first.acquire()
+    assert not second.acquire()
+    assert second.holder() == os.getpid()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_lock_of_killed_process_is_recovered(tmp_path):
+    path = str(tmp_path / "instance.lock")
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys, time; from eyesight_reminder.instance import InstanceLock; "
+         f"assert InstanceLock({path!r}).acquire(); print('locked', flush=True); time.sleep(60)"],
+        stdout=subprocess.PIPE, universal_newlines=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        lock = InstanceLock(path)
+        assert not lock.acquire()
+        assert lock.holder() == holder.pid
+    finally:
+        holder.send_signal(signal.SIGKILL)
+        holder.wait()
+    assert lock.acquire()
+    lock.release()
+
+
+def test_settings_are_forwarded(tmp_path):
+    path = str(tmp_path / "control.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    requests = []
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            requests.append(json.loads(conn.makefile().readline()))
+            conn.sendall(b'{"ok": true}\n')
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    try:
+        assert forward_settings(path=path, interval=600) == {"ok": True}
+    finally:
+        thread.join()
+        server.close()
+    assert requests == [{"command": "set", "interval": 600}]
+
+
+def test_forwarding_gives_up_without_instance(tmp_path):
+    with pytest.raises(ControlError):
+        forward_settings(path=str(tmp_path / "control.sock"), timeout=0.1, duration=30)
+
+
+def test_dropped_connection_is_a_control_error(tmp_path):
+    path = str(tmp_path / "control.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    def drop():
+        conn, _ = server.accept()
+        # Closing with the request unread resets the connection
+        conn.recv(1)
+        conn.close()
+
+    thread = threading.Thread(target=drop)
+    thread.start()
+    try:
+        with pytest.raises(ControlError, match="Lost the connection"):
+            send_command("status", path=path)
+    finally:
+        thread.join()
+        server.close()
@@ -0,0 +1,61 @@
+"""
+Tests for the status stream served to status bars.
+"""
+
+import json
+import socket
+import time
+
+import pytest
+
+from conftest import wait_for
+
+pytest.importorskip("PyQt5")
+
+
+def test_slow_subscriber_only_gets_the_latest_status(app, tmp_path):
+    from eyesight_reminder.ipc import StatusServer
+
+    server = StatusServer(str(tmp_path / "status.sock"))
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(server.path)
+        assert wait_for(app, lambda: server.subscribers)
+        [subscriber] = server.subscribers.values()
+
+        # The subscriber reads nothing until the kernel's buffers are full
+        padding = "x" * 65536
+        full = 0
+        while not subscriber.in_flight:
+            full += 1
+            assert full < 1000
+            server.publish({"seq": full, "padding": padding})
+        start = time.monotonic()
+        for seq in range(full + 1, full + 6):
+            server.publish({"seq": seq, "padding": padding})
+        assert time.monotonic() - start < 0.5
+        assert json.loads(subscriber.latest)["seq"] == full + 5
+
+        data = bytearray()
+
+        def drained():
+            try:
+                while True:
+                    chunk = client.recv(1 << 20)
+                    if not chunk:
+                        break
+                    data.extend(chunk)
+            except BlockingIOError:
+                pass
+            return data.endswith(b"\n") and json.loads(data.splitlines()[-1])["seq"] == full + 5
+
+        client.setblocking(False)
+        assert wait_for(app, drained)
+        # The line that was being written is finished, the ones behind it coalesced
+        assert [json.loads(line)["seq"] for line in data.splitlines()] == list(range(1, full + 1)) + [
+            full + 5,
+        ]
+        assert not subscriber.in_flight and subscriber.latest is None
+    finally:
+        client.close()
+        server.close()
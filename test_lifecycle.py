@@ -0,0 +1,75 @@
+"""
+Long-run lifecycle test: thousands of break cycles and settings windows must
+not leave QObjects, widgets or memory behind.
+
+Runs offscreen; skipped when PyQt5 is not installed. The `app` fixture is
+in conftest.py.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+CYCLES = 2000
+SETTINGS_OPENINGS = 200
+# RSS may still move a little with allocator and font cache noise
+RSS_TOLERANCE_KB = 2048
+
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def settle(app):
+    from PyQt5.QtCore import QCoreApplication, QEvent
+
+    app.processEvents()
+    # deleteLater() is only honoured by a running event loop otherwise
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def object_counts(app):
+    from PyQt5.QtCore import QObject
+    from PyQt5.QtWidgets import QApplication
+
+    return len(app.findChildren(QObject)), len(QApplication.allWidgets())
+
+
+def run_break_cycles(app, cycles):
+    for _ in range(cycles):
+        app.start_break()
+        settle(app)
+        app.end_break()
+        settle(app)
+
+
+def test_break_cycles_do_not_leak(app):
+    # Warm up pools and caches before taking the baseline
+    run_break_cycles(app, 20)
+    objects_before = object_counts(app)
+    rss_before = rss_kb()
+
+    run_break_cycles(app, CYCLES)
+
+    assert object_counts(app) == objects_before
+    assert rss_kb() - rss_before < RSS_TOLERANCE_KB
+
+
+def test_settings_windows_are_deleted(app):
+    def open_and_close():
+        app.open_settings()
+        settle(app)
+        app.settings_window.close()
+        settle(app)
+
+    open_and_close()
+    objects_before = object_counts(app)
+
+    for _ in range(SETTINGS_OPENINGS):
+        open_and_close()
+
+    assert app.settings_window is None
+    assert object_counts(app) == objects_before
@@ -0,0 +1,41 @@
+"""
+Tests for the fixed-size latency histograms.
+"""
+
+import pytest
+
+from eyesight_reminder import metrics
+from eyesight_reminder.metrics import Histogram, Metrics
+
+BUCKET_WIDTH = 10 ** (1 / 20)
+
+
+def test_percentiles_are_accurate_to_the_bucket_width():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.record(float(value))
+    summary = histogram.summary()
+    assert (summary["count"], summary["mean"], summary["max"]) == (100, 50.5, 100.0)
+    assert 50 <= summary["p50"] <= 50 * BUCKET_WIDTH
+    assert 90 <= summary["p90"] <= 90 * BUCKET_WIDTH
+    # Never above the largest value seen
+    assert 99 <= summary["p99"] <= 100
+    assert histogram.cumulative([10, 100]) == [10, 100]
+    # Values outside the bucket range still count
+    histogram.record(10 ** 7)
+    assert histogram.percentile(100) == 10 ** 7
+    assert Histogram().percentile(50) == 0.0
+
+
+def test_lateness_is_recorded_in_milliseconds(monkeypatch):
+    monkeypatch.setattr(metrics.time, "monotonic", lambda: 1000.0)
+    recorded = Metrics()
+    for late in (0.004, 0.010, 0.250):
+        recorded.record_lateness("timer_lateness.break", 1000.0 - late)
+    # A timer that fired early counts as on time
+    recorded.record_lateness("timer_lateness.break", 1001.0)
+    summary = recorded.summary()["histograms"]["timer_lateness.break"]
+    assert summary["count"] == 4
+    assert summary["max"] == pytest.approx(250)
+    assert 4 <= summary["p50"] <= 4 * BUCKET_WIDTH
+    assert summary["p99"] == pytest.approx(250)
@@ -0,0 +1,61 @@
+"""
+Tests for rendering the metrics in the OpenMetrics text format. None of
+this needs Qt.
+"""
+
+import pytest
+
+from eyesight_reminder.metrics import Metrics
+from eyesight_reminder.openmetrics import OpenMetricsRenderer, parse_address
+
+
+def test_counters_and_histograms_are_rendered():
+    metrics = Metrics()
+    metrics.count("breaks_started")
+    metrics.count("breaks.taken")
+    metrics.count("wakeups.refresh", 3)
+    for milliseconds in (0.5, 5, 50):
+        metrics.record("timer_lateness.break", milliseconds)
+    metrics.record("overlay_shown", 2)
+    text = OpenMetricsRenderer(metrics).render([
+        ("eyesight_paused_seconds", "counter", "Paused.", "seconds", 1.5),
+    ])
+    lines = text.splitlines()
+    for line in (
+        "eyesight_breaks_started_total 1",
+        'eyesight_breaks_total{outcome="taken"} 1',
+        'eyesight_wakeups_total{source="refresh"} 3',
+        'eyesight_timer_lateness_seconds_bucket{timer="break",le="0.0001"} 0',
+        'eyesight_timer_lateness_seconds_bucket{timer="break",le="0.01"} 2',
+        'eyesight_timer_lateness_seconds_bucket{timer="break",le="+Inf"} 3',
+        'eyesight_timer_lateness_seconds_count{timer="break"} 3',
+        "# UNIT eyesight_paused_seconds seconds",
+        "eyesight_paused_seconds_total 1.5",
+        "# HELP eyesight_breaks Breaks by how they ended: "
+        "taken, skipped, postponed, idle, suspended, interrupted or deferred.",
+    ):
+        assert line in lines
+    assert not any("overlay_shown" in line for line in lines)
+    assert lines[-1] == "# EOF"
+    assert any(line.startswith("process_resident_memory_bytes ") for line in lines)
+
+
+def test_text_is_only_rendered_again_after_a_change():
+    metrics = Metrics()
+    renderer = OpenMetricsRenderer(metrics)
+    renderer.render()
+    cached = renderer.cached_text
+    renderer.render()
+    assert renderer.cached_text is cached
+    metrics.count("breaks_started")
+    assert "eyesight_breaks_started_total 1" in renderer.render()
+
+
+def test_parse_address():
+    assert parse_address("9877") == ("127.0.0.1", 9877)
+    assert parse_address("0.0.0.0:9877") == ("0.0.0.0", 9877)
+    assert parse_address("[::1]:9877") == ("::1", 9877)
+    assert parse_address("/run/metrics.sock") == "/run/metrics.sock"
+    for text in ("metrics", "127.0.0.1:99999"):
+        with pytest.raises(ValueError):
+            parse_address(text)
@@ -0,0 +1,54 @@
+"""
+Tests for the pool of overlay windows following screens as they come and go.
+"""
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import QObject, QRect, pyqtSignal  # noqa: E402
+
+
+class FakeScreen(QObject):
+    """Enough of a QScreen for the pool; the offscreen platform cannot add real ones"""
+
+    geometryChanged = pyqtSignal(QRect)
+
+    def __init__(self, rect):
+        super().__init__()
+        self.rect = rect
+
+    def geometry(self):
+        return self.rect
+
+    def move(self, rect):
+        self.rect = rect
+        self.geometryChanged.emit(rect)
+
+
+def test_pool_follows_screens_without_rebuilding_overlays(app):
+    pool = app.overlay_pool
+    pool.prewarm()
+    before = dict(pool.overlays)
+    screen = FakeScreen(QRect(1920, 0, 1280, 1024))
+    try:
+        pool.set_text("Take a short pause!\nTime left: 20 seconds")
+        pool.add_screen(screen)
+        assert len(pool.overlays) == len(before) + 1
+        overlay = pool.overlays[screen]
+        assert overlay.geometry() == QRect(1920, 0, 1280, 1024)
+        assert overlay.text == pool.text
+        # Adding it again or showing a break reuses the windows
+        pool.add_screen(screen)
+        pool.show()
+        assert overlay.isVisible()
+        pool.hide()
+        assert pool.overlays == {**before, screen: overlay}
+
+        screen.move(QRect(0, 1080, 1920, 1080))
+        assert pool.overlays[screen] is overlay
+        assert overlay.geometry() == QRect(0, 1080, 1920, 1080)
+    finally:
+        pool.remove_screen(screen)
+    assert pool.overlays == before
+    assert not overlay.isVisible()
@@ -0,0 +1,35 @@
+"""
+Tests for the per-user runtime files. None of this needs Qt.
+"""
+
+import os
+
+import pytest
+
+from eyesight_reminder.paths import runtime_dir
+from eyesight_reminder.sockets import listen_unix
+
+
+def test_runtime_dir_fallback_must_be_private(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    path = runtime_dir()
+    assert path == str(tmp_path / f"eyesight-reminder-{os.getuid()}")
+    assert os.stat(path).st_mode & 0o777 == 0o700
+
+    # Made by someone else, or at least readable by others
+    os.chmod(path, 0o755)
+    with pytest.raises(PermissionError):
+        runtime_dir()
+    os.rmdir(path)
+    os.symlink(tmp_path, path)
+    with pytest.raises(PermissionError):
+        runtime_dir()
+
+
+def test_sockets_are_created_private(tmp_path):
+    server = listen_unix(str(tmp_path / "control.sock"))
+    try:
+        assert os.stat(tmp_path / "control.sock").st_mode & 0o777 == 0o600
+    finally:
+        server.close()
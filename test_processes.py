@@ -0,0 +1,57 @@
+"""
+Tests for noticing listed programs start and exit.
+"""
+
+import errno
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import wait_for
+from eyesight_reminder.processes import ProcessWatcher
+
+
+@pytest.mark.parametrize("use_connector", [True, False])
+def test_listed_program_is_noticed(app, tmp_path, use_connector):
+    program = str(tmp_path / "eyesight-dummy")
+    shutil.copy("/bin/sleep", program)
+    watcher = ProcessWatcher(["eyesight-dummy"], use_connector=use_connector, scan_interval=0.2)
+    try:
+        if use_connector and watcher.connector is None:
+            pytest.skip("process events are not available")
+        assert not watcher.active()
+        process = subprocess.Popen([program, "30"])
+        try:
+            assert wait_for(app, watcher.active)
+            assert watcher.running_names() == ["eyesight-dummy"]
+        finally:
+            process.kill()
+            process.wait()
+        assert wait_for(app, lambda: not watcher.active())
+    finally:
+        watcher.close()
+
+
+def test_exec_and_processes_without_pidfd_are_noticed(app, tmp_path, monkeypatch):
+    program = str(tmp_path / "eyesight-dummy")
+    shutil.copy("/bin/sleep", program)
+
+    def no_pidfd(pid):
+        raise OSError(errno.EMFILE, "Too many open files")
+
+    monkeypatch.setattr(os, "pidfd_open", no_pidfd, raising=False)
+    watcher = ProcessWatcher(["eyesight-dummy"], use_connector=False, scan_interval=0.2)
+    # Known to the scans as a shell before it becomes the listed program
+    process = subprocess.Popen(["/bin/sh", "-c", f"sleep 0.5; exec {program} 30"])
+    try:
+        assert wait_for(app, watcher.active)
+        assert watcher.pidfds == {}
+        process.kill()
+        process.wait()
+        assert wait_for(app, lambda: not watcher.active())
+    finally:
+        process.kill()
+        process.wait()
+        watcher.close()
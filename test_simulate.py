@@ -0,0 +1,84 @@
+"""
+Tests for replaying activity traces through break policies. None of this
+needs Qt.
+"""
+
+import json
+
+import pytest
+
+from eyesight_reminder import simulate
+from eyesight_reminder.history import Entry, History
+
+TRACE = """start,end,state
+0,2440,active
+2440,2480,idle
+2480,3000,active
+3000,3600,idle
+3600,5000,active
+5000,5600,paused
+5600,6800,active
+7000,7200,active
+"""
+
+
+@pytest.fixture(params=["numpy", "bisect"])
+def backend(request, monkeypatch):
+    if request.param == "numpy" and simulate.numpy is None:
+        pytest.skip("NumPy is not installed")
+    if request.param == "bisect":
+        monkeypatch.setattr(simulate, "numpy", None)
+    return request.param
+
+
+def test_policies_are_scored(tmp_path, backend):
+    path = tmp_path / "trace.csv"
+    path.write_text(TRACE)
+    trace = simulate.load_trace(str(path))
+    # Time the trace does not cover counts as idle
+    assert trace.idle.periods == [(2440, 2480), (3000, 3600), (6800, 7000)]
+    assert trace.active_seconds() == 7200 - 840 - 600
+
+    replay = simulate.Replay(trace, 1200, 60)
+    # Away for 10 minutes restarts the countdown, pausing freezes it
+    assert replay.run() == [(1200, 1260), (2460, 2520), (4800, 4860), (6660, 6720)]
+
+    [result] = simulate.simulate(trace, [1200], [60])
+    assert result["breaks"] == 4
+    assert result["per_active_hour"] == pytest.approx(4 / 1.6)
+    # The second break started 20 s into a short time away
+    assert result["while_active"] == 3
+    assert result["idle_overlap"] == pytest.approx(20 / 240)
+    assert result["longest_stretch"] == 1200
+
+
+def test_break_history_is_a_trace(tmp_path):
+    path = str(tmp_path / "history")
+    history = History(path, str(tmp_path / "rollups.json"))
+    history.append(Entry(0, 20, 20, "taken", 0, 1))
+    history.append(Entry(1220, 20, 20, "taken", 0, 1))
+    history.append(Entry(1500, 0, 300, "paused", None, 0))
+    history.append(Entry(2000, 20, 600, "idle", 0, 0))
+    # Hours later: the reminder was not running in between
+    history.append(Entry(20000, 20, 20, "taken", 0, 1))
+    history.close()
+
+    trace = simulate.load_trace(path)
+    assert (trace.start, trace.end) == (0, 20020)
+    assert trace.paused.periods == [(1500, 1800)]
+    assert trace.idle.periods == [(2000, 20000)]
+
+
+def test_command_line(tmp_path, capsys):
+    path = tmp_path / "trace.csv"
+    path.write_text(TRACE)
+    assert simulate.main([str(path), "-i", "1200,1800", "-d", "60", "--json"]) == 0
+    results = json.loads(capsys.readouterr().out)
+    assert [(result["interval"], result["breaks"]) for result in results] == [(1200, 4), (1800, 2)]
+
+    assert simulate.main([str(path), "-i", "1200", "-d", "60"]) == 0
+    assert capsys.readouterr().out.splitlines()[1].split()[:3] == ["20m", "0s", "1m"]
+
+    path.write_text("0,60,asleep\n")
+    assert simulate.main([str(path)]) == 2
+    assert "expected start,end" in capsys.readouterr().err
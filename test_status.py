@@ -0,0 +1,58 @@
+"""
+Tests for the memory-mapped status segment and its seqlock.
+"""
+
+import struct
+
+from eyesight_reminder import status
+from eyesight_reminder.status import STATE_BREAK, STATE_RUNNING, StatusSegment, read_status
+
+
+class SequenceReads:
+    """Stands in for the struct module, handing out sequence numbers as a writer would change them"""
+
+    def __init__(self, sequence):
+        self.sequence = iter(sequence)
+        self.reads = 0
+
+    def unpack_from(self, fmt, data, offset):
+        self.reads += 1
+        return (next(self.sequence),)
+
+
+def test_status_round_trip(tmp_path):
+    path = str(tmp_path / "status")
+    segment = StatusSegment(path)
+    try:
+        segment.update(STATE_RUNNING, 1200, 20, next_break=500.0, remaining=300.0)
+        snapshot = read_status(path)
+        assert snapshot.seq == 2
+        assert (snapshot.state_name, snapshot.interval, snapshot.duration) == ("running", 1200, 20)
+        assert snapshot.time_left(now=400.0) == 100.0
+        segment.update(STATE_BREAK, 1200, 20, break_end=420.0, remaining=20.0)
+        snapshot = read_status(path)
+        assert (snapshot.seq, snapshot.state_name, snapshot.time_left(now=410.0)) == (4, "break", 10.0)
+    finally:
+        segment.close()
+    assert read_status(path) is None
+
+
+def test_reader_retries_torn_reads(tmp_path, monkeypatch):
+    path = str(tmp_path / "status")
+    segment = StatusSegment(path)
+    try:
+        segment.update(STATE_RUNNING, 1200, 20, next_break=500.0)
+        # Mid-update, then changed while the payload was read, then stable
+        reads = SequenceReads([3, 4, 6, 6, 6])
+        monkeypatch.setattr(status, "struct", reads)
+        assert read_status(path).seq == 6
+        assert reads.reads == 5
+        # A writer that never finishes makes the reader give up
+        reads = SequenceReads([7] * status.READ_RETRIES)
+        monkeypatch.setattr(status, "struct", reads)
+        assert read_status(path) is None
+        assert reads.reads == status.READ_RETRIES
+        monkeypatch.setattr(status, "struct", struct)
+        assert read_status(path).state_name == "running"
+    finally:
+        segment.close()
@@ -0,0 +1,46 @@
+"""
+Tests for the progress ring on the tray icon and its cache of frames.
+"""
+
+from eyesight_reminder.tray_icon import next_step_change, progress_step
+
+
+def test_steps_of_the_countdown():
+    assert [progress_step(remaining, 1200, 24) for remaining in (1200, 1151, 1150, 600, 1, 0)] == [
+        0, 0, 1, 12, 23, 24,
+    ]
+    # A postponed break counts down from further away than the interval
+    assert progress_step(1500, 1200, 24) == 0
+    assert next_step_change(1200, 1200, 24) == 50
+    assert next_step_change(1150, 1200, 24) == 50
+    assert next_step_change(1500, 1200, 24) == 350
+    assert next_step_change(0, 1200, 24) is None
+    # Waking up when the step changes really moves the ring on
+    remaining = 1200.0
+    for expected in range(1, 25):
+        remaining -= next_step_change(remaining, 1200, 24)
+        assert progress_step(remaining, 1200, 24) == expected
+
+
+def test_icon_is_only_swapped_when_the_step_changes(app, monkeypatch):
+    icons = app.countdown_icons
+    icons.prewarm()
+    assert len(icons.icons) == icons.steps + 2
+    rendered = []
+    monkeypatch.setattr(icons, "render", lambda step: rendered.append(step))
+    swapped = []
+    set_icon = app.tray_icon.setIcon
+    monkeypatch.setattr(app.tray_icon, "setIcon", lambda icon: (swapped.append(icon), set_icon(icon)))
+
+    for _ in range(10):
+        app.refresh_display()
+    assert swapped == []
+    assert app.tray_step == progress_step(app.engine.remaining(), app.countdown_length())
+
+    app.engine.pause()
+    assert app.tray_step is None
+    assert swapped == [icons.icons[None]]
+    app.engine.resume()
+    assert swapped[-1] is icons.icons[app.tray_step]
+    # Every frame came from the cache
+    assert rendered == []